@@ -0,0 +1,247 @@
+"""
+Modo em lote: executa uma lista de comandos do menu sobre os dados já carregados e
+escreve um resultado estruturado por comando, em JSON Lines (padrão) ou em um único
+array JSON. Cada registro tem o comando original e `resultado` ou `erro`.
+
+Os comandos são os mesmos do menu interativo (U, C, DC, D, D COMUM, BUSCAR C/D, FILTRAR C/D,
+STATS, SIMILARES, PARES), um por linha; linhas em branco e iniciadas por '#' são ignoradas e SAIR encerra o lote.
+`U *` devolve todas as unidades com seus cursos, o que permite gerar o relatório
+completo com uma única execução.
+"""
+import json
+import sys
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, TextIO
+
+from column_index import FilterError, parse_conditions
+from data_models import Curso, Disciplina, Unidade
+from menu import FILTER_FIELDS, FILTER_USAGE, SIMILAR_COURSES_LIMIT, MenuHandler
+
+if TYPE_CHECKING:
+    from similarity import Similaridade
+
+OUTPUT_BUFFER_SIZE = 1 << 16
+# Mesma ordem em que o menu exibe as listas de disciplinas de um curso.
+DISCIPLINE_LISTS = ('obrigatorias', 'optativas_eletivas', 'optativas_livres')
+
+
+class CommandError(Exception):
+    """Comando inválido ou que não encontrou o que foi pedido."""
+
+
+def internal_error(e: Exception) -> str:
+    return f"Erro interno: {type(e).__name__}: {e}"
+
+
+def _unidade_dict(menu: MenuHandler, unidade: Unidade) -> Dict:
+    return {'nome': unidade.nome, 'cursos': [c.nome for c in menu._sorted_cursos(unidade)]}
+
+
+def _disciplina_resumo(disciplina: Disciplina) -> Dict:
+    return {'codigo': disciplina.codigo, 'nome': disciplina.nome}
+
+
+def _similaridade_dict(similaridade: 'Similaridade') -> Dict:
+    return {
+        'jaccard': round(similaridade.jaccard, 4),
+        'obrigatorias_em_comum': similaridade.comuns,
+        'sobreposicao': round(similaridade.sobreposicao, 4),
+    }
+
+
+class BatchRunner:
+    """Traduz cada comando do menu em uma chamada aos métodos de acesso do MenuHandler."""
+
+    def __init__(self, menu: MenuHandler):
+        self.menu = menu
+
+    def _unidade(self, query: str) -> Unidade:
+        unidade = self.menu._find_unidade(query)
+        if not unidade:
+            raise CommandError(f"Unidade '{query}' não encontrada.")
+        return unidade
+
+    def _curso(self, args: str, command: str) -> Curso:
+        split_args = args.rsplit(' ', 1)
+        if len(split_args) != 2:
+            raise CommandError(f"Formato inválido. Use: {command} [unidade] [número]")
+        unit_query, number = split_args
+        cursos = self.menu._sorted_cursos(self._unidade(unit_query))
+        try:
+            course_number = int(number)
+        except ValueError:
+            raise CommandError(f"'{number}' não é um número de curso válido.")
+        if not 1 <= course_number <= len(cursos):
+            raise CommandError(f"Número do curso inválido. A unidade tem apenas {len(cursos)} cursos.")
+        return self.menu._load_curso(cursos[course_number - 1])
+
+    def _cmd_u(self, args: str):
+        if not args:
+            return [u.nome for u in self.menu.unidades_list]
+        if args == '*':
+            return [_unidade_dict(self.menu, u) for u in self.menu.unidades_list]
+        return _unidade_dict(self.menu, self._unidade(args))
+
+    def _cmd_c(self, args: str):
+        if not args:
+            return {u.nome: [c.nome for c in self.menu._sorted_cursos(u)] for u in self.menu.unidades_list}
+        curso = self._curso(args, 'C')
+        data = curso.to_dict()
+        for disc_type in DISCIPLINE_LISTS:
+            data[disc_type] = len(data[disc_type])
+        return data
+
+    def _cmd_dc(self, args: str):
+        if not args:
+            raise CommandError("Formato inválido. Use: DC [unidade] [número]")
+        curso = self._curso(args, 'DC')
+        data = {'curso': curso.nome}
+        for disc_type in DISCIPLINE_LISTS:
+            data[disc_type] = [_disciplina_resumo(d) for d in sorted(getattr(curso, disc_type), key=lambda d: d.nome)]
+        return data
+
+    def _cmd_d(self, args: str):
+        if args == 'COMUM':
+            return [dict(_disciplina_resumo(d), num_cursos=n) for d, n in self.menu._common_disciplines()]
+        if not args:
+            raise CommandError("Argumento para 'D' faltando. Use D [código/nome] ou D COMUM.")
+        disciplina = self.menu._find_disciplina(args)
+        if not disciplina:
+            raise CommandError(f"Disciplina '{args}' não encontrada.")
+        return disciplina.to_dict()
+
+    def _cmd_buscar(self, args: str):
+        search_parts = args.split(' ', 1)
+        if len(search_parts) == 2 and search_parts[0].upper() == 'C':
+            return [{'nome': c.nome, 'unidade': c.unidade} for c in self.menu._matching_courses(search_parts[1])]
+        if len(search_parts) == 2 and search_parts[0].upper() == 'D':
+            return [_disciplina_resumo(d) for d in self.menu._matching_disciplines(search_parts[1], None)]
+        raise CommandError("Formato inválido. Use: BUSCAR C [termo] ou BUSCAR D [termo]")
+
+    def _cmd_filtrar(self, args: str):
+        tipo, _, conditions = args.partition(' ')
+        tipo = tipo.upper()
+        if tipo not in FILTER_FIELDS:
+            raise CommandError(FILTER_USAGE)
+        try:
+            condicoes, unit_query = parse_conditions(conditions, FILTER_FIELDS[tipo])
+        except FilterError as e:
+            raise CommandError(str(e))
+        if not condicoes and unit_query is None:
+            raise CommandError(FILTER_USAGE)
+        unidade = self._unidade(unit_query) if unit_query is not None else None
+        if tipo == 'C':
+            total, cursos = self.menu._filter_courses(condicoes, unidade)
+            return {'total': total, 'cursos': [
+                dict({'nome': c.nome, 'unidade': c.unidade}, **{field: getattr(c, field) for field in FILTER_FIELDS['C']})
+                for c in cursos
+            ]}
+        total, disciplinas = self.menu._filter_disciplines(condicoes, unidade)
+        return {'total': total, 'disciplinas': [
+            dict(_disciplina_resumo(d), **{field: getattr(d, field) for field in FILTER_FIELDS['D']}) for d in disciplinas
+        ]}
+
+    def _cmd_stats(self, args: str):
+        if not self.menu.unidades_list:
+            raise CommandError("Não há dados para gerar estatísticas.")
+        unidade, num_cursos = self.menu._unit_with_most_courses()
+        curso, num_obrigatorias = self.menu._course_with_most_mandatory()
+        return {
+            'unidade_com_mais_cursos': {'nome': unidade.nome, 'num_cursos': num_cursos},
+            'curso_com_mais_obrigatorias': {'nome': curso.nome, 'num_obrigatorias': num_obrigatorias} if curso else None,
+            'disciplinas_mais_comuns': [dict(_disciplina_resumo(d), num_cursos=n) for d, n in self.menu._top_disciplines(5)],
+            'distribuicoes_por_unidade': [
+                {'unidade': dist.unidade, 'num_disciplinas': dist.num_disciplinas,
+                 'creditos_aula': dist.creditos_aula._asdict(), 'carga_horaria': dist.carga_horaria._asdict()}
+                for dist in self.menu._unit_distributions()
+            ],
+            'duracoes': {
+                field: {str(semestres): n for semestres, n in histogram}
+                for field, histogram in self.menu._duration_histograms().items()
+            },
+        }
+
+    def _cmd_similares(self, args: str):
+        if not args:
+            raise CommandError("Formato inválido. Use: SIMILARES [unidade] [número]")
+        curso = self._curso(args, 'SIMILARES')
+        return {
+            'curso': curso.nome,
+            'similares': [
+                dict({'nome': s.outro.nome, 'unidade': s.outro.unidade}, **_similaridade_dict(s))
+                for s in self.menu._similar_courses(curso, SIMILAR_COURSES_LIMIT)
+            ],
+        }
+
+    def _cmd_pares(self, args: str):
+        if args and not (args.isdigit() and int(args) > 0):
+            raise CommandError(f"'{args}' não é uma quantidade válida. Use: PARES [quantidade]")
+        k = int(args) if args else SIMILAR_COURSES_LIMIT
+        return [
+            dict({'cursos': [{'nome': c.nome, 'unidade': c.unidade} for c in (s.curso, s.outro)]}, **_similaridade_dict(s))
+            for s in self.menu._overlapping_pairs(k)
+        ]
+
+    COMMANDS = {
+        'U': _cmd_u, 'C': _cmd_c, 'DC': _cmd_dc, 'D': _cmd_d, 'BUSCAR': _cmd_buscar, 'FILTRAR': _cmd_filtrar,
+        'STATS': _cmd_stats, 'SIMILARES': _cmd_similares, 'PARES': _cmd_pares,
+    }
+
+    def result(self, line: str):
+        """Executa um comando e devolve seu resultado; lança CommandError se ele for inválido."""
+        parts = line.split(' ', 1)
+        command = parts[0].upper()
+        args = parts[1] if len(parts) > 1 else ""
+        handler = self.COMMANDS.get(command)
+        if handler is None:
+            raise CommandError("Comando inválido.")
+        return handler(self, args)
+
+    def execute(self, line: str) -> Dict:
+        """Executa um comando e devolve o registro com o resultado ou o erro."""
+        try:
+            return {'comando': line, 'resultado': self.result(line)}
+        except CommandError as e:
+            return {'comando': line, 'erro': str(e)}
+        except Exception as e:
+            # Uma falha inesperada (de um índice, do NumPy, do SQLite...) fica registrada no
+            # comando que a causou, sem interromper o restante do lote.
+            return {'comando': line, 'erro': internal_error(e)}
+
+    def run(self, lines: Iterable[str], out: TextIO, output_format: str = 'jsonl') -> int:
+        """Executa os comandos em ordem e devolve quantos terminaram com erro."""
+        errors = 0
+        first = True
+        if output_format == 'json':
+            out.write('[')
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.upper() == 'SAIR':
+                break
+            record = self.execute(line)
+            errors += 'erro' in record
+            text = json.dumps(record, ensure_ascii=False)
+            if output_format == 'json':
+                out.write(('\n' if first else ',\n') + text)
+            else:
+                out.write(text + '\n')
+            first = False
+        if output_format == 'json':
+            out.write('\n]\n')
+        return errors
+
+
+def run_batch(menu: MenuHandler, commands_file: str, output_format: str = 'jsonl', output_file: Optional[str] = None) -> int:
+    """Lê os comandos de `commands_file` ('-' para stdin) e escreve os resultados em `output_file` ou stdout."""
+    source = sys.stdin if commands_file == '-' else open(commands_file, 'r', encoding='utf-8')
+    if output_file:
+        out = open(output_file, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE)
+    else:
+        out = open(sys.__stdout__.fileno(), 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE, closefd=False)
+    try:
+        return BatchRunner(menu).run(source, out, output_format)
+    finally:
+        out.close()
+        if source is not sys.stdin:
+            source.close()
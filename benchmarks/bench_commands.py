@@ -0,0 +1,75 @@
+"""
+Mede a latência dos comandos do menu que localizam unidades e cursos (U, C, DC e as
+listagens), comparando o MenuHandler atual com a versão que varria as unidades e
+reordenava os cursos a cada comando.
+
+Uso:
+    python benchmarks/bench_commands.py --unidades 50 --cursos 20
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import time
+
+from common import synthetic_dataset
+
+from menu import MenuHandler
+
+
+class LegacyMenuHandler(MenuHandler):
+    """Busca de unidades e ordenação de cursos como eram feitas antes dos índices."""
+
+    def _sorted_cursos(self, unidade):
+        return sorted(unidade.cursos, key=lambda c: c.nome)
+
+    def _find_unidade(self, query):
+        query_lower = query.lower()
+        sigla_pattern = f"( {query_lower} )"
+        for unidade in self.unidades_list:
+            unidade_nome_lower = unidade.nome.lower()
+            if query_lower == unidade_nome_lower or sigla_pattern in unidade_nome_lower:
+                return unidade
+        return None
+
+
+def commands(menu: MenuHandler, sigla: str):
+    unidade = menu._find_unidade(sigla)
+    return {
+        f'U {sigla}': lambda: menu.execute(f'U {sigla}'),
+        f'C {sigla} 3': lambda: menu.execute(f'C {sigla} 3'),
+        f'DC {sigla} 3': lambda: menu.execute(f'DC {sigla} 3'),
+        'U (busca)': lambda: menu._find_unidade(unidade.nome),
+        'C (todos)': lambda: menu.execute('C'),
+    }
+
+
+def timed(func, repeat: int) -> float:
+    samples = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de latência dos comandos U/C/DC.')
+    parser.add_argument('--unidades', type=int, default=50)
+    parser.add_argument('--cursos', type=int, default=20, help='Cursos por unidade.')
+    parser.add_argument('--repeticoes', type=int, default=200)
+    args = parser.parse_args()
+
+    data = synthetic_dataset(args.unidades, args.cursos, num_disciplinas=20000)
+    sigla = f"US{args.unidades - 1}"
+    legacy = commands(LegacyMenuHandler(*data), sigla)
+    current = commands(MenuHandler(*data), sigla)
+
+    print(f"{'comando':14s} {'antes (ms)':>11s} {'depois (ms)':>12s}")
+    for name in current:
+        print(f"{name:14s} {timed(legacy[name], args.repeticoes):11.4f} {timed(current[name], args.repeticoes):12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Mede a memória ocupada pelos objetos do modelo (Unidade, Curso, Disciplina) em um conjunto
+de dados do tamanho da coleta completa, montado em memória e carregado de usp_data.json.
+
+Cada medição roda em um processo separado e reporta o acréscimo no pico de RSS e o total
+de bytes alocados pelo Python (tracemalloc) que continuam vivos depois da carga.
+
+Uso:
+    python benchmarks/bench_models.py --unidades 50 --cursos 20 --disciplinas 30000
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import peak_rss_mb, synthetic_dataset
+
+from utils import load_data_from_json, save_data_to_json
+
+
+def run_single(kind: str, args):
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+
+    before = peak_rss_mb()
+    tracemalloc.start()
+    start = time.perf_counter()
+    if kind == 'montar':
+        data = synthetic_dataset(args.unidades, args.cursos, args.disciplinas, args.por_curso)
+    else:
+        data = load_data_from_json(args.arquivo)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    live, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    sys.stdout = stdout
+    print(json.dumps({'tempo_s': elapsed, 'vivos_mb': live / 2**20,
+                      'acrescimo_rss_mb': peak_rss_mb() - before, 'cursos': len(data[1])}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de memória dos objetos do modelo.')
+    parser.add_argument('--unidades', type=int, default=50)
+    parser.add_argument('--cursos', type=int, default=20, help='Cursos por unidade.')
+    parser.add_argument('--disciplinas', type=int, default=30000)
+    parser.add_argument('--por-curso', type=int, default=60, help='Disciplinas por curso.')
+    parser.add_argument('--arquivo', help=argparse.SUPPRESS)
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args.single, args)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'dados.json')
+        devnull = open(os.devnull, 'w')
+        stdout, sys.stdout = sys.stdout, devnull
+        save_data_to_json(*synthetic_dataset(args.unidades, args.cursos, args.disciplinas, args.por_curso), filename)
+        sys.stdout = stdout
+
+        print(f"{'operação':14s} {'cursos':>7s} {'tempo (s)':>10s} {'objetos vivos (MB)':>19s} {'+pico RSS (MB)':>15s}")
+        for kind in ('montar', 'carregar json'):
+            out = subprocess.run(
+                [sys.executable, __file__, '--single', kind, '--arquivo', filename,
+                 '--unidades', str(args.unidades), '--cursos', str(args.cursos),
+                 '--disciplinas', str(args.disciplinas), '--por-curso', str(args.por_curso)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(out)
+            print(f"{kind:14s} {result['cursos']:7d} {result['tempo_s']:10.3f} {result['vivos_mb']:19.1f} "
+                  f"{result['acrescimo_rss_mb']:15.1f}")
+
+
+if __name__ == "__main__":
+    main()
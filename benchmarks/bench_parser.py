@@ -0,0 +1,115 @@
+"""
+Compara os parsers de página de curso sobre um conjunto de páginas salvas.
+
+Para cada backend mede páginas/s e o pico de memória (RSS), cada um em um processo
+separado, e confere se os dicionários produzidos são idênticos aos da árvore completa
+com 'html.parser' (o comportamento original).
+
+Uso:
+    python benchmarks/bench_parser.py pasta_com_paginas_html
+    python benchmarks/bench_parser.py --sintetico 50
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_parser import PARSERS, SoupCourseParser, lxml
+
+BACKENDS = {
+    'html.parser (árvore completa)': lambda: SoupCourseParser(restrict=False),
+    'html.parser (só #step4/#gradeCurricular)': lambda: SoupCourseParser(restrict=True),
+}
+if lxml is not None:
+    BACKENDS['lxml'] = PARSERS['lxml']
+
+
+def synthetic_page(rng: random.Random, index: int) -> str:
+    """Gera uma página parecida com a do Júpiter Web, com conteúdo extra fora da grade."""
+    def row(code):
+        return (f'<tr><td><a class="disciplina" href="#">{code}</a></td><td>Disciplina {code}</td>'
+                f'<td>{rng.randint(0, 6)}</td><td>{rng.randint(0, 2)}</td><td>{rng.choice([30, 60, 90])}</td>'
+                f'<td></td><td></td><td></td></tr>')
+
+    rows = []
+    for title, size in (('Obrigatórias', 40), ('Optativas Eletivas', 30), ('Optativas Livres', 20)):
+        rows.append(f'<tr style="background-color: rgb(16, 148, 171);"><td colspan="8">Disciplinas {title}</td></tr>')
+        for period in range(size // 10):
+            rows.append(f'<tr style="color: rgb(235, 143, 0);"><td colspan="8">{period + 1}º Período Ideal</td></tr>')
+            rows.extend(row(f'MAC{rng.randint(0, 9999):04d}') for _ in range(10))
+    filler = ''.join(f'<div class="item"><span>Informação {i}</span><a href="#">link</a></div>' for i in range(1500))
+    return (
+        f'<html><head><title>Júpiter Web</title></head><body><div id="step1">{filler}</div>'
+        f'<div id="step4"><span class="curso">Curso {index} - integral</span>'
+        f'<span class="duridlhab">8</span><span class="durminhab">8</span><span class="durmaxhab">12</span></div>'
+        f'<div id="gradeCurricular"><table>{"".join(rows)}</table></div></body></html>'
+    )
+
+
+def load_pages(args) -> list:
+    if args.sintetico:
+        rng = random.Random(42)
+        return [synthetic_page(rng, i) for i in range(args.sintetico)]
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.pasta, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append(f.read())
+    return pages
+
+
+def run_single(backend: str, args):
+    """Executa um backend isolado e imprime o resultado em JSON (usado pelo processo pai)."""
+    pages = load_pages(args)
+    parser = BACKENDS[backend]()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    results = [parser.parse(page) for page in pages]
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'paginas_por_s': len(pages) / elapsed if elapsed else 0.0,
+        'tempo_s': elapsed,
+        'pico_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before,
+        'saida': json.dumps(results, ensure_ascii=False, sort_keys=False),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos parsers de página de curso.')
+    parser.add_argument('pasta', nargs='?', help='Pasta com páginas de curso salvas (*.html).')
+    parser.add_argument('--sintetico', type=int, default=0, help='Gera N páginas sintéticas em vez de ler uma pasta.')
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if not args.pasta and not args.sintetico:
+        parser.error('informe uma pasta de páginas ou --sintetico N')
+
+    if args.single:
+        run_single(args.single, args)
+        return
+
+    forwarded = [args.pasta] if args.pasta else ['--sintetico', str(args.sintetico)]
+    results = {}
+    for backend in BACKENDS:
+        out = subprocess.run(
+            [sys.executable, __file__, *forwarded, '--single', backend],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[backend] = json.loads(out)
+
+    reference = results['html.parser (árvore completa)']['saida']
+    print(f"{'backend':45s} {'páginas/s':>10s} {'tempo (s)':>10s} {'pico RSS (MB)':>14s}  saída idêntica")
+    for backend, result in results.items():
+        print(f"{backend:45s} {result['paginas_por_s']:10.1f} {result['tempo_s']:10.3f} "
+              f"{result['pico_rss_kb'] / 1024:14.1f}  {'sim' if result['saida'] == reference else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
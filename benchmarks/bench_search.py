@@ -0,0 +1,71 @@
+"""
+Mede a latência das buscas BUSCAR C / BUSCAR D sobre o índice invertido, comparando com a
+varredura linear de substrings usada antes, em um conjunto com nomes realistas.
+
+Uso:
+    python benchmarks/bench_search.py --disciplinas 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from common import synthetic_dataset
+
+from search_index import SearchIndex, normalize
+
+PALAVRAS = [
+    'Cálculo', 'Álgebra', 'Linear', 'Introdução', 'Computação', 'Física', 'Química', 'Orgânica',
+    'Estatística', 'Probabilidade', 'Economia', 'História', 'Direito', 'Civil', 'Penal', 'Processo',
+    'Engenharia', 'Materiais', 'Estruturas', 'Dados', 'Algoritmos', 'Programação', 'Sistemas',
+    'Operacionais', 'Redes', 'Biologia', 'Celular', 'Genética', 'Anatomia', 'Fisiologia', 'Ética',
+    'Filosofia', 'Literatura', 'Brasileira', 'Português', 'Psicologia', 'Geometria', 'Analítica',
+    'Termodinâmica', 'Eletromagnetismo', 'Mecânica', 'Clássica', 'Quântica', 'Laboratório', 'Tópicos',
+    'Avançados', 'Seminários', 'Pesquisa', 'Métodos', 'Numéricos', 'Otimização', 'Controle',
+]
+CONSULTAS = ['calculo', 'algebra linear', 'introd comp', 'ção', 'quantica', 'MAC0', 'termodin',
+             'topicos avancados', 'genet', 'xyzw']
+
+
+def realistic_names(dataset, rng: random.Random):
+    for disciplina in dataset[2].values():
+        words = rng.sample(PALAVRAS, rng.randint(2, 5))
+        disciplina.nome = f"{' '.join(words)} {rng.choice(['I', 'II', 'III', 'IV'])}"
+        disciplina.codigo = f"{rng.choice(['MAC', 'MAT', 'FIS', 'QBQ', 'DCV', 'PMR'])}{rng.randint(0, 9999):04d}"
+
+
+def timed(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do índice de busca.')
+    parser.add_argument('--disciplinas', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    dataset = synthetic_dataset(num_unidades=50, cursos_por_unidade=20, num_disciplinas=args.disciplinas)
+    realistic_names(dataset, rng)
+    disciplinas = list(dataset[2].values())
+
+    start = time.perf_counter()
+    index = SearchIndex(disciplinas, key=lambda d: f"{d.codigo} {d.nome}")
+    print(f"Índice de {len(index)} disciplinas montado em {time.perf_counter() - start:.2f} s\n")
+
+    print(f"{'consulta':20s} {'resultados':>10s} {'índice (ms)':>12s} {'varredura (ms)':>15s}")
+    for query in CONSULTAS:
+        found = index.search(query, 21)
+        indexed = timed(lambda: index.search(query, 21), args.repeticoes)
+        term = normalize(query)
+        scanned = timed(lambda: [d for d in disciplinas if term in normalize(d.nome)], 1)
+        print(f"{query:20s} {len(found):10d} {indexed:12.3f} {scanned:15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Mede o tempo de carregar os dados até o MenuHandler estar pronto, a partir do JSON e a
+partir do snapshot binário, e o custo da primeira consulta a uma disciplina.
+
+Cada medição roda em um processo separado (cache de objetos frio).
+
+Uso:
+    python benchmarks/bench_snapshot.py --escalas 1 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import peak_rss_mb, synthetic_dataset
+
+from menu import MenuHandler
+from snapshot import load_snapshot, save_snapshot
+from utils import load_data_from_json, save_data_to_json
+
+LOADERS = {
+    'json': ('json', load_data_from_json),
+    'snapshot': ('snap', load_snapshot),
+}
+
+
+def run_single(name: str, scale: int, directory: str):
+    ext, loader = LOADERS[name]
+    filename = os.path.join(directory, f"dados_{scale}.{ext}")
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    menu = MenuHandler(*loader(filename))
+    ready = time.perf_counter() - start
+
+    start = time.perf_counter()
+    menu.disciplinas_db.get('DSC00042')
+    first_query = time.perf_counter() - start
+
+    sys.stdout = stdout
+    print(json.dumps({'pronto_ms': ready * 1000, 'consulta_ms': first_query * 1000,
+                      'acrescimo_rss_mb': peak_rss_mb() - before}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de carga: JSON vs snapshot binário.')
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 4],
+                        help='Multiplicadores do conjunto base (20 unidades, 200 cursos, 5000 disciplinas).')
+    parser.add_argument('--single', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args.single[0], int(args.single[1]), args.single[2])
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        devnull = open(os.devnull, 'w')
+        print(f"{'formato':10s} {'escala':>6s} {'até o menu (ms)':>16s} {'1ª consulta (ms)':>17s} {'+pico RSS (MB)':>15s}")
+        for scale in args.escalas:
+            data = synthetic_dataset(num_unidades=20 * scale, cursos_por_unidade=10, num_disciplinas=5000 * scale)
+            stdout, sys.stdout = sys.stdout, devnull
+            save_data_to_json(*data, os.path.join(directory, f"dados_{scale}.json"))
+            sys.stdout = stdout
+            save_snapshot(*data, os.path.join(directory, f"dados_{scale}.snap"))
+
+            for name in LOADERS:
+                out = subprocess.run(
+                    [sys.executable, __file__, '--single', name, str(scale), directory],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                result = json.loads(out)
+                print(f"{name:10s} {scale:6d} {result['pronto_ms']:16.1f} {result['consulta_ms']:17.3f} "
+                      f"{result['acrescimo_rss_mb']:15.1f}")
+
+
+if __name__ == "__main__":
+    main()
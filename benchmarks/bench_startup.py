@@ -0,0 +1,105 @@
+"""
+Mede a inicialização do caminho de consulta: `main.py` carregando um arquivo de dados já
+salvo, sem coleta. Executa o programa em processos novos (em modo lote, com uma lista de
+comandos vazia), reporta a mediana do tempo total e, com `-X importtime`, os módulos mais
+caros de importar.
+
+Falha (código de saída 1) se a mediana passar do orçamento ou se algum módulo pesado for
+importado na abertura, para que o teste possa rodar na integração contínua.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --dados usp_data.json --orcamento-ms 300
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from common import ROOT, synthetic_dataset
+
+from utils import save_data
+
+DEFAULT_BUDGET_MS = 300
+# Módulos que não podem ser importados só para abrir os dados: os da coleta e o NumPy,
+# usado apenas por STATS, SIMILARES e PARES.
+HEAVY_MODULES = ('selenium', 'webdriver_manager', 'bs4', 'lxml', 'aiohttp', 'numpy')
+
+
+def query_command(data_file: str, importtime: bool = False) -> List[str]:
+    flags = ['-X', 'importtime'] if importtime else []
+    return [sys.executable, *flags, os.path.join(ROOT, 'main.py'), '--data-file', data_file, '--batch', os.devnull]
+
+
+def wall_clock_ms(data_file: str, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(query_command(data_file), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def import_times(data_file: str) -> Dict[str, Tuple[int, int]]:
+    """Tempo próprio e acumulado (µs) de cada módulo importado, lidos da saída de -X importtime."""
+    result = subprocess.run(query_command(data_file, importtime=True), check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da inicialização do menu de consulta.')
+    parser.add_argument('--dados', default=None,
+                        help='Arquivo de dados a carregar (padrão: conjunto sintético gerado em uma pasta temporária).')
+    parser.add_argument('--repeticoes', type=int, default=7)
+    parser.add_argument('--orcamento-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f'Mediana máxima aceitável, em ms (padrão: {DEFAULT_BUDGET_MS}).')
+    parser.add_argument('--top', type=int, default=10, help='Quantos módulos mais caros listar.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = args.dados
+        if data_file is None:
+            data_file = os.path.join(tmp, 'dados.json')
+            with contextlib.redirect_stdout(io.StringIO()):
+                save_data(*synthetic_dataset(), data_file)
+        # A primeira execução grava o snapshot binário usado pelas seguintes.
+        subprocess.run(query_command(data_file) + ['--snapshot'], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        samples = wall_clock_ms(data_file, args.repeticoes)
+        times = import_times(data_file)
+
+    median = statistics.median(samples)
+    print(f"Inicialização (mediana de {len(samples)}): {median:.0f} ms "
+          f"(mín. {min(samples):.0f}, máx. {max(samples):.0f}; orçamento {args.orcamento_ms:.0f} ms)")
+
+    top_level = {name: t for name, t in times.items() if '.' not in name}
+    print(f"\n{'módulo':28s} {'acumulado (ms)':>15s}")
+    for name, (_, cumulative) in sorted(top_level.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{name:28s} {cumulative / 1000:15.1f}")
+
+    failures = []
+    imported = sorted({name.split('.')[0] for name in times} & set(HEAVY_MODULES))
+    if imported:
+        failures.append(f"módulos pesados importados na abertura: {', '.join(imported)}")
+    if median > args.orcamento_ms:
+        failures.append(f"mediana de {median:.0f} ms acima do orçamento de {args.orcamento_ms:.0f} ms")
+    for failure in failures:
+        print(f"\nFALHA: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compara o caminho original de gravação/leitura de usp_data.json (um dicionário gigante
+com json.dump/json.load) com a escrita em streaming e com o formato JSON Lines.
+
+Cada operação roda em um processo separado e reporta o tempo, o tamanho do arquivo e
+o acréscimo no pico de RSS causado pela operação. Várias escalas são medidas para
+mostrar como o pico cresce com o tamanho dos dados.
+
+Uso:
+    python benchmarks/bench_storage.py --escalas 1 2 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import peak_rss_mb, synthetic_dataset
+
+from utils import load_data_from_json, load_data_from_jsonl, save_data_to_json, save_data_to_jsonl
+
+
+def legacy_save(unidades, cursos, disciplinas, filename):
+    """Gravação como era feita antes: monta o documento inteiro e chama json.dump."""
+    data = {
+        'unidades': [u.to_dict() for u in unidades],
+        'cursos': [c.to_dict() for c in cursos],
+        'disciplinas': {cod: d.to_dict() for cod, d in disciplinas.items()}
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+OPERATIONS = {
+    'gravar json (original)': ('save', 'json', legacy_save),
+    'gravar json (streaming)': ('save', 'json', save_data_to_json),
+    'gravar json compacto': ('save', 'min.json', lambda *a: save_data_to_json(*a, compact=True)),
+    'gravar jsonl': ('save', 'jsonl', save_data_to_jsonl),
+    'ler json': ('load', 'json', load_data_from_json),
+    'ler json compacto': ('load', 'min.json', load_data_from_json),
+    'ler jsonl': ('load', 'jsonl', load_data_from_jsonl),
+}
+
+
+def dataset_for(scale: int):
+    return synthetic_dataset(num_unidades=20 * scale, cursos_por_unidade=10, num_disciplinas=5000 * scale)
+
+
+def run_single(name: str, scale: int, directory: str):
+    kind, ext, func = OPERATIONS[name]
+    filename = os.path.join(directory, f"dados_{scale}.{ext}")
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+
+    if kind == 'save':
+        data = dataset_for(scale)
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        func(*data, filename)
+    else:
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        func(filename)
+    elapsed = time.perf_counter() - start
+
+    sys.stdout = stdout
+    print(json.dumps({
+        'tempo_s': elapsed,
+        'acrescimo_rss_mb': peak_rss_mb() - before,
+        'tamanho_mb': os.path.getsize(filename) / 2**20,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de gravação e leitura dos dados.')
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 2, 4],
+                        help='Multiplicadores do conjunto base (20 unidades, 200 cursos, 5000 disciplinas).')
+    parser.add_argument('--single', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args.single[0], int(args.single[1]), args.single[2])
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'operação':26s} {'escala':>6s} {'tempo (s)':>10s} {'arquivo (MB)':>13s} {'+pico RSS (MB)':>15s}")
+        for scale in args.escalas:
+            for name in OPERATIONS:
+                out = subprocess.run(
+                    [sys.executable, __file__, '--single', name, str(scale), directory],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                result = json.loads(out)
+                print(f"{name:26s} {scale:6d} {result['tempo_s']:10.3f} {result['tamanho_mb']:13.1f} "
+                      f"{result['acrescimo_rss_mb']:15.1f}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Funções auxiliares compartilhadas pelos benchmarks."""
+import os
+import random
+import resource
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from data_models import Unidade, Curso, Disciplina
+
+
+def peak_rss_mb() -> float:
+    """Pico de memória residente do processo atual, em MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_dataset(
+    num_unidades: int = 20,
+    cursos_por_unidade: int = 10,
+    num_disciplinas: int = 5000,
+    disciplinas_por_curso: int = 60,
+    seed: int = 42
+) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+    """Monta um conjunto de dados no mesmo formato produzido pelo coletor."""
+    rng = random.Random(seed)
+    disciplinas = {}
+    for i in range(num_disciplinas):
+        codigo = f"DSC{i:05d}"
+        disciplina = Disciplina(codigo, f"Disciplina Sintética {i}")
+        disciplina.creditos_aula = rng.randint(0, 6)
+        disciplina.creditos_trabalho = rng.randint(0, 2)
+        disciplina.carga_horaria = rng.choice([30, 45, 60, 90, 120])
+        disciplinas[codigo] = disciplina
+    codigos = list(disciplinas)
+
+    unidades, cursos = [], []
+    for u in range(num_unidades):
+        unidade = Unidade(f"Unidade Sintética {u} - ( US{u} )")
+        for c in range(cursos_por_unidade):
+            curso = Curso(f"Curso Sintético {u}.{c} - integral", unidade.nome)
+            curso.duracao_ideal = rng.choice([8, 10, 12])
+            curso.duracao_minima = curso.duracao_ideal
+            curso.duracao_maxima = curso.duracao_ideal + 6
+            escolhidas = rng.sample(codigos, min(disciplinas_por_curso, len(codigos)))
+            terco = len(escolhidas) // 3
+            for disc_type, fatia in (('obrigatorias', escolhidas[:terco * 2]),
+                                     ('optativas_eletivas', escolhidas[terco * 2:terco * 2 + terco // 2]),
+                                     ('optativas_livres', escolhidas[terco * 2 + terco // 2:])):
+                for codigo in fatia:
+                    getattr(curso, disc_type).append(disciplinas[codigo])
+                    disciplinas[codigo].cursos.add(curso.nome)
+            unidade.cursos.append(curso)
+            cursos.append(curso)
+        unidades.append(unidade)
+    return unidades, cursos, disciplinas
@@ -0,0 +1,148 @@
+"""
+Gerador de conjuntos de dados sintéticos no mesmo formato produzido pelo coletor, com
+nomes parecidos com os reais (acentos, siglas, turnos, numeração de disciplinas).
+
+A escala é configurável (unidades, cursos por unidade, disciplinas, disciplinas por curso)
+e `compartilhamento` controla quanto as grades se sobrepõem: com 0 cada curso usa só
+disciplinas da própria unidade; com 1 todas vêm de um catálogo comum a todas as unidades.
+
+Uso:
+    python benchmarks/generate_dataset.py dados.json --unidades 48 --cursos 8 --disciplinas 20000
+    python benchmarks/generate_dataset.py dados.db --compartilhamento 0.5
+"""
+import argparse
+import random
+from typing import Dict, List, Tuple
+
+from common import ROOT  # noqa: F401 (coloca a raiz do projeto no sys.path)
+
+from data_models import Unidade, Curso, Disciplina
+
+PALAVRAS = [
+    'Cálculo', 'Álgebra', 'Linear', 'Introdução', 'Computação', 'Física', 'Química', 'Orgânica',
+    'Estatística', 'Probabilidade', 'Economia', 'História', 'Direito', 'Civil', 'Penal', 'Processo',
+    'Engenharia', 'Materiais', 'Estruturas', 'Dados', 'Algoritmos', 'Programação', 'Sistemas',
+    'Operacionais', 'Redes', 'Biologia', 'Celular', 'Genética', 'Anatomia', 'Fisiologia', 'Ética',
+    'Filosofia', 'Literatura', 'Brasileira', 'Português', 'Psicologia', 'Geometria', 'Analítica',
+    'Termodinâmica', 'Eletromagnetismo', 'Mecânica', 'Clássica', 'Quântica', 'Laboratório', 'Tópicos',
+    'Avançados', 'Seminários', 'Pesquisa', 'Métodos', 'Numéricos', 'Otimização', 'Controle',
+]
+TIPOS_UNIDADE = ['Instituto de', 'Faculdade de', 'Escola de']
+TIPOS_CURSO = ['Bacharelado em', 'Licenciatura em', 'Engenharia de', 'Curso Superior de']
+TURNOS = ['integral', 'diurno', 'noturno', 'matutino', 'vespertino']
+NUMERAIS = ['I', 'II', 'III', 'IV']
+
+
+def _sigla(palavras: List[str], usadas: set) -> str:
+    base = ''.join(p[0] for p in palavras).upper()
+    sigla, n = base, 1
+    while sigla in usadas:
+        n += 1
+        sigla = f"{base}{n}"
+    usadas.add(sigla)
+    return sigla
+
+
+def generate_dataset(
+    num_unidades: int = 48,
+    cursos_por_unidade: int = 8,
+    num_disciplinas: int = 20000,
+    disciplinas_por_curso: int = 60,
+    compartilhamento: float = 0.3,
+    seed: int = 42
+) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+    """Monta unidades, cursos e disciplinas ligados entre si como na coleta real."""
+    rng = random.Random(seed)
+
+    disciplinas: Dict[str, Disciplina] = {}
+    prefixos = sorted({''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(3)) for _ in range(200)})
+    while len(disciplinas) < num_disciplinas:
+        codigo = f"{rng.choice(prefixos)}{rng.randint(0, 9999):04d}"
+        if codigo in disciplinas:
+            continue
+        nome = ' '.join(rng.sample(PALAVRAS, rng.randint(2, 4)))
+        if rng.random() < 0.4:
+            nome += f" {rng.choice(NUMERAIS)}"
+        disciplina = Disciplina(codigo, nome)
+        disciplina.creditos_aula = rng.choice([0, 2, 2, 4, 4, 4, 6])
+        disciplina.creditos_trabalho = rng.choice([0, 0, 0, 1, 2])
+        disciplina.carga_horaria = 15 * (disciplina.creditos_aula + 2 * disciplina.creditos_trabalho) or 30
+        disciplina.carga_estagio = rng.choice([0] * 9 + [120])
+        disciplina.carga_praticas = rng.choice([0] * 4 + [30])
+        disciplinas[codigo] = disciplina
+
+    # Parte do catálogo é comum a todas as unidades; o resto é dividido entre elas.
+    codigos = list(disciplinas)
+    rng.shuffle(codigos)
+    num_comuns = max(1, int(len(codigos) * compartilhamento)) if compartilhamento > 0 else 0
+    comuns = codigos[:num_comuns]
+    proprias = codigos[num_comuns:]
+    por_unidade = [proprias[i::num_unidades] for i in range(num_unidades)]
+
+    unidades, cursos, siglas = [], [], set()
+    for u in range(num_unidades):
+        palavras = rng.sample(PALAVRAS, rng.randint(1, 3))
+        unidade = Unidade(f"{rng.choice(TIPOS_UNIDADE)} {' e '.join(palavras)} - ( {_sigla(palavras, siglas)} )")
+        nomes_cursos = set()
+        for _ in range(cursos_por_unidade):
+            nome = f"{rng.choice(TIPOS_CURSO)} {' '.join(rng.sample(PALAVRAS, rng.randint(1, 2)))} - {rng.choice(TURNOS)}"
+            if nome in nomes_cursos:
+                continue
+            nomes_cursos.add(nome)
+            curso = Curso(nome, unidade.nome)
+            curso.duracao_ideal = rng.choice([8, 8, 10, 10, 12])
+            curso.duracao_minima = curso.duracao_ideal - rng.choice([0, 0, 2])
+            curso.duracao_maxima = curso.duracao_ideal + rng.choice([4, 6, 8])
+
+            num_comuns_curso = round(disciplinas_por_curso * compartilhamento) if comuns else 0
+            escolhidas = rng.sample(comuns, min(num_comuns_curso, len(comuns)))
+            locais = por_unidade[u] or comuns
+            escolhidas += rng.sample(locais, min(disciplinas_por_curso - len(escolhidas), len(locais)))
+            escolhidas = list(dict.fromkeys(escolhidas))
+
+            terco = len(escolhidas) // 3
+            for disc_type, fatia in (('obrigatorias', escolhidas[:terco * 2]),
+                                     ('optativas_eletivas', escolhidas[terco * 2:terco * 2 + terco // 2]),
+                                     ('optativas_livres', escolhidas[terco * 2 + terco // 2:])):
+                for codigo in fatia:
+                    getattr(curso, disc_type).append(disciplinas[codigo])
+                    disciplinas[codigo].cursos.add(curso.nome)
+            unidade.cursos.append(curso)
+            cursos.append(curso)
+        unidades.append(unidade)
+
+    # Como no coletor, só ficam as disciplinas que aparecem em algum curso.
+    disciplinas = {codigo: d for codigo, d in disciplinas.items() if d.cursos}
+    return unidades, cursos, disciplinas
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--unidades', type=int, default=48)
+    parser.add_argument('--cursos', type=int, default=8, help='Cursos por unidade.')
+    parser.add_argument('--disciplinas', type=int, default=20000, help='Tamanho do catálogo de disciplinas.')
+    parser.add_argument('--por-curso', type=int, default=60, help='Disciplinas por curso.')
+    parser.add_argument('--compartilhamento', type=float, default=0.3,
+                        help='Fração (0 a 1) das disciplinas de cada curso vinda do catálogo comum.')
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def dataset_from_args(args):
+    return generate_dataset(args.unidades, args.cursos, args.disciplinas, args.por_curso,
+                            args.compartilhamento, args.seed)
+
+
+def main():
+    from utils import save_data
+
+    parser = argparse.ArgumentParser(description='Gera um conjunto de dados sintético no formato do coletor.')
+    parser.add_argument('destino', help='Arquivo de saída; a extensão define o formato (.json, .jsonl, .snap, .db).')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    unidades, cursos, disciplinas = dataset_from_args(args)
+    save_data(unidades, cursos, disciplinas, args.destino)
+    print(f"{len(unidades)} unidades, {len(cursos)} cursos, {len(disciplinas)} disciplinas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Teste de carga do serviço de consultas (query_server.py).
+
+Dispara requisições concorrentes com uma mistura de consultas quentes (sempre as mesmas,
+servidas pelo cache) e frias (buscas e disciplinas variadas e, com --pesadas, consultas
+caras como PARES e FILTRAR com parâmetros que nunca se repetem) e reporta a latência
+p50/p99 de cada tipo e as requisições por segundo. A latência das quentes mostra se as
+consultas pesadas estão bloqueando as respostas que já estão em cache. Sem --url, gera um
+conjunto sintético, sobe o serviço em um processo separado e o encerra no final.
+
+Uso:
+    python benchmarks/load_test.py --requisicoes 5000 --concorrencia 32
+    python benchmarks/load_test.py --url http://localhost:8080
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import aiohttp
+
+from common import ROOT, synthetic_dataset
+
+from utils import save_data_to_json
+
+HOT_PATHS = ['/unidades', '/unidades/US1', '/unidades/US2/cursos/3', '/stats', '/disciplinas/comuns']
+
+
+def request_paths(rng: random.Random, total: int, num_unidades: int, num_disciplinas: int, hot_ratio: float,
+                  heavy_ratio: float = 0.0):
+    """Gera pares (tipo, caminho), com tipo 'quente', 'fria' ou 'pesada'."""
+    heavy = 0
+    for _ in range(total):
+        draw = rng.random()
+        if draw < hot_ratio:
+            yield 'quente', rng.choice(HOT_PATHS)
+            continue
+        if draw < hot_ratio + heavy_ratio:
+            # Parâmetros sempre novos, para que nenhuma consulta pesada saia do cache.
+            heavy += 1
+            if heavy % 2:
+                yield 'pesada', f"/cursos/pares?k={heavy}"
+            else:
+                yield 'pesada', f"/filtro/disciplinas?q=carga_horaria<{heavy}"
+            continue
+        kind = rng.randrange(4)
+        if kind == 0:
+            yield 'fria', f"/disciplinas/DSC{rng.randrange(num_disciplinas):05d}"
+        elif kind == 1:
+            yield 'fria', f"/unidades/US{rng.randrange(num_unidades)}/cursos/{rng.randint(1, 10)}/disciplinas"
+        elif kind == 2:
+            yield 'fria', f"/busca/disciplinas?q=sint {rng.randrange(num_disciplinas)}"
+        else:
+            yield 'fria', f"/busca/cursos?q={rng.randrange(num_unidades)}.{rng.randrange(10)}"
+
+
+async def run_load(base_url: str, paths, concurrency: int):
+    latencies: Dict[str, List[float]] = {}
+    errors = 0
+    queue = asyncio.Queue()
+    for entry in paths:
+        queue.put_nowait(entry)
+
+    async def worker(session):
+        nonlocal errors
+        while not queue.empty():
+            kind, path = queue.get_nowait()
+            start = time.perf_counter()
+            async with session.get(base_url + path) as response:
+                await response.read()
+                if response.status >= 500:
+                    errors += 1
+            latencies.setdefault(kind, []).append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(directory: str, num_unidades: int, num_disciplinas: int):
+    filename = os.path.join(directory, 'dados.json')
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+    save_data_to_json(*synthetic_dataset(num_unidades, 10, num_disciplinas), filename)
+    sys.stdout = stdout
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'main.py'), '--data-file', filename, '--serve', '--port', str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(600):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga do serviço de consultas.')
+    parser.add_argument('--url', help='Endereço de um serviço já em execução.')
+    parser.add_argument('--requisicoes', type=int, default=5000)
+    parser.add_argument('--concorrencia', type=int, default=32)
+    parser.add_argument('--quentes', type=float, default=0.8, help='Fração de consultas repetidas (padrão: 0.8).')
+    parser.add_argument('--pesadas', type=float, default=0.02,
+                        help='Fração de consultas pesadas sempre novas (PARES, FILTRAR; padrão: 0.02).')
+    parser.add_argument('--unidades', type=int, default=20)
+    parser.add_argument('--disciplinas', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        process = None
+        base_url = args.url
+        if base_url is None:
+            process, base_url = start_server(directory, args.unidades, args.disciplinas)
+        try:
+            paths = list(request_paths(random.Random(1), args.requisicoes, args.unidades, args.disciplinas,
+                                       args.quentes, args.pesadas))
+            latencies, errors, elapsed = asyncio.run(run_load(base_url.rstrip('/'), paths, args.concorrencia))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"Requisições: {total} ({errors} com erro), concorrência {args.concorrencia}")
+    print(f"Vazão: {total / elapsed:.0f} req/s")
+    todas = [latency for values in latencies.values() for latency in values]
+    for kind, values in [('todas', todas)] + sorted(latencies.items()):
+        print(f"Latência {kind:7s} ({len(values):5d}): p50 {percentile(values, 0.50) * 1000:8.2f} ms, "
+              f"p99 {percentile(values, 0.99) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
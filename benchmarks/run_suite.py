@@ -0,0 +1,162 @@
+"""
+Suíte de benchmarks de ponta a ponta sobre um conjunto gerado por generate_dataset.py.
+
+Mede load_data_from_json, save_data_to_json, MenuHandler.__init__, cada comando do menu
+e o filtro de unidades do main.py, e grava o resultado em JSON (mediana e mínimo de cada
+medida, mais os parâmetros do conjunto) para comparar execuções. Os comandos são medidos
+duas vezes: a primeira chamada num menu recém-criado (`frio`, que inclui índices montados
+sob demanda) e as repetições seguintes (`quente`).
+
+Uso:
+    python benchmarks/run_suite.py --saida base.json
+    python benchmarks/run_suite.py --saida novo.json --comparar base.json
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from generate_dataset import add_arguments, dataset_from_args
+
+from menu import MenuHandler
+from utils import filter_units, load_data_from_json, save_data_to_json
+
+# Variação (em %) a partir da qual --comparar destaca uma medida.
+LIMIAR_REGRESSAO = 10.0
+
+
+@contextlib.contextmanager
+def _quiet():
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def measure(func: Callable, repeat: int, setup: Optional[Callable] = None) -> List[float]:
+    """Tempos (ms) de `repeat` execuções de `func`; `setup` roda antes de cada uma, fora da medida."""
+    samples = []
+    with _quiet():
+        for _ in range(repeat):
+            arg = setup() if setup else None
+            start = time.perf_counter()
+            func(arg) if setup else func()
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def result(nome: str, samples: List[float]) -> Dict:
+    return {
+        'nome': nome,
+        'mediana_ms': round(statistics.median(samples), 4),
+        'min_ms': round(min(samples), 4),
+        'repeticoes': len(samples),
+    }
+
+
+def menu_commands(unidades, disciplinas) -> List[str]:
+    """Um comando de cada tipo, com argumentos que existem no conjunto gerado."""
+    unidade = unidades[len(unidades) // 2]
+    sigla = unidade.nome.rsplit('( ', 1)[-1].rstrip(' )')
+    disciplina = next(iter(disciplinas.values()))
+    termo = disciplina.nome.split()[0]
+    return [
+        'U', f'U {sigla}', 'C', f'C {sigla} 1', f'DC {sigla} 1',
+        f'D {disciplina.codigo}', f'D {disciplina.nome}', 'D COMUM',
+        f'BUSCAR C {unidade.cursos[0].nome.split()[-3]}', f'BUSCAR D {termo}', f'BUSCAR D {termo} i',
+        'FILTRAR D creditos_aula=4..6 carga_horaria>60', f'FILTRAR D unidade={sigla} carga_horaria<=60',
+        'FILTRAR C duracao_ideal<=8',
+        'STATS', f'SIMILARES {sigla} 1', 'PARES',
+    ]
+
+
+def run_suite(args) -> Dict:
+    with _quiet():
+        data = dataset_from_args(args)
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'dados.json')
+        resultados.append(result('save_data_to_json', measure(lambda: save_data_to_json(*data, filename), args.repeticoes_io)))
+        resultados.append(result('load_data_from_json', measure(lambda: load_data_from_json(filename), args.repeticoes_io)))
+
+        with _quiet():
+            loaded = load_data_from_json(filename)
+        resultados.append(result('MenuHandler.__init__', measure(lambda: MenuHandler(*loaded), args.repeticoes_io)))
+
+        # O filtro restringe os conjuntos de cursos das disciplinas, então cada execução usa
+        # uma cópia recém-carregada dos dados.
+        metade = max(1, len(loaded[0]) // 2)
+        resultados.append(result(
+            f'filter_units ({metade} unidades)',
+            measure(lambda d: filter_units(*d, metade), args.repeticoes_io, setup=lambda: load_data_from_json(filename))
+        ))
+
+    for comando in menu_commands(loaded[0], loaded[2]):
+        frio = measure(lambda menu: menu.execute(comando), args.repeticoes_io, setup=lambda: MenuHandler(*loaded))
+        resultados.append(result(f'{comando} [frio]', frio))
+        menu = MenuHandler(*loaded)
+        with _quiet():
+            menu.execute(comando)
+        resultados.append(result(f'{comando} [quente]', measure(lambda: menu.execute(comando), args.repeticoes)))
+
+    return {
+        'meta': {
+            'data': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'parametros': {
+                'unidades': args.unidades, 'cursos_por_unidade': args.cursos, 'disciplinas': args.disciplinas,
+                'disciplinas_por_curso': args.por_curso, 'compartilhamento': args.compartilhamento, 'seed': args.seed,
+            },
+            'tamanho': {'unidades': len(loaded[0]), 'cursos': len(loaded[1]), 'disciplinas': len(loaded[2])},
+        },
+        'resultados': resultados,
+    }
+
+
+def compare(atual: Dict, anterior: Dict):
+    """Imprime a variação da mediana de cada medida presente nas duas execuções."""
+    if atual['meta']['parametros'] != anterior['meta']['parametros']:
+        print("Aviso: os parâmetros do conjunto de dados diferem entre as execuções.")
+    antes = {r['nome']: r['mediana_ms'] for r in anterior['resultados']}
+    print(f"{'medida':40s} {'antes (ms)':>11s} {'agora (ms)':>11s} {'variação':>9s}")
+    for r in atual['resultados']:
+        if r['nome'] not in antes:
+            continue
+        anterior_ms, atual_ms = antes[r['nome']], r['mediana_ms']
+        variacao = (atual_ms - anterior_ms) / anterior_ms * 100 if anterior_ms else 0.0
+        marca = '  <-' if variacao > LIMIAR_REGRESSAO else ''
+        print(f"{r['nome'][:40]:40s} {anterior_ms:11.4f} {atual_ms:11.4f} {variacao:+8.1f}%{marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suíte de benchmarks de ponta a ponta.')
+    add_arguments(parser)
+    parser.add_argument('--repeticoes', type=int, default=50, help='Repetições dos comandos quentes.')
+    parser.add_argument('--repeticoes-io', type=int, default=5,
+                        help='Repetições de leitura, escrita, construção do menu e comandos frios.')
+    parser.add_argument('--saida', help='Arquivo JSON onde gravar os resultados.')
+    parser.add_argument('--comparar', help='Resultados de uma execução anterior para comparação.')
+    args = parser.parse_args()
+
+    resultados = run_suite(args)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            compare(resultados, json.load(f))
+    else:
+        json.dump(resultados['resultados'], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+class CheckpointJournal:
+    """
+    Journal em JSON Lines com os cursos e unidades concluídos durante a coleta.
+
+    Cada curso é gravado assim que termina, junto com o hash do conteúdo da sua grade.
+    Com `resume=True` o journal existente é continuado e o trabalho já registrado é
+    pulado; caso contrário ele é recomeçado, e os registros da execução anterior ficam
+    disponíveis (com `incremental=True`) para reaproveitar cursos cujo hash não mudou.
+
+    Ao recomeçar, o journal anterior é movido para `previous_file` em vez de apagado e só
+    é removido por `finish()`, quando a coleta termina: se ela for interrompida, a base de
+    comparação continua lá para o --resume (os registros desta execução valem por cima).
+
+    O hash depende do que cada coletor lê da página (a resposta inteira no backend http, a
+    grade lida pelo navegador ou o JSON do modo 'script'), então só é comparado entre
+    registros do mesmo `modo`; os de outro modo são ignorados, com um aviso.
+    """
+    def __init__(self, filename: str, resume: bool = False, incremental: bool = False, modo: Optional[str] = None):
+        self.filename = filename
+        base, ext = os.path.splitext(filename)
+        self.previous_file = f"{base}.anterior{ext}"
+        self.modo = modo
+        self._lock = threading.Lock()
+        self._courses: Dict[Tuple[str, str], Dict] = {}
+        self._units: Dict[str, Dict] = {}
+        self._previous: Dict[Tuple[str, str], Dict] = {}
+
+        records = self._read(filename)
+        if resume:
+            for record in records:
+                self._index(record)
+            baseline = self._read(self.previous_file)
+        else:
+            baseline = self._keep_previous(records)
+        if incremental:
+            self._previous = {
+                (r['unidade'], r['curso']): r for r in baseline
+                if r.get('tipo') == 'curso' and r.get('modo') == modo
+            }
+            ignored = {
+                (r['unidade'], r['curso']) for r in baseline if r.get('tipo') == 'curso' and r.get('modo') != modo
+            } - set(self._previous)
+            if ignored:
+                print(f"AVISO: {len(ignored)} cursos do checkpoint foram coletados em outro modo (backend ou "
+                      f"--extraction) e serão processados de novo.")
+
+        self._file = open(filename, 'a' if resume else 'w', encoding='utf-8')
+
+    def _keep_previous(self, records: List[Dict]) -> List[Dict]:
+        """
+        Guarda os registros do journal atual em `previous_file` antes de recomeçá-lo e
+        devolve a base de comparação. Se uma execução anterior foi interrompida, a base dela
+        é mantida e completada com o que aquela execução chegou a gravar.
+        """
+        baseline = self._read(self.previous_file)
+        if not records:
+            return baseline
+        if baseline:
+            baseline += records
+            temp_file = self.previous_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                for record in baseline:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            os.replace(temp_file, self.previous_file)
+        else:
+            os.replace(self.filename, self.previous_file)
+            baseline = records
+        return baseline
+
+    @staticmethod
+    def _read(filename: str) -> List[Dict]:
+        if not os.path.exists(filename):
+            return []
+        records = []
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Linha incompleta gravada durante uma interrupção.
+                    continue
+        return records
+
+    def _index(self, record: Dict):
+        if record.get('tipo') == 'curso':
+            self._courses[(record['unidade'], record['curso'])] = record
+        elif record.get('tipo') == 'unidade':
+            self._units[record['unidade']] = record
+
+    def _append(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._index(record)
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def completed_course(self, unit_code: str, course_code: str) -> Optional[Dict]:
+        """Retorna o registro de um curso já concluído nesta coleta, se houver."""
+        return self._courses.get((unit_code, course_code))
+
+    def unchanged_course(self, unit_code: str, course_code: str, content_hash: str) -> Optional[Dict]:
+        """Retorna o registro da coleta anterior se a grade do curso não mudou desde então."""
+        record = self._previous.get((unit_code, course_code))
+        if record is not None and record['hash'] == content_hash:
+            return record
+        return None
+
+    def completed_unit(self, unit_code: str) -> Optional[Dict]:
+        """Retorna o registro de uma unidade já concluída nesta coleta, se houver."""
+        return self._units.get(unit_code)
+
+    def record_course(self, unit_code: str, course_code: str, content_hash: Optional[str], course_data: Dict):
+        self._append({
+            'tipo': 'curso', 'unidade': unit_code, 'curso': course_code,
+            'modo': self.modo, 'hash': content_hash, 'dados': course_data
+        })
+
+    def record_unit(self, unit_code: str, unit_name: str, course_codes: List[str]):
+        self._append({'tipo': 'unidade', 'unidade': unit_code, 'nome': unit_name, 'cursos': course_codes})
+
+    def finish(self):
+        """Marca a coleta como concluída: a base de comparação anterior deixa de ser necessária."""
+        if os.path.exists(self.previous_file):
+            os.remove(self.previous_file)
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,194 @@
+import hashlib
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from checkpoint import CheckpointJournal
+from crawl_metrics import CrawlMetrics
+from course_parser import DISCIPLINE_FIELDS, CourseParser, get_parser
+from data_models import Unidade, Curso, Disciplina
+from sqlite_store import SQLiteStore
+
+if TYPE_CHECKING:
+    from page_cache import PageCache
+
+class BaseCollector:
+    """Lógica de parsing e montagem dos objetos compartilhada pelos coletores."""
+
+    BASE_URL = "https://uspdigital.usp.br/jupiterweb/jupCarreira.jsp?codmnu=8275"
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+    DISCIPLINE_LISTS = ('obrigatorias', 'optativas_livres', 'optativas_eletivas')
+    DISCIPLINE_FIELDS = DISCIPLINE_FIELDS
+
+    journal: Optional[CheckpointJournal] = None
+    store: Optional[SQLiteStore] = None
+    page_cache: Optional['PageCache'] = None
+    metrics: CrawlMetrics
+    metrics_file: Optional[str] = None
+    parser: CourseParser = get_parser()
+
+    def _get_or_create_discipline(self, disciplinas_db: Dict[str, Disciplina], codigo: str, nome: str) -> Disciplina:
+        """Retorna uma disciplina existente do banco de dados ou cria uma nova."""
+        if codigo not in disciplinas_db:
+            disciplinas_db[codigo] = Disciplina(codigo, nome)
+        return disciplinas_db[codigo]
+        
+    def _extract_course_data(self, html: str, disciplinas_db: Dict[str, Disciplina]) -> Optional[Dict]:
+        """
+        Extrai os dados de uma página de curso e associa as disciplinas encontradas aos
+        objetos de `disciplinas_db` (criando-os quando necessário).
+        """
+        with self.metrics.phase('parsing'):
+            record = self.parser.parse(html)
+        if record is None:
+            return None
+        return self._restore_course(record, disciplinas_db)
+
+    def _build_course(self, parsed_data: Dict, unit_name: str) -> Curso:
+        """Cria o objeto Curso a partir dos dados extraídos e vincula suas disciplinas."""
+        curso_obj = Curso(parsed_data['nome'], unit_name)
+        curso_obj.duracao_ideal = parsed_data['duracao_ideal']
+        curso_obj.duracao_minima = parsed_data['duracao_minima']
+        curso_obj.duracao_maxima = parsed_data['duracao_maxima']
+
+        for disc_type in self.DISCIPLINE_LISTS:
+            for disc_obj in parsed_data[disc_type]:
+                getattr(curso_obj, disc_type).append(disc_obj)
+                disc_obj.cursos.add(curso_obj.nome)
+        return curso_obj
+
+    def _content_hash(self, *parts: str) -> str:
+        """Calcula o hash do conteúdo de uma grade, usado para detectar cursos inalterados."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _course_record(self, parsed_data: Dict) -> Dict:
+        """Converte os dados extraídos de um curso em um registro serializável para o journal."""
+        record = {k: parsed_data[k] for k in ('nome', 'duracao_ideal', 'duracao_minima', 'duracao_maxima')}
+        for disc_type in self.DISCIPLINE_LISTS:
+            record[disc_type] = [
+                dict({'codigo': d.codigo, 'nome': d.nome}, **{f: getattr(d, f) for f in self.DISCIPLINE_FIELDS})
+                for d in parsed_data[disc_type]
+            ]
+        return record
+
+    def _restore_course(self, record: Dict, disciplinas_db: Dict[str, Disciplina]) -> Dict:
+        """Reconstrói os dados de um curso a partir do journal, sem refazer o parsing da página."""
+        data = {k: record[k] for k in ('nome', 'duracao_ideal', 'duracao_minima', 'duracao_maxima')}
+        for disc_type in self.DISCIPLINE_LISTS:
+            data[disc_type] = []
+            for disc_data in record[disc_type]:
+                disciplina = self._get_or_create_discipline(disciplinas_db, disc_data['codigo'], disc_data['nome'])
+                for field in self.DISCIPLINE_FIELDS:
+                    setattr(disciplina, field, disc_data[field])
+                data[disc_type].append(disciplina)
+        return data
+
+    def _checkpointed_record(self, unit_code: str, course_code: str, content_hash: str = None) -> Optional[Dict]:
+        """
+        Retorna o registro de um curso, dispensando o parsing, quando ele já foi concluído nesta
+        coleta ou, dado o hash da grade, quando o conteúdo não mudou desde a coleta anterior.
+        """
+        if self.journal is None:
+            return None
+        record = self.journal.completed_course(unit_code, course_code)
+        if record is None and content_hash is not None:
+            record = self.journal.unchanged_course(unit_code, course_code, content_hash)
+            if record is not None:
+                self.journal.record_course(unit_code, course_code, content_hash, record['dados'])
+                self.metrics.count('curso_inalterado')
+        elif record is not None:
+            self.metrics.count('curso_do_checkpoint')
+        if record is None:
+            return None
+        return record['dados']
+
+    def _checkpointed_course(self, unit_code: str, course_code: str, disciplinas_db: Dict[str, Disciplina],
+                             content_hash: str = None) -> Optional[Dict]:
+        """Como `_checkpointed_record`, mas já com os objetos Disciplina de `disciplinas_db`."""
+        record = self._checkpointed_record(unit_code, course_code, content_hash)
+        if record is None:
+            return None
+        return self._restore_course(record, disciplinas_db)
+
+    def _checkpoint_course(self, unit_code: str, course_code: str, content_hash: Optional[str], parsed_data: Optional[Dict]):
+        if self.journal is not None and parsed_data:
+            self.journal.record_course(unit_code, course_code, content_hash, self._course_record(parsed_data))
+
+    def _checkpoint_unit(self, unit_data: Dict, course_codes: List[str]):
+        if self.journal is not None:
+            self.journal.record_unit(unit_data['codigo'], unit_data['nome'], course_codes)
+
+    def _cache_page(self, unit_code: str, course_code: str, content: str, formato: str = 'html'):
+        """Guarda a página baixada no cache de páginas, quando configurado, para um --reparse futuro."""
+        if self.page_cache is not None:
+            with self.metrics.phase('cache_paginas'):
+                self.page_cache.store_page(unit_code, course_code, content, formato)
+
+    def _cache_units(self, units: List[Dict]):
+        if self.page_cache is not None:
+            self.page_cache.record_units(units)
+
+    def _cache_unit(self, unit_data: Dict, course_codes: List[str]):
+        if self.page_cache is not None:
+            self.page_cache.record_unit(unit_data['codigo'], course_codes)
+
+    def _unit_finished(self, unidade_obj: Unidade):
+        """Grava a unidade recém-coletada no banco SQLite, quando configurado."""
+        if self.store is not None:
+            self.store.write_unit(unidade_obj)
+
+    def _report_metrics(self):
+        """Mostra o resumo dos tempos da coleta e grava o relatório completo, quando configurado."""
+        self.metrics.print_summary()
+        if self.metrics_file:
+            self.metrics.write(self.metrics_file)
+
+    def _restore_unit(self, unit_data: Dict, disciplinas_db: Dict[str, Disciplina]) -> Optional[Unidade]:
+        """Reconstrói uma unidade inteira a partir do journal, se ela já foi concluída nesta coleta."""
+        if self.journal is None:
+            return None
+        unit_record = self.journal.completed_unit(unit_data['codigo'])
+        if unit_record is None:
+            return None
+
+        unidade_obj = Unidade(unit_data['nome'])
+        for course_code in unit_record['cursos']:
+            parsed_data = self._checkpointed_course(unit_data['codigo'], course_code, disciplinas_db)
+            if parsed_data:
+                unidade_obj.cursos.append(self._build_course(parsed_data, unit_data['nome']))
+        return unidade_obj
+
+    @classmethod
+    def _merge_unit_results(
+        cls, results: List[Tuple[Optional[Unidade], Dict[str, Disciplina]]]
+    ) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+        """
+        Junta os resultados por unidade na ordem original, mantendo uma única Disciplina
+        por código. Os atributos seguem a última ocorrência (como na coleta sequencial) e
+        os conjuntos de cursos são unidos.
+        """
+        unidades_db: List[Unidade] = []
+        cursos_db: List[Curso] = []
+        disciplinas_db: Dict[str, Disciplina] = {}
+
+        for unidade_obj, unit_disciplinas in results:
+            if unidade_obj is None:
+                continue
+            for codigo, disciplina in unit_disciplinas.items():
+                merged = disciplinas_db.get(codigo)
+                if merged is None:
+                    disciplinas_db[codigo] = disciplina
+                    continue
+                for field in cls.DISCIPLINE_FIELDS:
+                    setattr(merged, field, getattr(disciplina, field))
+                merged.cursos.update(disciplina.cursos)
+
+            for curso_obj in unidade_obj.cursos:
+                for disc_type in cls.DISCIPLINE_LISTS:
+                    setattr(curso_obj, disc_type, [disciplinas_db[d.codigo] for d in getattr(curso_obj, disc_type)])
+                cursos_db.append(curso_obj)
+            unidades_db.append(unidade_obj)
+
+        return unidades_db, cursos_db, disciplinas_db
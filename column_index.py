@@ -0,0 +1,185 @@
+"""
+Índices das colunas numéricas usados pelo comando FILTRAR (créditos e cargas horárias das
+disciplinas, durações dos cursos).
+
+Cada coluna é guardada como o array dos itens ordenados pelo valor, ao lado do array dos
+valores já ordenados: os itens com valor em [mínimo, máximo] formam um trecho contíguo,
+achado com duas buscas binárias. O trecho vira um bitmap (um int do Python com um bit por
+item) e as condições de um filtro, inclusive a da unidade, são combinadas com AND entre
+os bitmaps. Os itens são numerados na ordem de exibição, então percorrer os bits ligados
+do resultado já devolve a listagem ordenada.
+
+Itens sem valor (None) ficam fora do índice da coluna: não satisfazem nenhuma condição
+sobre ela, em vez de serem tratados como 0.
+
+Nas colunas com poucos valores distintos (todas as do Júpiter Web) também é guardado o
+bitmap acumulado até cada valor; o bitmap de uma faixa sai de um XOR entre dois deles,
+sem percorrer os itens do trecho.
+
+Sintaxe das condições (separadas por espaço):
+    campo=4        campo=4..6      campo>60      campo>=60      campo<8      campo<=8
+    unidade=IME    (sigla ou nome da unidade, sem espaços)
+"""
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Generic, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# Acima deste número de valores distintos a coluna não guarda os bitmaps acumulados.
+PREFIX_BITMAP_MAX_VALUES = 64
+UNIT_FIELD = 'unidade'
+CONDITION_PATTERN = re.compile(r'^(\w+)(<=|>=|=|<|>)(\S+)$')
+OPERATOR_SPACING = re.compile(r'\s*(<=|>=|=|<|>)\s*')
+RANGE_PATTERN = re.compile(r'^(\d+)\.\.(\d+)$')
+# Posições dos bits ligados em cada valor de byte.
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+class FilterError(ValueError):
+    """Condição de filtro mal formada ou sobre um campo que não existe."""
+
+
+class Condicao(NamedTuple):
+    """Faixa fechada [minimo, maximo] de um campo; None deixa o lado em aberto."""
+    campo: str
+    minimo: Optional[int]
+    maximo: Optional[int]
+
+    def __str__(self) -> str:
+        if self.minimo == self.maximo:
+            return f"{self.campo}={self.minimo}"
+        if self.maximo is None:
+            return f"{self.campo}>={self.minimo}"
+        if self.minimo is None:
+            return f"{self.campo}<={self.maximo}"
+        return f"{self.campo}={self.minimo}..{self.maximo}"
+
+
+def _condition(campo: str, operador: str, valor: str) -> Condicao:
+    if operador == '=':
+        match = RANGE_PATTERN.match(valor)
+        if match:
+            minimo, maximo = int(match.group(1)), int(match.group(2))
+            if minimo > maximo:
+                raise FilterError(f"Faixa '{valor}' vazia em '{campo}': o mínimo é maior que o máximo.")
+            return Condicao(campo, minimo, maximo)
+    if not valor.isdigit():
+        raise FilterError(f"Valor '{valor}' inválido para '{campo}'. Use um número inteiro ou uma faixa como 4..6.")
+    n = int(valor)
+    return {
+        '=': Condicao(campo, n, n),
+        '>': Condicao(campo, n + 1, None),
+        '>=': Condicao(campo, n, None),
+        '<': Condicao(campo, None, n - 1),
+        '<=': Condicao(campo, None, n),
+    }[operador]
+
+
+def parse_conditions(args: str, campos: Sequence[str]) -> Tuple[List[Condicao], Optional[str]]:
+    """
+    Separa as condições de um filtro (ex.: 'creditos_aula=4..6 carga_horaria>60') e o valor
+    de `unidade=`, se houver. Os espaços em volta dos operadores são ignorados.
+    """
+    condicoes, unidade = [], None
+    for token in OPERATOR_SPACING.sub(r'\1', args.strip()).split():
+        match = CONDITION_PATTERN.match(token)
+        if not match:
+            raise FilterError(f"Condição '{token}' inválida. Use campo=N, campo=N..M, campo>N, campo>=N, campo<N ou campo<=N.")
+        campo, operador, valor = match.group(1).lower(), match.group(2), match.group(3)
+        if campo == UNIT_FIELD:
+            if operador != '=':
+                raise FilterError("A unidade só aceita '=' (ex.: unidade=IME).")
+            unidade = valor
+        elif campo in campos:
+            condicoes.append(_condition(campo, operador, valor))
+        else:
+            raise FilterError(f"Campo '{campo}' inválido. Campos: {', '.join(campos)}, {UNIT_FIELD}.")
+    return condicoes, unidade
+
+
+def ids_to_bitmap(ids: Iterable[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitmap_ids(bitmap: int) -> Iterator[int]:
+    """IDs dos bits ligados, em ordem crescente."""
+    for byte_index, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+        if byte:
+            base = byte_index << 3
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+
+def bitmap_count(bitmap: int) -> int:
+    return bin(bitmap).count('1')
+
+
+class ColumnIndex:
+    """Uma coluna inteira, com os IDs dos itens ordenados pelo valor (os sem valor ficam de fora)."""
+
+    def __init__(self, values: Sequence[Optional[int]]):
+        self.size = len(values)
+        order = sorted((i for i in range(self.size) if values[i] is not None), key=values.__getitem__)
+        self.ids = array('l', order)
+        self.values = array('q', [values[i] for i in order])
+        # Bitmap dos itens antes de cada posição do array ordenado em que o valor muda.
+        self._prefix: Optional[Dict[int, int]] = None
+        if len(set(self.values)) <= PREFIX_BITMAP_MAX_VALUES:
+            self._prefix = {0: 0}
+            bits = bytearray((self.size + 7) // 8)
+            start = 0
+            while start < len(self.values):
+                stop = bisect_right(self.values, self.values[start], start)
+                for i in self.ids[start:stop]:
+                    bits[i >> 3] |= 1 << (i & 7)
+                self._prefix[stop] = int.from_bytes(bits, 'little')
+                start = stop
+
+    def span(self, minimo: Optional[int], maximo: Optional[int]) -> Tuple[int, int]:
+        """Posições [início, fim) do array ordenado com valores na faixa."""
+        start = 0 if minimo is None else bisect_left(self.values, minimo)
+        stop = len(self.values) if maximo is None else bisect_right(self.values, maximo)
+        return start, max(start, stop)
+
+    def bitmap(self, minimo: Optional[int], maximo: Optional[int]) -> int:
+        start, stop = self.span(minimo, maximo)
+        if self._prefix is not None:
+            # As duas posições são fronteiras entre valores, então estão no dicionário.
+            return self._prefix[stop] ^ self._prefix[start]
+        return ids_to_bitmap(self.ids[start:stop], self.size)
+
+
+class TableIndex(Generic[T]):
+    """
+    Índices de várias colunas sobre a mesma lista de itens, mais um bitmap por grupo
+    (unidade), para responder filtros com várias condições.
+    """
+
+    def __init__(self, items: Sequence[T], campos: Sequence[str], grupos: Dict[str, Iterable[int]] = None):
+        self.items = items
+        self.campos = tuple(campos)
+        self.columns: Dict[str, ColumnIndex] = {
+            campo: ColumnIndex([getattr(item, campo) for item in items]) for campo in self.campos
+        }
+        self._grupos: Dict[str, int] = {
+            grupo: ids_to_bitmap(ids, len(items)) for grupo, ids in (grupos or {}).items()
+        }
+
+    def select(self, condicoes: Iterable[Condicao], grupo: Optional[str] = None) -> int:
+        """Bitmap dos itens que satisfazem todas as condições (e pertencem ao grupo, se dado)."""
+        result = (1 << len(self.items)) - 1
+        if grupo is not None:
+            result &= self._grupos.get(grupo, 0)
+        for condicao in condicoes:
+            if not result:
+                break
+            result &= self.columns[condicao.campo].bitmap(condicao.minimo, condicao.maximo)
+        return result
+
+    def items_in(self, bitmap: int) -> Iterator[T]:
+        return (self.items[i] for i in bitmap_ids(bitmap))
@@ -0,0 +1,253 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+DISCIPLINE_FIELDS = (
+    'creditos_aula', 'creditos_trabalho', 'carga_horaria',
+    'carga_estagio', 'carga_praticas', 'atividades_aprofundamento'
+)
+
+SECTION_HEADER_STYLE = 'background-color: rgb(16, 148, 171);'
+SKIPPED_ROW_STYLES = ('color: rgb(235, 143, 0);', 'background-color: rgb(204, 204, 204);')
+SECTIONS = (
+    ('Obrigatórias', 'obrigatorias'),
+    ('Optativas Livres', 'optativas_livres'),
+    ('Optativas Eletivas', 'optativas_eletivas'),
+)
+
+def parse_number(text: str) -> int:
+    """Extrai um número de uma string, retornando 0 se não encontrar."""
+    if text:
+        match = re.search(r'\d+', text)
+        if match:
+            return int(match.group())
+    return 0
+
+
+class CourseParser(ABC):
+    """
+    Extrai os dados de uma página de curso do Júpiter Web em um dicionário simples:
+    cabeçalho do curso e, por categoria, as linhas de disciplinas (código, nome,
+    créditos e cargas horárias). Todas as implementações devolvem o mesmo resultado.
+    """
+    name = 'base'
+
+    @abstractmethod
+    def parse(self, html: str) -> Optional[Dict]:
+        """Dados do curso na página, ou None se ela não tiver um curso."""
+
+    def _new_course(self, nome: str, ideal: str, minima: str, maxima: str) -> Dict:
+        return {
+            'nome': nome.strip(),
+            'duracao_ideal': parse_number(ideal),
+            'duracao_minima': parse_number(minima),
+            'duracao_maxima': parse_number(maxima),
+            'obrigatorias': [], 'optativas_livres': [], 'optativas_eletivas': []
+        }
+
+    def _section_for(self, data: Dict, header_text: str) -> Optional[List[Dict]]:
+        for title, key in SECTIONS:
+            if title in header_text:
+                return data[key]
+        return None
+
+    def _discipline_row(self, codigo: str, nome: str, values: List[str]) -> Dict:
+        row = {'codigo': codigo, 'nome': nome}
+        for field, text in zip(DISCIPLINE_FIELDS, values):
+            row[field] = parse_number(text)
+        return row
+
+
+class SoupCourseParser(CourseParser):
+    """
+    Parser com BeautifulSoup e 'html.parser' (sempre disponível). Por padrão só
+    materializa os fragmentos #step4 e #gradeCurricular da página.
+    """
+    name = 'html.parser'
+
+    def __init__(self, restrict: bool = True):
+        self.parse_only = SoupStrainer(id=['step4', 'gradeCurricular']) if restrict else None
+
+    def parse(self, html: str) -> Optional[Dict]:
+        soup = BeautifulSoup(html, 'html.parser', parse_only=self.parse_only)
+        course_name_element = soup.select_one('#step4 .curso')
+        if not course_name_element:
+            return None
+
+        def text_of(selector: str) -> str:
+            element = soup.select_one(selector)
+            return element.text if element else ''
+
+        data = self._new_course(
+            course_name_element.text, text_of('#step4 .duridlhab'),
+            text_of('#step4 .durminhab'), text_of('#step4 .durmaxhab')
+        )
+
+        grade_div = soup.find('div', id='gradeCurricular')
+        if not grade_div:
+            return data
+
+        current_list = None
+        for row in grade_div.find_all('tr'):
+            style = row.get('style', '')
+
+            if SECTION_HEADER_STYLE in style:
+                current_list = self._section_for(data, row.get_text(strip=True))
+                continue
+
+            if current_list is None or any(s in style for s in SKIPPED_ROW_STYLES):
+                continue
+
+            cells = row.find_all('td')
+            if len(cells) >= 8 and cells[0].find('a'):
+                current_list.append(self._discipline_row(
+                    cells[0].get_text(strip=True), cells[1].get_text(strip=True),
+                    [cell.text for cell in cells[2:8]]
+                ))
+
+        return data
+
+
+class LxmlCourseParser(CourseParser):
+    """Parser com lxml: o mesmo percurso do SoupCourseParser, feito sobre a árvore em C."""
+    name = 'lxml'
+
+    def __init__(self):
+        if lxml is None:
+            raise ImportError("lxml não está instalado.")
+
+    @staticmethod
+    def _text(element) -> str:
+        return ''.join(element.itertext())
+
+    @staticmethod
+    def _stripped_text(element) -> str:
+        return ''.join(s.strip() for s in element.itertext())
+
+    def _first_with_class(self, parent, class_name: str):
+        found = parent.xpath(f'.//*[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]')
+        return found[0] if found else None
+
+    def parse(self, html: str) -> Optional[Dict]:
+        if not html.strip():
+            return None
+        root = lxml.html.document_fromstring(html.encode('utf-8'), parser=lxml.html.HTMLParser(encoding='utf-8'))
+        step4 = root.get_element_by_id('step4', None)
+        course_name_element = self._first_with_class(step4, 'curso') if step4 is not None else None
+        if course_name_element is None:
+            return None
+
+        def text_of(class_name: str) -> str:
+            element = self._first_with_class(step4, class_name)
+            return self._text(element) if element is not None else ''
+
+        data = self._new_course(
+            self._text(course_name_element), text_of('duridlhab'), text_of('durminhab'), text_of('durmaxhab')
+        )
+
+        grade_divs = root.xpath('//div[@id="gradeCurricular"]')
+        if not grade_divs:
+            return data
+
+        current_list = None
+        for row in grade_divs[0].iter('tr'):
+            style = row.get('style', '')
+
+            if SECTION_HEADER_STYLE in style:
+                current_list = self._section_for(data, self._stripped_text(row))
+                continue
+
+            if current_list is None or any(s in style for s in SKIPPED_ROW_STYLES):
+                continue
+
+            cells = list(row.iter('td'))
+            if len(cells) >= 8 and next(cells[0].iter('a'), None) is not None:
+                current_list.append(self._discipline_row(
+                    self._stripped_text(cells[0]), self._stripped_text(cells[1]),
+                    [self._text(cell) for cell in cells[2:8]]
+                ))
+
+        return data
+
+
+# Executado dentro da página pelo coletor com navegador. Enquanto a grade do curso pedido
+# não estiver pronta devolve null; depois devolve só o cabeçalho e as linhas de disciplinas,
+# já separadas por categoria com a mesma lógica dos parsers acima. Os textos vêm crus e os
+# números são extraídos em Python (ScriptCourseParser), como nos outros parsers.
+# Argumentos: texto de #step4 do curso anterior, estilo do cabeçalho de seção, estilos das
+# linhas ignoradas, seções [(título, chave)] e `force` (extrai mesmo sem a grade estar pronta).
+EXTRACTION_SCRIPT = """
+const [previous, headerStyle, skippedStyles, sections, force] = arguments;
+const step4 = document.getElementById('step4');
+const nome = step4 && step4.querySelector('.curso');
+if (!nome) return force ? {} : null;
+if (!force && (!nome.textContent.trim() || step4.textContent === previous
+               || (window.jQuery && window.jQuery.active > 0))) return null;
+
+const stripped = (node) => node.nodeType === Node.TEXT_NODE
+  ? node.nodeValue.trim() : Array.from(node.childNodes, stripped).join('');
+const textOf = (selector) => { const el = step4.querySelector(selector); return el ? el.textContent : ''; };
+
+const data = {
+  assinatura: step4.textContent, nome: nome.textContent,
+  duracao_ideal: textOf('.duridlhab'), duracao_minima: textOf('.durminhab'), duracao_maxima: textOf('.durmaxhab'),
+};
+const grade = document.querySelector('div#gradeCurricular');
+if (!grade) return data;
+
+for (const [, key] of sections) data[key] = [];
+let current = null;
+for (const row of grade.querySelectorAll('tr')) {
+  const style = row.getAttribute('style') || '';
+  if (style.includes(headerStyle)) {
+    const header = stripped(row);
+    const section = sections.find(([title]) => header.includes(title));
+    current = section ? data[section[1]] : null;
+    continue;
+  }
+  if (current === null || skippedStyles.some((s) => style.includes(s))) continue;
+  const cells = row.querySelectorAll('td');
+  if (cells.length >= 8 && cells[0].querySelector('a')) {
+    current.push([stripped(cells[0]), stripped(cells[1])]
+      .concat(Array.from(cells).slice(2, 8).map((cell) => cell.textContent)));
+  }
+}
+return data;
+"""
+
+
+class ScriptCourseParser(CourseParser):
+    """
+    Converte o resultado do EXTRACTION_SCRIPT (e não o HTML da página) no mesmo dicionário
+    devolvido pelos outros parsers.
+    """
+    name = 'script'
+
+    @staticmethod
+    def script_arguments(previous: Optional[str], force: bool = False) -> List:
+        return [previous, SECTION_HEADER_STYLE, list(SKIPPED_ROW_STYLES), [list(s) for s in SECTIONS], force]
+
+    def parse(self, extracted: Optional[Dict]) -> Optional[Dict]:
+        if not extracted or 'nome' not in extracted:
+            return None
+        data = self._new_course(
+            extracted['nome'], extracted['duracao_ideal'], extracted['duracao_minima'], extracted['duracao_maxima']
+        )
+        for _, key in SECTIONS:
+            data[key] = [self._discipline_row(row[0], row[1], row[2:]) for row in extracted.get(key, ())]
+        return data
+
+
+PARSERS = {'lxml': LxmlCourseParser, 'html.parser': SoupCourseParser}
+
+def get_parser(backend: str = 'auto') -> CourseParser:
+    """Retorna o parser pedido; 'auto' usa lxml quando disponível e 'html.parser' caso contrário."""
+    if backend == 'auto':
+        backend = 'lxml' if lxml is not None else 'html.parser'
+    return PARSERS[backend]()
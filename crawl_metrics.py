@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+class CrawlMetrics:
+    """
+    Tempos por fase e contadores de eventos de uma coleta, compartilháveis entre workers.
+
+    `phase(nome)` mede um trecho; dentro de `course(...)` o tempo também é atribuído ao
+    curso em andamento na thread atual. `count(nome)` registra eventos como timeouts e
+    cliques feitos por JavaScript. Ao final, `write` grava o relatório em JSON e
+    `print_summary` mostra as fases que mais consumiram tempo.
+
+    Na coleta em pipeline, `stage(...)` acumula o trabalho de cada estágio (itens e tempo
+    ocupado, ocioso à espera de entrada e bloqueado à espera de espaço na fila seguinte) e
+    `queue_depth(...)` amostra a profundidade das filas entre os estágios.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._start = time.perf_counter()
+        self._phases: Dict[str, List[float]] = defaultdict(list)
+        self.counters: Counter = Counter()
+        self.courses: List[Dict] = []
+        self._stages: Dict[str, Dict] = {}
+        self._queues: Dict[str, Dict] = {}
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self._phases[name].append(seconds)
+        course = getattr(self._local, 'course', None)
+        if course is not None:
+            course['fases'][name] = course['fases'].get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+        course = getattr(self._local, 'course', None)
+        if course is not None:
+            course['eventos'][name] = course['eventos'].get(name, 0) + n
+
+    def stage(self, name: str, items: int = 0, busy: float = 0.0, idle: float = 0.0, blocked: float = 0.0,
+              threads: int = None):
+        with self._lock:
+            stage = self._stages.setdefault(
+                name, {'threads': 1, 'itens': 0, 'ocupado_s': 0.0, 'ocioso_s': 0.0, 'bloqueado_s': 0.0}
+            )
+            if threads is not None:
+                stage['threads'] = threads
+            stage['itens'] += items
+            stage['ocupado_s'] += busy
+            stage['ocioso_s'] += idle
+            stage['bloqueado_s'] += blocked
+
+    def queue_depth(self, name: str, depth: int):
+        with self._lock:
+            samples = self._queues.setdefault(name, {'amostras': 0, 'soma': 0, 'max': 0})
+            samples['amostras'] += 1
+            samples['soma'] += depth
+            samples['max'] = max(samples['max'], depth)
+
+    def pipeline_summary(self, elapsed: float) -> Dict[str, Dict]:
+        """
+        Para cada estágio: itens, tempos, vazão (itens por segundo de trabalho, somando as
+        threads) e utilização (fração do tempo em que as threads estiveram ocupadas); o
+        estágio com maior utilização é o gargalo. Para cada fila: profundidade média e máxima.
+        """
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self._stages.items()}
+            queues = {name: dict(samples) for name, samples in self._queues.items()}
+        for stage in stages.values():
+            busy = stage['ocupado_s']
+            stage['vazao_itens_s'] = round(stage['itens'] / busy * stage['threads'], 2) if busy else None
+            stage['utilizacao'] = round(busy / (elapsed * stage['threads']), 3) if elapsed else None
+            for key in ('ocupado_s', 'ocioso_s', 'bloqueado_s'):
+                stage[key] = round(stage[key], 3)
+        return {
+            'estagios': stages,
+            'filas': {
+                name: {'media': round(q['soma'] / q['amostras'], 2), 'max': q['max']}
+                for name, q in queues.items() if q['amostras']
+            },
+        }
+
+    @contextmanager
+    def course(self, unit_code: str, course_code: str, nome: Optional[str] = None):
+        """Agrupa as fases e eventos registrados pela thread atual sob um curso."""
+        record = {
+            'unidade': unit_code, 'curso': course_code, 'nome': nome,
+            'worker': threading.current_thread().name, 'fases': {}, 'eventos': {},
+        }
+        self._local.course = record
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['total_s'] = time.perf_counter() - start
+            self._local.course = None
+            with self._lock:
+                self.courses.append(record)
+
+    @contextmanager
+    def within(self, record: Optional[Dict]):
+        """
+        Atribui as fases da thread atual a um curso aberto por `course` em outra thread (por
+        exemplo, o parsing feito pelo pipeline), sem criar um novo registro de curso.
+        """
+        previous = getattr(self._local, 'course', None)
+        self._local.course = record
+        try:
+            yield record
+        finally:
+            self._local.course = previous
+
+    def summary(self) -> Dict[str, Dict]:
+        """Para cada fase: ocorrências, tempo total e média, mediana, p95 e máximo em ms."""
+        with self._lock:
+            phases = {name: sorted(samples) for name, samples in self._phases.items()}
+        result = {}
+        for name, samples in sorted(phases.items(), key=lambda item: -sum(item[1])):
+            n = len(samples)
+            result[name] = {
+                'n': n,
+                'total_s': round(sum(samples), 3),
+                'media_ms': round(sum(samples) / n * 1000, 2),
+                'p50_ms': round(samples[n // 2] * 1000, 2),
+                'p95_ms': round(samples[min(n - 1, int(n * 0.95))] * 1000, 2),
+                'max_ms': round(samples[-1] * 1000, 2),
+            }
+        return result
+
+    def report(self) -> Dict:
+        elapsed = time.perf_counter() - self._start
+        with self._lock:
+            courses = sorted(self.courses, key=lambda c: -c['total_s'])
+            counters = dict(sorted(self.counters.items()))
+        report = {
+            'duracao_total_s': round(elapsed, 3),
+            'cursos_processados': len(courses),
+            'contadores': counters,
+            'fases': self.summary(),
+        }
+        if self._stages:
+            report['pipeline'] = self.pipeline_summary(elapsed)
+        report['cursos'] = courses
+        return report
+
+    def write(self, filename: str):
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+            print(f"Métricas da coleta gravadas em '{filename}'.")
+        except OSError as e:
+            print(f"Aviso: não foi possível gravar as métricas em '{filename}': {e}")
+
+    def print_summary(self, top_courses: int = 5):
+        report = self.report()
+        print("\n--- Tempos da Coleta ---")
+        print(f"Duração total: {report['duracao_total_s']:.1f} s, {report['cursos_processados']} cursos")
+        print(f"{'fase':22s} {'n':>6s} {'total (s)':>10s} {'média (ms)':>11s} {'p95 (ms)':>10s} {'máx (ms)':>10s}")
+        for name, s in report['fases'].items():
+            print(f"{name:22s} {s['n']:6d} {s['total_s']:10.2f} {s['media_ms']:11.1f} {s['p95_ms']:10.1f} {s['max_ms']:10.1f}")
+        if 'pipeline' in report:
+            self._print_pipeline(report['pipeline'])
+        if report['contadores']:
+            print("Eventos: " + ", ".join(f"{name}={n}" for name, n in report['contadores'].items()))
+        if report['cursos']:
+            print("Cursos mais lentos:")
+            for c in report['cursos'][:top_courses]:
+                print(f"  {c['total_s']:7.2f} s  {c['nome'] or c['curso']} ({c['unidade']})")
+
+    @staticmethod
+    def _print_pipeline(pipeline: Dict):
+        stages = pipeline['estagios']
+        print(f"{'estágio':12s} {'threads':>7s} {'itens':>6s} {'ocupado (s)':>11s} {'ocioso (s)':>10s} "
+              f"{'bloqueado (s)':>13s} {'itens/s':>8s} {'utilização':>10s}")
+        for name, s in stages.items():
+            vazao = f"{s['vazao_itens_s']:8.1f}" if s['vazao_itens_s'] is not None else f"{'-':>8s}"
+            utilizacao = f"{s['utilizacao']:10.0%}" if s['utilizacao'] is not None else f"{'-':>10s}"
+            print(f"{name:12s} {s['threads']:7d} {s['itens']:6d} {s['ocupado_s']:11.2f} {s['ocioso_s']:10.2f} "
+                  f"{s['bloqueado_s']:13.2f} {vazao} {utilizacao}")
+        for name, q in pipeline['filas'].items():
+            print(f"Fila '{name}': profundidade média {q['media']:.1f}, máxima {q['max']}")
+        busiest = max(stages, key=lambda name: stages[name]['utilizacao'] or 0, default=None)
+        if busiest is not None:
+            print(f"Gargalo: estágio '{busiest}'")
@@ -0,0 +1,122 @@
+"""
+Pipeline da coleta com navegador, em três estágios ligados por filas limitadas:
+
+    busca     threads das sessões do navegador, que entregam o conteúdo de cada grade
+    parsing   grupo de threads que transforma o conteúdo no dicionário do curso
+    ligacao   uma única thread, que monta os objetos Curso e atualiza as Disciplinas
+
+Enquanto uma sessão espera a rede e o Chrome (com o GIL livre), as páginas anteriores já
+estão sendo processadas. Como as filas são limitadas, se o parsing ficar para trás a busca
+espera, e o tempo bloqueado aparece nas métricas de cada estágio (`CrawlMetrics.stage`),
+junto com a profundidade das filas: o estágio com maior utilização é o gargalo.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+from crawl_metrics import CrawlMetrics
+
+PAGE_QUEUE_SIZE = 16
+PARSE_WORKERS = 2
+
+_DONE = object()
+
+
+class CoursePipeline:
+    """
+    Liga as threads de busca a `parse(item)` (executado por `parse_workers` threads) e a
+    `link(item, resultado)` (executado por uma única thread, na ordem de chegada).
+    """
+
+    def __init__(self, parse: Callable[[Any], Any], link: Callable[[Any, Any], None], metrics: CrawlMetrics,
+                 fetchers: int = 1, parse_workers: int = PARSE_WORKERS, queue_size: int = PAGE_QUEUE_SIZE):
+        self.parse = parse
+        self.link = link
+        self.metrics = metrics
+        self.pages: queue.Queue = queue.Queue(queue_size)
+        self.parsed: queue.Queue = queue.Queue(queue_size)
+        self.error: Optional[BaseException] = None
+        self._local = threading.local()
+        self._start = time.perf_counter()
+
+        metrics.stage('busca', threads=fetchers)
+        metrics.stage('parsing', threads=parse_workers)
+        metrics.stage('ligacao', threads=1)
+        self._parsers: List[threading.Thread] = [
+            threading.Thread(target=self._parse_loop, name=f'parser-{i}', daemon=True) for i in range(max(1, parse_workers))
+        ]
+        self._linker = threading.Thread(target=self._link_loop, name='ligacao', daemon=True)
+        for thread in self._parsers + [self._linker]:
+            thread.start()
+
+    def _put(self, target: queue.Queue, name: str, item) -> float:
+        """Coloca o item na fila e devolve quanto tempo a thread ficou bloqueada esperando espaço."""
+        start = time.perf_counter()
+        target.put(item)
+        blocked = time.perf_counter() - start
+        self.metrics.queue_depth(name, target.qsize())
+        return blocked
+
+    def submit(self, item):
+        """
+        Entrega um item do estágio de busca. O trabalho da busca é o tempo desde a entrega
+        anterior da mesma thread (ou desde o início do pipeline).
+        """
+        now = time.perf_counter()
+        busy = now - getattr(self._local, 'last', self._start)
+        blocked = self._put(self.pages, 'paginas', item)
+        self._local.last = time.perf_counter()
+        self.metrics.stage('busca', items=1, busy=busy, blocked=blocked)
+
+    def submit_parsed(self, item, result=None):
+        """Entrega um item direto à ligação, sem passar pelo parsing (ex.: marcadores de fim)."""
+        self._put(self.parsed, 'cursos', (item, result))
+
+    def _parse_loop(self):
+        while True:
+            start = time.perf_counter()
+            item = self.pages.get()
+            idle = time.perf_counter() - start
+            if item is _DONE:
+                self.metrics.stage('parsing', idle=idle)
+                return
+            start = time.perf_counter()
+            try:
+                result = self.parse(item)
+            except Exception as e:
+                print(f"ERRO no parsing de uma página: {e}")
+                self.metrics.count('erro_parsing')
+                result = None
+            busy = time.perf_counter() - start
+            blocked = self._put(self.parsed, 'cursos', (item, result))
+            self.metrics.stage('parsing', items=1, busy=busy, idle=idle, blocked=blocked)
+
+    def _link_loop(self):
+        while True:
+            start = time.perf_counter()
+            entry = self.parsed.get()
+            idle = time.perf_counter() - start
+            if entry is _DONE:
+                self.metrics.stage('ligacao', idle=idle)
+                return
+            start = time.perf_counter()
+            try:
+                self.link(*entry)
+            except Exception as e:
+                # A ligação continua consumindo a fila para não travar a busca; o primeiro
+                # erro é relançado por close().
+                if self.error is None:
+                    self.error = e
+            self.metrics.stage('ligacao', items=1, busy=time.perf_counter() - start, idle=idle)
+
+    def close(self):
+        """Espera os itens pendentes passarem por todos os estágios e encerra as threads."""
+        for _ in self._parsers:
+            self.pages.put(_DONE)
+        for thread in self._parsers:
+            thread.join()
+        self.parsed.put(_DONE)
+        self._linker.join()
+        if self.error is not None:
+            raise self.error
@@ -1,8 +1,136 @@
-from typing import List, Dict, Set
+import threading
+from collections.abc import MutableSet
+from typing import List, Dict, Iterable, Iterator, Optional, Set
+
+
+class NameTable:
+    """Tabela de nomes internados: cada nome distinto recebe um ID inteiro fixo."""
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def id_for(self, name: str) -> int:
+        """Devolve o ID do nome, registrando-o se ainda não existir."""
+        name_id = self._ids.get(name)
+        if name_id is None:
+            with self._lock:
+                name_id = self._ids.get(name)
+                if name_id is None:
+                    name_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = name_id
+        return name_id
+
+    def lookup(self, name: str) -> Optional[int]:
+        """ID de um nome já registrado, ou None."""
+        return self._ids.get(name)
+
+    def name(self, name_id: int) -> str:
+        return self._names[name_id]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class Tabelas:
+    """
+    Tabelas de nomes de um conjunto de dados. Nomes de cursos e de unidades aparecem
+    repetidos em milhares de objetos; cada nome é guardado uma única vez e os objetos
+    guardam o ID. Cada objeto referencia as tabelas em que foi criado, e as tabelas são
+    liberadas junto com o último objeto do conjunto de dados.
+    """
+    __slots__ = ('cursos', 'unidades')
+
+    def __init__(self):
+        self.cursos = NameTable()
+        self.unidades = NameTable()
+
+
+_tabelas = Tabelas()
+
+
+def novas_tabelas() -> Tabelas:
+    """
+    Começa tabelas de nomes novas para os objetos criados daqui em diante. É chamada no
+    início de cada carga ou coleta, para que os nomes de um conjunto de dados descartado
+    (por exemplo, depois que o --watch troca os dados) não fiquem presos em memória.
+    """
+    global _tabelas
+    _tabelas = Tabelas()
+    return _tabelas
+
+
+class CursoSet(MutableSet):
+    """
+    Conjunto de nomes de cursos de uma disciplina, guardado como bitmap dos IDs dos cursos
+    a partir do menor ID presente. Inclusão e consulta são O(1); se comporta como o set de
+    nomes usado antes (add, update, in, len, iteração em ordem de ID).
+    """
+    __slots__ = ('_disciplina',)
+
+    def __init__(self, disciplina: 'Disciplina'):
+        self._disciplina = disciplina
+
+    def _has_id(self, name_id: int) -> bool:
+        d = self._disciplina
+        return name_id >= d._curso_base and (d._curso_bits >> (name_id - d._curso_base)) & 1 == 1
+
+    def __contains__(self, nome) -> bool:
+        name_id = self._disciplina._tabelas.cursos.lookup(nome)
+        return name_id is not None and self._has_id(name_id)
+
+    def ids(self) -> Iterator[int]:
+        """Os IDs dos cursos, em ordem crescente."""
+        d = self._disciplina
+        bits, base = d._curso_bits, d._curso_base
+        while bits:
+            low = bits & -bits
+            yield base + low.bit_length() - 1
+            bits ^= low
+
+    def __iter__(self) -> Iterator[str]:
+        table = self._disciplina._tabelas.cursos
+        return (table.name(i) for i in self.ids())
+
+    def __len__(self) -> int:
+        return bin(self._disciplina._curso_bits).count('1')
+
+    def __repr__(self) -> str:
+        return f"CursoSet({set(self)!r})"
+
+    def add(self, nome: str):
+        d = self._disciplina
+        name_id = d._tabelas.cursos.id_for(nome)
+        if not d._curso_bits:
+            d._curso_base, d._curso_bits = name_id, 1
+        elif name_id < d._curso_base:
+            d._curso_bits = (d._curso_bits << (d._curso_base - name_id)) | 1
+            d._curso_base = name_id
+        else:
+            d._curso_bits |= 1 << (name_id - d._curso_base)
+
+    def discard(self, nome: str):
+        d = self._disciplina
+        name_id = d._tabelas.cursos.lookup(nome)
+        if name_id is not None and self._has_id(name_id):
+            d._curso_bits &= ~(1 << (name_id - d._curso_base))
+
+    def update(self, nomes: Iterable[str]):
+        for nome in nomes:
+            self.add(nome)
+
 
 class Disciplina:
     """Representa uma disciplina com seus dados e cursos associados."""
+    __slots__ = (
+        'codigo', 'nome', 'creditos_aula', 'creditos_trabalho', 'carga_horaria',
+        'carga_estagio', 'carga_praticas', 'atividades_aprofundamento',
+        '_tabelas', '_curso_base', '_curso_bits'
+    )
+
     def __init__(self, codigo: str, nome: str):
+        self._tabelas = _tabelas
         self.codigo = codigo
         self.nome = nome
         self.creditos_aula: int = 0
@@ -11,7 +139,19 @@ class Disciplina:
         self.carga_estagio: int = 0
         self.carga_praticas: int = 0
         self.atividades_aprofundamento: int = 0
-        self.cursos: Set[str] = set()
+        self._curso_base = 0
+        self._curso_bits = 0
+
+    @property
+    def cursos(self) -> Set[str]:
+        """Nomes dos cursos que usam a disciplina."""
+        return CursoSet(self)
+
+    @cursos.setter
+    def cursos(self, nomes: Iterable[str]):
+        self._curso_base = 0
+        self._curso_bits = 0
+        CursoSet(self).update(nomes)
 
     def to_dict(self) -> Dict:
         """Converte o objeto Disciplina para um dicionário."""
@@ -27,9 +167,26 @@ class Disciplina:
             'cursos': sorted(list(self.cursos))
         }
 
+    def __getstate__(self) -> Dict:
+        return self.to_dict()
+
+    # Os IDs só valem dentro das tabelas do processo; ao serializar com pickle, os nomes
+    # são usados e registrados de novo nas tabelas atuais.
+    def __setstate__(self, state: Dict):
+        self._tabelas = _tabelas
+        for field, value in state.items():
+            setattr(self, field, value)
+
+
 class Curso:
     """Representa um curso com suas durações e listas de disciplinas."""
+    __slots__ = (
+        '_tabelas', '_nome_id', '_unidade_id', 'duracao_ideal', 'duracao_minima', 'duracao_maxima',
+        'obrigatorias', 'optativas_livres', 'optativas_eletivas'
+    )
+
     def __init__(self, nome: str, unidade: str):
+        self._tabelas = _tabelas
         self.nome = nome
         self.unidade = unidade
         self.duracao_ideal: int = 0
@@ -39,6 +196,22 @@ class Curso:
         self.optativas_livres: List[Disciplina] = []
         self.optativas_eletivas: List[Disciplina] = []
 
+    @property
+    def nome(self) -> str:
+        return self._tabelas.cursos.name(self._nome_id)
+
+    @nome.setter
+    def nome(self, nome: str):
+        self._nome_id = self._tabelas.cursos.id_for(nome)
+
+    @property
+    def unidade(self) -> str:
+        return self._tabelas.unidades.name(self._unidade_id)
+
+    @unidade.setter
+    def unidade(self, unidade: str):
+        self._unidade_id = self._tabelas.unidades.id_for(unidade)
+
     def to_dict(self) -> Dict:
         """Converte o objeto Curso para um dicionário."""
         return {
@@ -52,15 +225,48 @@ class Curso:
             'optativas_eletivas': [d.codigo for d in self.optativas_eletivas]
         }
 
+    def __getstate__(self) -> Dict:
+        return {
+            'nome': self.nome, 'unidade': self.unidade, 'duracao_ideal': self.duracao_ideal,
+            'duracao_minima': self.duracao_minima, 'duracao_maxima': self.duracao_maxima,
+            'obrigatorias': self.obrigatorias, 'optativas_livres': self.optativas_livres,
+            'optativas_eletivas': self.optativas_eletivas
+        }
+
+    def __setstate__(self, state: Dict):
+        self._tabelas = _tabelas
+        for field, value in state.items():
+            setattr(self, field, value)
+
+
 class Unidade:
     """Representa uma unidade da universidade e os cursos que ela oferece."""
+    __slots__ = ('_tabelas', '_nome_id', 'cursos')
+
     def __init__(self, nome: str):
+        self._tabelas = _tabelas
         self.nome = nome
         self.cursos: List[Curso] = []
 
+    @property
+    def nome(self) -> str:
+        return self._tabelas.unidades.name(self._nome_id)
+
+    @nome.setter
+    def nome(self, nome: str):
+        self._nome_id = self._tabelas.unidades.id_for(nome)
+
     def to_dict(self) -> Dict:
         """Converte o objeto Unidade para um dicionário."""
         return {
             'nome': self.nome,
             'cursos': [curso.nome for curso in self.cursos]
-        }
\ No newline at end of file
+        }
+
+    def __getstate__(self) -> Dict:
+        return {'nome': self.nome, 'cursos': self.cursos}
+
+    def __setstate__(self, state: Dict):
+        self._tabelas = _tabelas
+        for field, value in state.items():
+            setattr(self, field, value)
@@ -0,0 +1,76 @@
+"""
+Servidor local que imita o Júpiter Web a partir de páginas salvas, para testar os
+coletores sem acessar o sistema real.
+
+Estrutura esperada da pasta de páginas:
+    jupCarreira.html               página inicial com o <select id="comboUnidade">
+    cursos_<codcg>.html|.json      lista de cursos de uma unidade
+    grade_<codcg>_<codcur>.html    página do curso com #step4 e #gradeCurricular
+
+Uso:
+    python fake_jupiterweb.py paginas_salvas --port 8000
+    python main.py --force-scrape --backend http --base-url http://localhost:8000/jupiterweb/jupCarreira.jsp
+"""
+import argparse
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from http_scraper import USPHttpCollector
+
+class FakeJupiterHandler(BaseHTTPRequestHandler):
+    """Responde às mesmas rotas usadas pelos coletores, lendo os arquivos da pasta configurada."""
+
+    protocol_version = 'HTTP/1.1'
+    pages_dir = '.'
+
+    def _candidates(self):
+        url = urlparse(self.path)
+        route = url.path.rsplit('/', 1)[-1]
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if route.endswith('.jsp'):
+            return [route[:-4] + '.html']
+        if route == USPHttpCollector.CURSOS_ENDPOINT:
+            return [f"cursos_{params.get('codcg')}.json", f"cursos_{params.get('codcg')}.html"]
+        if route == USPHttpCollector.GRADE_ENDPOINT:
+            return [f"grade_{params.get('codcg')}_{params.get('codcur')}.html"]
+        return [route]
+
+    def do_GET(self):
+        for name in self._candidates():
+            path = os.path.join(self.pages_dir, os.path.basename(name))
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    body = f.read()
+                content_type = 'application/json' if name.endswith('.json') else 'text/html; charset=utf-8'
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(pages_dir: str, port: int = 8000) -> ThreadingHTTPServer:
+    """Cria o servidor (sem iniciá-lo) servindo as páginas de `pages_dir`."""
+    handler = type('Handler', (FakeJupiterHandler,), {'pages_dir': pages_dir})
+    return ThreadingHTTPServer(('127.0.0.1', port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Servidor local que imita o Júpiter Web a partir de páginas salvas.')
+    parser.add_argument('pasta', help='Pasta com as páginas salvas.')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    server = serve(args.pasta, args.port)
+    print(f"Servindo '{args.pasta}' em http://127.0.0.1:{args.port}/jupiterweb/jupCarreira.jsp")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,139 @@
+"""
+Recarga do arquivo de dados durante uma sessão longa (menu interativo ou --serve).
+
+`DataFileWatcher` verifica periodicamente o mtime e o tamanho do arquivo. Quando eles mudam
+e ficam estáveis por uma verificação (a gravação terminou), o hash do conteúdo é comparado
+com o da última carga e, se for outro, os dados são carregados e um MenuHandler novo é
+montado na thread do watcher, já com os índices de busca e de filtro e as estatísticas
+(MenuHandler.build_indexes), para que o primeiro comando depois da troca não pague esse custo.
+
+O menu em uso só é trocado depois que o novo está completo, com uma única atribuição: cada
+comando usa do começo ao fim o menu que estava ativo quando começou, e o cache de resultados,
+que pertence ao menu, é descartado junto com o menu antigo.
+"""
+import hashlib
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data_models import Curso, Disciplina, Unidade
+from menu import MenuHandler
+from render import Pager
+
+WATCH_INTERVAL = 2.0
+HASH_CHUNK_SIZE = 1 << 20
+
+Dados = Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]
+
+
+def file_hash(filename: str) -> Optional[str]:
+    digest = hashlib.blake2b()
+    try:
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class DataFileWatcher:
+    """
+    Observa o arquivo de dados e, a cada versão nova, chama `on_reload` com os dados
+    devolvidos por `load` (na thread do watcher). Cargas vazias, como a de um arquivo
+    corrompido, são ignoradas e os dados anteriores continuam em uso.
+    """
+
+    def __init__(self, filename: str, load: Callable[[], Dados], interval: float = WATCH_INTERVAL):
+        self.filename = filename
+        self.load = load
+        self.interval = interval
+        self._signature = self._current_signature()
+        self._candidate = None
+        self._hash = file_hash(filename)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.on_reload: Optional[Callable[[Dados], None]] = None
+
+    def _current_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def check(self) -> bool:
+        """Uma verificação do arquivo; devolve True se uma versão nova foi carregada."""
+        signature = self._current_signature()
+        if signature is None or signature == self._signature:
+            self._candidate = None
+            return False
+        if signature != self._candidate:
+            # Ainda pode estar sendo gravado: espera a próxima verificação.
+            self._candidate = signature
+            return False
+        self._signature, self._candidate = signature, None
+
+        content_hash = file_hash(self.filename)
+        if content_hash is None or content_hash == self._hash:
+            return False
+        self._hash = content_hash
+        data = self.load()
+        if not any(data):
+            print(f"\nAviso: a nova versão de '{self.filename}' não pôde ser carregada; os dados anteriores continuam em uso.")
+            return False
+        if self.on_reload is not None:
+            self.on_reload(data)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"\nAviso: falha ao recarregar '{self.filename}': {e}")
+
+    def start(self, on_reload: Callable[[Dados], None]):
+        self.on_reload = on_reload
+        self._thread = threading.Thread(target=self._run, name='data-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class LiveMenu:
+    """Menu interativo cujo MenuHandler é substituído quando o arquivo de dados muda."""
+
+    def __init__(self, menu: MenuHandler, watcher: DataFileWatcher):
+        self.menu = menu
+        self.watcher = watcher
+
+    def _reload(self, data: Dados):
+        menu = MenuHandler(*data).build_indexes()
+        menu.pager = self.menu.pager
+        self.menu = menu
+        print(f"\nDados atualizados de '{self.watcher.filename}': {len(data[0])} unidades, "
+              f"{len(data[1])} cursos, {len(data[2])} disciplinas.")
+
+    def execute(self, user_input: str) -> bool:
+        return self.menu.execute(user_input)
+
+    def run(self):
+        if sys.stdout.isatty():
+            self.menu.pager = Pager()
+        self.watcher.start(self._reload)
+        try:
+            self.menu.execute('AJUDA')
+            while True:
+                try:
+                    user_input = input("\nComando > ").strip()
+                    if not user_input: continue
+                    if not self.execute(user_input): break
+                except (KeyboardInterrupt, EOFError):
+                    print("\nEncerrando por interrupção do usuário..."); break
+        finally:
+            self.watcher.stop()
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from checkpoint import CheckpointJournal
+from crawl_metrics import CrawlMetrics
+from collector_base import BaseCollector
+from page_cache import PageCache
+from sqlite_store import SQLiteStore
+from data_models import Unidade, Curso, Disciplina, novas_tabelas
+
+class RateLimiter:
+    """Espaça o início das requisições para respeitar um limite de requisições por segundo."""
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class USPHttpCollector(BaseCollector):
+    """
+    Coleta os mesmos dados do USPDataCollector sem navegador, fazendo diretamente as
+    requisições que o formulário do Júpiter Web dispara ao escolher unidade e curso.
+    """
+
+    # Caminhos (relativos à BASE_URL) das requisições feitas pelo formulário ao trocar
+    # a unidade e ao abrir a aba da grade curricular.
+    CURSOS_ENDPOINT = "listarCursosCarreira"
+    GRADE_ENDPOINT = "listarGradeCarreira"
+
+    def __init__(self, max_units: int = None, concurrency: int = 8, rate_limit: float = None,
+                 base_url: str = None, timeout: float = 60, journal: CheckpointJournal = None,
+                 store: SQLiteStore = None, metrics: CrawlMetrics = None, metrics_file: str = None,
+                 page_cache: PageCache = None):
+        self.max_units = max_units
+        self.concurrency = max(1, concurrency)
+        self.rate_limit = rate_limit
+        self.base_url = base_url or self.BASE_URL
+        self.timeout = timeout
+        self.journal = journal
+        self.store = store
+        self.metrics = metrics or CrawlMetrics()
+        self.metrics_file = metrics_file
+        self.page_cache = page_cache
+
+    def _parse_options(self, html: str, select_id: str) -> List[Dict]:
+        """Lê as opções de um <select> (ou de uma lista solta de <option>), ignorando a vazia."""
+        soup = BeautifulSoup(html, 'html.parser')
+        select = soup.find('select', id=select_id) or soup
+        return [
+            {'codigo': opt.get('value'), 'nome': opt.get_text().strip()}
+            for opt in select.find_all('option') if opt.get('value')
+        ]
+
+    def _parse_course_list(self, body: str, content_type: str) -> List[Dict]:
+        """Interpreta a lista de cursos de uma unidade, que pode vir como JSON ou como HTML."""
+        if 'json' in content_type:
+            return [{'codigo': str(item['codigo']), 'nome': item['nome'].strip()} for item in json.loads(body)]
+        return self._parse_options(body, 'comboCurso')
+
+    async def _fetch(self, session: aiohttp.ClientSession, limiter: RateLimiter, semaphore: asyncio.Semaphore,
+                     url: str, params: Dict = None, phase: str = 'requisicao') -> Tuple[str, str]:
+        async with semaphore:
+            await limiter.wait()
+            start = time.perf_counter()
+            try:
+                async with session.get(url, params=params) as response:
+                    response.raise_for_status()
+                    return await response.text(), response.headers.get('Content-Type', '')
+            except asyncio.TimeoutError:
+                self.metrics.count(f'timeout_{phase}')
+                raise
+            finally:
+                self.metrics.record(phase, time.perf_counter() - start)
+
+    async def _fetch_unit(self, session: aiohttp.ClientSession, limiter: RateLimiter, semaphore: asyncio.Semaphore,
+                          unit_data: Dict) -> List[Tuple[Dict, Optional[str]]]:
+        """
+        Busca a lista de cursos de uma unidade e, em paralelo, a grade de cada curso que
+        ainda não consta no journal. Devolve pares (curso, html), com html None quando a
+        página não foi buscada.
+        """
+        body, content_type = await self._fetch(
+            session, limiter, semaphore, urljoin(self.base_url, self.CURSOS_ENDPOINT), {'codcg': unit_data['codigo']},
+            'requisicao_cursos'
+        )
+        courses = self._parse_course_list(body, content_type)
+        pending = [
+            course for course in courses
+            if self.journal is None or self.journal.completed_course(unit_data['codigo'], course['codigo']) is None
+        ]
+        grade_url = urljoin(self.base_url, self.GRADE_ENDPOINT)
+        responses = await asyncio.gather(*[
+            self._fetch(session, limiter, semaphore, grade_url,
+                        {'codcg': unit_data['codigo'], 'codcur': course['codigo']}, 'requisicao_grade')
+            for course in pending
+        ], return_exceptions=True)
+
+        pages = {}
+        for course, response in zip(pending, responses):
+            if isinstance(response, Exception):
+                print(f"ERRO ao buscar a grade do curso {course['nome']} ({unit_data['nome']}): {response}")
+            else:
+                pages[course['codigo']] = response[0]
+        return [(course, pages.get(course['codigo'])) for course in courses]
+
+    def _build_unit(self, unit_data: Dict, pages: List[Tuple[Dict, Optional[str]]],
+                    disciplinas_db: Dict[str, Disciplina]) -> Unidade:
+        """Monta a unidade, reaproveitando do journal os cursos concluídos ou inalterados."""
+        unidade_obj = Unidade(unit_data['nome'])
+        complete = True
+        for course_data, html in pages:
+            with self.metrics.course(unit_data['codigo'], course_data['codigo'], course_data['nome']):
+                parsed_data = self._checkpointed_course(unit_data['codigo'], course_data['codigo'], disciplinas_db)
+                if parsed_data is None:
+                    if html is None:
+                        complete = False
+                        continue
+                    self._cache_page(unit_data['codigo'], course_data['codigo'], html)
+                    content_hash = self._content_hash(html) if self.journal is not None else None
+                    parsed_data = self._checkpointed_course(
+                        unit_data['codigo'], course_data['codigo'], disciplinas_db, content_hash
+                    )
+                    if parsed_data is None:
+                        parsed_data = self._extract_course_data(html, disciplinas_db)
+                        self._checkpoint_course(unit_data['codigo'], course_data['codigo'], content_hash, parsed_data)
+            if parsed_data:
+                unidade_obj.cursos.append(self._build_course(parsed_data, unit_data['nome']))
+
+        course_codes = [c['codigo'] for c, _ in pages]
+        self._cache_unit(unit_data, course_codes)
+        if complete:
+            self._checkpoint_unit(unit_data, course_codes)
+        return unidade_obj
+
+    async def _collect_async(self) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+        unidades_db: List[Unidade] = []
+        cursos_db: List[Curso] = []
+        disciplinas_db: Dict[str, Disciplina] = {}
+
+        limiter = RateLimiter(self.rate_limit)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': self.USER_AGENT},
+        ) as session:
+            html, _ = await self._fetch(session, limiter, semaphore, self.base_url, phase='abrir_formulario')
+            units = self._parse_options(html, 'comboUnidade')
+            units_to_process = units[:self.max_units] if self.max_units is not None else units
+            self._cache_units(units_to_process)
+
+            # Todas as unidades são buscadas ao mesmo tempo, mas o parsing é feito na ordem
+            # original para que o resultado seja idêntico ao da coleta pelo navegador.
+            # Unidades já concluídas no journal não geram nenhuma requisição.
+            tasks = [
+                None if self.journal is not None and self.journal.completed_unit(u['codigo'])
+                else asyncio.ensure_future(self._fetch_unit(session, limiter, semaphore, u))
+                for u in units_to_process
+            ]
+            for unit_data, task in zip(units_to_process, tasks):
+                if task is None:
+                    unidade_obj = self._restore_unit(unit_data, disciplinas_db)
+                else:
+                    try:
+                        unidade_obj = self._build_unit(unit_data, await task, disciplinas_db)
+                    except Exception as e:
+                        print(f"ERRO inesperado ao processar a unidade {unit_data['nome']}: {e}")
+                        self.metrics.count('erro_unidade')
+                        continue
+                unidades_db.append(unidade_obj)
+                cursos_db.extend(unidade_obj.cursos)
+                self._unit_finished(unidade_obj)
+
+        return unidades_db, cursos_db, disciplinas_db
+
+    def collect_data(self) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+        novas_tabelas()
+        try:
+            return asyncio.run(self._collect_async())
+        finally:
+            self._report_metrics()
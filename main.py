@@ -1,8 +1,11 @@
 import argparse
 import os
-from scraper import USPDataCollector
-from utils import save_data_to_json, load_data_from_json
-from menu import MenuHandler
+import sys
+from checkpoint import CheckpointJournal
+from utils import filter_units, save_data, load_data
+from menu import MenuHandler, ShardedMenuHandler, SQLiteMenuHandler
+from shard_store import ShardError, ShardStore, load_data_from_shards
+from sqlite_store import SQLiteStore
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -21,55 +24,284 @@ if __name__ == "__main__":
         action='store_true',
         help='Força a coleta de dados mesmo que um arquivo salvo exista.'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Número de sessões do navegador usadas em paralelo durante a coleta (padrão: 1) ou, com\n'
+             '--reparse, de processos de parsing (padrão: um por núcleo).'
+    )
+    parser.add_argument(
+        '--chromedriver',
+        metavar='CAMINHO',
+        default=None,
+        help='Executável do chromedriver a usar. Sem esta opção, o driver resolvido na primeira coleta fica\n'
+             'fixado em chromedriver.json e é reutilizado sem acessar a rede.'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=2,
+        help='Threads que processam as páginas enquanto o navegador busca as seguintes (backend selenium;\n'
+             'padrão: 2).'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['selenium', 'http'],
+        default='selenium',
+        help='Forma de coleta: navegador (selenium) ou requisições HTTP diretas (http).'
+    )
+    parser.add_argument(
+        '--extraction',
+        choices=['script', 'html'],
+        default='script',
+        help='Como o backend selenium lê a grade: script executado na página, que devolve só os campos\n'
+             'usados (script), ou a página inteira processada em Python (html).'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='Máximo de requisições simultâneas no backend http (padrão: 8).'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=None,
+        help='Máximo de requisições por segundo no backend http (padrão: sem limite).'
+    )
+    parser.add_argument(
+        '--base-url',
+        default=None,
+        help='URL do formulário do Júpiter Web (útil para apontar para um servidor local de testes).'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Retoma uma coleta interrompida, pulando unidades e cursos já registrados no checkpoint.'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Refaz a coleta reaproveitando os cursos cuja grade não mudou desde a última coleta. Só são\n'
+             'comparados cursos coletados com o mesmo --backend e --extraction.'
+    )
+    parser.add_argument(
+        '--reparse',
+        action='store_true',
+        help='Reconstrói os dados só a partir das páginas guardadas na última coleta (pasta .pages ao lado\n'
+             'do arquivo de dados), refazendo o parsing em paralelo e sem acessar o Júpiter Web.'
+    )
+    parser.add_argument(
+        '--page-cache',
+        metavar='PASTA',
+        default=None,
+        help='Pasta do cache de páginas usado pela coleta e pelo --reparse (padrão: usp_data.pages, ao lado\n'
+             'do arquivo de dados).'
+    )
+    parser.add_argument(
+        '--data-file',
+        default='usp_data.json',
+        help="Arquivo de dados. A extensão define o formato: '.json', '.jsonl' (JSON Lines, lido e escrito\n"
+             "registro a registro), '.snap' (snapshot binário), '.db' (SQLite, consultado sem carregar em memória)\n"
+             "ou '.shards' (diretório com um arquivo por unidade, lido sob demanda)."
+    )
+    parser.add_argument(
+        '--snapshot',
+        action='store_true',
+        help='Ao carregar um arquivo JSON/JSONL sem snapshot atualizado, grava o snapshot binário (.snap)\n'
+             'ao lado dele para acelerar as próximas execuções. A coleta já grava o snapshot ao salvar.'
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Salva o JSON sem indentação, gerando um arquivo menor.'
+    )
+    parser.add_argument(
+        '--batch',
+        metavar='ARQUIVO',
+        default=None,
+        help="Executa os comandos do arquivo (um por linha; '-' lê da entrada padrão) sem abrir o menu,\n"
+             "escrevendo um resultado em JSON por comando."
+    )
+    parser.add_argument(
+        '--batch-format',
+        choices=['jsonl', 'json'],
+        default='jsonl',
+        help='Formato da saída do modo em lote: um registro por linha (jsonl) ou um array JSON (json).'
+    )
+    parser.add_argument(
+        '--output',
+        default=None,
+        help='Arquivo onde gravar a saída do modo em lote (padrão: saída padrão).'
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Sobe um serviço HTTP local que responde às consultas do menu em JSON, em vez de abrir o menu.'
+    )
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Endereço do serviço HTTP (padrão: 127.0.0.1).'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8080,
+        help='Porta do serviço HTTP (padrão: 8080).'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='No menu interativo ou com --serve, recarrega os dados quando o arquivo (JSON, JSONL ou .snap)\n'
+             'é atualizado por uma nova coleta, sem reiniciar o programa.'
+    )
     args = parser.parse_args()
+    if args.batch and args.serve:
+        parser.error('--batch e --serve não podem ser usados juntos.')
+    if args.reparse and (args.resume or args.incremental):
+        parser.error('--reparse não usa o checkpoint; não pode ser combinado com --resume ou --incremental.')
+
+    if args.batch:
+        # No modo em lote a saída padrão fica reservada para os resultados; as mensagens
+        # de carga e coleta vão para stderr.
+        sys.stdout = sys.stderr
 
-    DATA_FILE = 'usp_data.json'
+    DATA_FILE = args.data_file
+    CHECKPOINT_FILE = os.path.splitext(DATA_FILE)[0] + '.checkpoint.jsonl'
+    METRICS_FILE = os.path.splitext(DATA_FILE)[0] + '.metrics.json'
+    PAGE_CACHE_DIR = args.page_cache or os.path.splitext(DATA_FILE)[0] + '.pages'
     unidades, cursos, disciplinas = [], [], {}
+    use_sqlite = DATA_FILE.endswith('.db')
+    use_shards = DATA_FILE.endswith('.shards')
+    # Menus que consultam o arquivo sob demanda em vez de receber os dados já carregados.
+    lazy_menu = None
     
-    data_loaded_from_file = not args.force_scrape and os.path.exists(DATA_FILE)
+    data_loaded_from_file = (
+        not (args.force_scrape or args.resume or args.incremental or args.reparse) and os.path.exists(DATA_FILE)
+    )
+    should_filter = data_loaded_from_file and args.num_unidades is not None and args.num_unidades > 0
 
     if not data_loaded_from_file:
+        # As dependências da coleta (selenium, bs4, aiohttp...) só são importadas aqui, para que
+        # abrir o menu com os dados salvos não pague o custo delas.
+        from page_cache import CacheReparser, PageCache, PageCacheError
+
         num_str = args.num_unidades or "todas as"
-        print(f"Iniciando coleta de dados para {num_str} unidades. Isso pode levar vários minutos...")
+        if args.reparse:
+            print(f"Reconstruindo os dados de {num_str} unidades a partir de '{PAGE_CACHE_DIR}'...")
+        else:
+            print(f"Iniciando coleta de dados para {num_str} unidades. Isso pode levar vários minutos...")
         
-        collector = USPDataCollector(max_units=args.num_unidades)
+        # O hash das grades depende do backend e do modo de extração (veja checkpoint.py).
+        modo = 'http' if args.backend == 'http' else f'selenium-{args.extraction}'
+        journal = None if args.reparse else CheckpointJournal(
+            CHECKPOINT_FILE, resume=args.resume, incremental=args.incremental, modo=modo
+        )
+        # As páginas baixadas ficam guardadas para que um --reparse refaça o parsing sem nova coleta.
+        page_cache = PageCache(PAGE_CACHE_DIR)
+        # Com SQLite, cada unidade é gravada no banco assim que termina de ser coletada.
+        store = SQLiteStore(DATA_FILE) if use_sqlite else None
+        if store is not None:
+            store.begin_coleta(resume=args.resume)
+        if args.reparse:
+            collector = CacheReparser(
+                page_cache, max_units=args.num_unidades, workers=args.workers, store=store,
+                metrics_file=METRICS_FILE
+            )
+        elif args.backend == 'http':
+            from http_scraper import USPHttpCollector
+            collector = USPHttpCollector(
+                max_units=args.num_unidades, concurrency=args.concurrency,
+                rate_limit=args.rate_limit, base_url=args.base_url, journal=journal, store=store,
+                metrics_file=METRICS_FILE, page_cache=page_cache
+            )
+        else:
+            from scraper import USPDataCollector
+            collector = USPDataCollector(
+                max_units=args.num_unidades, workers=args.workers or 1, base_url=args.base_url,
+                journal=journal, store=store, metrics_file=METRICS_FILE, extraction=args.extraction,
+                page_cache=page_cache, parse_workers=args.parse_workers, driver_path=args.chromedriver
+            )
         try:
             unidades, cursos, disciplinas = collector.collect_data()
-            if unidades:
-                save_data_to_json(unidades, cursos, disciplinas, DATA_FILE)
+            if store is not None:
+                store.finish_coleta()
+            elif unidades:
+                save_data(unidades, cursos, disciplinas, DATA_FILE, compact=args.compact)
+            if journal is not None:
+                journal.finish()
+        except PageCacheError as e:
+            print(f"ERRO: {e}")
         except Exception as e:
             print(f"\nOcorreu um erro fatal durante a coleta: {e}")
+            if journal is not None:
+                print(f"O progresso foi salvo em '{CHECKPOINT_FILE}'. Use --resume para continuar de onde parou.")
+        finally:
+            if journal is not None:
+                journal.close()
+            page_cache.close()
+            if store is not None:
+                store.close()
+    elif use_sqlite and not should_filter:
+        lazy_menu = SQLiteMenuHandler(SQLiteStore(DATA_FILE))
+    elif use_shards:
+        # Só os shards das unidades pedidas são lidos; sem filtro, o menu lê cada shard
+        # quando um comando precisa dele.
+        try:
+            if should_filter:
+                print(f"Carregando as primeiras {args.num_unidades} unidades de '{DATA_FILE}'...")
+                unidades, cursos, disciplinas = load_data_from_shards(DATA_FILE, args.num_unidades)
+                should_filter = False
+            else:
+                lazy_menu = ShardedMenuHandler(ShardStore(DATA_FILE))
+        except ShardError as e:
+            print(f"ERRO: {e}")
     else:
-        unidades, cursos, disciplinas = load_data_from_json(DATA_FILE)
+        unidades, cursos, disciplinas = load_data(DATA_FILE, write_snapshot=args.snapshot)
 
-    if data_loaded_from_file and args.num_unidades is not None and args.num_unidades > 0:
+    if should_filter:
         print(f"\nFiltrando dados para exibir apenas as primeiras {args.num_unidades} unidades...")
+        unidades, cursos, disciplinas = filter_units(unidades, cursos, disciplinas, args.num_unidades)
 
-        unidades_filtradas = unidades[:args.num_unidades]
-        nomes_unidades_filtradas = {u.nome for u in unidades_filtradas}
-
-        cursos_filtrados = [c for c in cursos if c.unidade in nomes_unidades_filtradas]
-        nomes_cursos_filtrados = {c.nome for c in cursos_filtrados}
-
-        disciplinas_filtradas = {}
-        for codigo, disciplina in disciplinas.items():
-            disciplina.cursos.intersection_update(nomes_cursos_filtrados)
-            if disciplina.cursos:
-                disciplinas_filtradas[codigo] = disciplina
-        
-        unidades = unidades_filtradas
-        cursos = cursos_filtrados
-        disciplinas = disciplinas_filtradas
+    if lazy_menu is not None:
+        num_unidades, num_cursos, num_disciplinas = lazy_menu.counts()
+    else:
+        num_unidades, num_cursos, num_disciplinas = len(unidades), len(cursos), len(disciplinas)
 
     print("\n--- Resumo dos Dados ---")
-    print(f"Total de Unidades: {len(unidades)}")
-    print(f"Total de Cursos: {len(cursos)}")
-    print(f"Total de Disciplinas Únicas: {len(disciplinas)}")
+    print(f"Total de Unidades: {num_unidades}")
+    print(f"Total de Cursos: {num_cursos}")
+    print(f"Total de Disciplinas Únicas: {num_disciplinas}")
 
-    if not unidades:
+    if not num_unidades:
         print("\nNenhum dado para consultar. Execute o programa sem a flag '--force-scrape' para coletar os dados.")
     else:
-        menu = MenuHandler(unidades, cursos, disciplinas)
-        menu.run()
+        menu = lazy_menu or MenuHandler(unidades, cursos, disciplinas)
+        watcher = None
+        if args.watch and not args.batch:
+            if lazy_menu is not None or use_sqlite or use_shards:
+                print("Aviso: --watch só vale para arquivos JSON, JSONL ou .snap carregados em memória; ignorado.")
+            else:
+                from hot_reload import DataFileWatcher
+
+                def reload_data():
+                    data = load_data(DATA_FILE, write_snapshot=args.snapshot)
+                    return filter_units(*data, args.num_unidades) if args.num_unidades else data
+                watcher = DataFileWatcher(DATA_FILE, reload_data)
+        if args.batch:
+            from batch import run_batch
+            errors = run_batch(menu, args.batch, args.batch_format, args.output)
+            if errors:
+                print(f"\n{errors} comando(s) do lote terminaram com erro.")
+        elif args.serve:
+            from query_server import serve
+            serve(menu, args.host, args.port, watcher=watcher)
+        elif watcher is not None:
+            from hot_reload import LiveMenu
+            LiveMenu(menu, watcher).run()
+        else:
+            menu.run()
 
     print("\nExecução concluída.")
\ No newline at end of file
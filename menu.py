@@ -1,5 +1,35 @@
-from typing import List, Dict, Optional
+import heapq
+import sys
+from itertools import chain
+from typing import TYPE_CHECKING, Iterable, List, Dict, Optional, Sequence, Tuple
+from column_index import Condicao, FilterError, TableIndex, bitmap_count, parse_conditions
 from data_models import Unidade, Curso, Disciplina
+from render import Linha, OutputBuffer, Pager, Paginacao, PagingError, parse_paging, render_rows
+from result_cache import LRUCache
+from search_index import SearchIndex
+from stats import DISCIPLINE_LISTS, DURATION_FIELDS, DistribuicaoUnidade, Resumo, StatsEngine
+from shard_store import ShardStore
+from sqlite_store import DISCIPLINE_FIELDS, SQLiteStore, parse_sigla
+
+if TYPE_CHECKING:
+    # similarity (e o NumPy) só é importado no primeiro SIMILARES ou PARES.
+    from similarity import Similaridade, SimilarityEngine
+
+CURSO_COLUMNS = 'nome, unidade, duracao_ideal, duracao_minima, duracao_maxima'
+DISCIPLINA_COLUMNS = 'codigo, nome, ' + ', '.join(DISCIPLINE_FIELDS)
+DISCIPLINE_SEARCH_LIMIT = 20
+SIMILAR_COURSES_LIMIT = 10
+# Saídas de comandos guardadas pelo cache de resultados do menu.
+RESULT_CACHE_SIZE = 128
+# Comandos cuja saída não depende dos dados (ou que encerram o menu) não passam pelo cache.
+UNCACHED_COMMANDS = ('AJUDA', 'SAIR')
+# Comandos que repetem os argumentos na saída (o termo buscado, a unidade do filtro): na
+# chave do cache eles só têm os espaços normalizados, sem ignorar maiúsculas.
+ECHOING_COMMANDS = ('BUSCAR', 'FILTRAR')
+DURATION_LABELS = {'duracao_ideal': 'Ideal', 'duracao_minima': 'Mínima', 'duracao_maxima': 'Máxima'}
+# Campos aceitos pelo FILTRAR para cursos (C) e disciplinas (D).
+FILTER_FIELDS = {'C': DURATION_FIELDS, 'D': DISCIPLINE_FIELDS}
+FILTER_USAGE = "Formato inválido. Use: FILTRAR C|D campo=N..M [campo>N ...] [unidade=SIGLA]"
 
 class MenuHandler:
     """Gerencia o menu interativo para consultar os dados da USP."""
@@ -8,228 +38,849 @@ class MenuHandler:
         self.unidades_list = sorted(unidades, key=lambda u: u.nome)
         self.cursos_list = sorted(cursos, key=lambda c: c.nome)
         self.disciplinas_db = disciplinas
-        self.disciplinas_by_name_map = {d.nome.lower(): d for d in disciplinas.values()}
+        self._build_unit_index()
+        self._disciplinas_by_name_map: Optional[Dict[str, Disciplina]] = None
+        self._cursos_index: Optional[SearchIndex] = None
+        self._disciplinas_index: Optional[SearchIndex] = None
+        self._stats: Optional[StatsEngine] = None
+        self._similarity: Optional['SimilarityEngine'] = None
+        self._cursos_filter: Optional[TableIndex[Curso]] = None
+        self._disciplinas_filter: Optional[TableIndex[Disciplina]] = None
+        self.out = OutputBuffer()
+        # Definido por run() quando a saída é um terminal: as listagens passam a ser paginadas.
+        self.pager: Optional[Pager] = None
+        self.result_cache: LRUCache[Tuple[str, ...]] = LRUCache(RESULT_CACHE_SIZE)
+
+    def _build_unit_index(self):
+        """
+        Indexa as unidades pelo nome e pela sigla (em minúsculas) e guarda os cursos de cada
+        uma já ordenados. Em caso de chave repetida vale a primeira unidade em ordem alfabética.
+        """
+        self._unidades_by_key: Dict[str, Unidade] = {}
+        self._cursos_by_unidade: Dict[str, Tuple[Curso, ...]] = {}
+        for unidade in self.unidades_list:
+            self._unidades_by_key.setdefault(unidade.nome.lower(), unidade)
+            sigla = parse_sigla(unidade.nome)
+            if sigla:
+                self._unidades_by_key.setdefault(sigla.lower(), unidade)
+            self._cursos_by_unidade[unidade.nome] = tuple(sorted(unidade.cursos, key=lambda c: c.nome))
+
+    @property
+    def disciplinas_by_name_map(self) -> Dict[str, Disciplina]:
+        """Mapa nome -> disciplina, montado só na primeira busca por nome."""
+        if self._disciplinas_by_name_map is None:
+            self._disciplinas_by_name_map = {d.nome.lower(): d for d in self.disciplinas_db.values()}
+        return self._disciplinas_by_name_map
+
+    # Os índices de busca também são montados uma única vez, na primeira busca, para não
+    # atrasar a inicialização (nem materializar todas as disciplinas de um snapshot).
+    @property
+    def cursos_index(self) -> SearchIndex:
+        if self._cursos_index is None:
+            self._cursos_index = SearchIndex(self._all_cursos(), key=lambda c: c.nome)
+        return self._cursos_index
+
+    @property
+    def disciplinas_index(self) -> SearchIndex:
+        if self._disciplinas_index is None:
+            self._disciplinas_index = SearchIndex(self._all_disciplinas(), key=lambda d: f"{d.codigo} {d.nome}")
+        return self._disciplinas_index
+
+    # Os índices de colunas do FILTRAR seguem a ordem das listagens: cursos agrupados por
+    # unidade (como em C) e disciplinas por código.
+    @property
+    def cursos_filter(self) -> TableIndex[Curso]:
+        if self._cursos_filter is None:
+            cursos: List[Curso] = []
+            grupos: Dict[str, List[int]] = {}
+            for unidade in self.unidades_list:
+                start = len(cursos)
+                cursos.extend(self._sorted_cursos(unidade))
+                grupos.setdefault(unidade.nome, []).extend(range(start, len(cursos)))
+            self._cursos_filter = TableIndex(cursos, DURATION_FIELDS, grupos)
+        return self._cursos_filter
+
+    @property
+    def disciplinas_filter(self) -> TableIndex[Disciplina]:
+        if self._disciplinas_filter is None:
+            disciplinas = sorted(self._all_disciplinas(), key=lambda d: d.codigo)
+            ids = {d.codigo: i for i, d in enumerate(disciplinas)}
+            grupos = {
+                nome: [ids[codigo] for codigo in codigos if codigo in ids]
+                for nome, codigos in self._unit_discipline_codes().items()
+            }
+            self._disciplinas_filter = TableIndex(disciplinas, DISCIPLINE_FIELDS, grupos)
+        return self._disciplinas_filter
+
+    @property
+    def stats(self) -> StatsEngine:
+        """Agregados do STATS, calculados no primeiro uso e reaproveitados nas chamadas seguintes."""
+        if self._stats is None:
+            self._stats = StatsEngine(self.unidades_list, self.cursos_list, self.disciplinas_db)
+        return self._stats
+
+    @property
+    def similarity(self) -> 'SimilarityEngine':
+        """Bitsets das disciplinas obrigatórias de cada curso, montados no primeiro SIMILARES ou PARES."""
+        if self._similarity is None:
+            from similarity import SimilarityEngine
+            self._similarity = SimilarityEngine.from_cursos(self.cursos_list)
+        return self._similarity
+
+    def build_indexes(self) -> 'MenuHandler':
+        """
+        Monta de uma vez os índices de busca e de filtro e as estatísticas, que normalmente só
+        são montados no primeiro uso. Usado quando o menu é preparado fora da thread que atende
+        os comandos (serviço HTTP, recarga dos dados), para que nenhum comando pague esse custo.
+        """
+        self.cursos_index, self.disciplinas_index, self.cursos_filter, self.disciplinas_filter, self.stats
+        return self
+
+    # --- Acesso aos dados ---
+    # As telas abaixo só consultam os dados por estes métodos, o que permite trocar a
+    # fonte (listas em memória ou banco SQLite) sem alterar a apresentação.
+
+    def _sorted_cursos(self, unidade: Unidade) -> Sequence[Curso]:
+        """Cursos de uma unidade em ordem alfabética."""
+        cursos = self._cursos_by_unidade.get(unidade.nome)
+        if cursos is None:
+            cursos = tuple(sorted(unidade.cursos, key=lambda c: c.nome))
+        return cursos
+
+    def _load_curso(self, curso: Curso) -> Curso:
+        """Garante que o curso tem suas listas de disciplinas carregadas."""
+        return curso
+
+    def _find_disciplina(self, query: str) -> Optional[Disciplina]:
+        """Encontra uma disciplina pelo código ou pelo nome exato (sem diferenciar maiúsculas)."""
+        return self.disciplinas_db.get(query.upper()) or self.disciplinas_by_name_map.get(query.lower())
+
+    def _common_disciplines(self, limit: Optional[int] = None) -> Iterable[Tuple[Disciplina, int]]:
+        """
+        Disciplinas presentes em mais de um curso, da mais para a menos compartilhada (empates
+        na ordem original). São geradas sob demanda a partir de um heap, sem ordenar todas.
+        """
+        heap = [(-len(d.cursos), i, d) for i, d in enumerate(self.disciplinas_db.values()) if len(d.cursos) > 1]
+        heapq.heapify(heap)
+        for _ in range(len(heap) if limit is None else min(limit, len(heap))):
+            num_cursos, _, disciplina = heapq.heappop(heap)
+            yield disciplina, -num_cursos
+
+    def _all_cursos(self) -> List[Curso]:
+        return self.cursos_list
+
+    def _all_disciplinas(self) -> List[Disciplina]:
+        return list(self.disciplinas_db.values())
+
+    def _unit_discipline_codes(self) -> Dict[str, Iterable[str]]:
+        """Códigos das disciplinas oferecidas pelos cursos de cada unidade."""
+        codigos: Dict[str, set] = {}
+        for unidade in self.unidades_list:
+            codigos.setdefault(unidade.nome, set()).update(
+                d.codigo for curso in unidade.cursos for disc_type in DISCIPLINE_LISTS for d in getattr(curso, disc_type)
+            )
+        return codigos
+
+    def _filter_courses(self, condicoes: List[Condicao], unidade: Optional[Unidade] = None) -> Tuple[int, Iterable[Curso]]:
+        """Quantidade e cursos (na ordem da listagem C) que satisfazem todas as condições."""
+        bitmap = self.cursos_filter.select(condicoes, unidade.nome if unidade else None)
+        return bitmap_count(bitmap), self.cursos_filter.items_in(bitmap)
+
+    def _filter_disciplines(self, condicoes: List[Condicao],
+                            unidade: Optional[Unidade] = None) -> Tuple[int, Iterable[Disciplina]]:
+        """Quantidade e disciplinas (por código) que satisfazem todas as condições."""
+        bitmap = self.disciplinas_filter.select(condicoes, unidade.nome if unidade else None)
+        return bitmap_count(bitmap), self.disciplinas_filter.items_in(bitmap)
+
+    def _matching_courses(self, term: str) -> List[Curso]:
+        """Cursos cujo nome casa com o termo, do mais para o menos relevante."""
+        return self.cursos_index.search(term)
+
+    def _matching_disciplines(self, term: str, limit: int) -> List[Disciplina]:
+        """As `limit` disciplinas cujo código ou nome casa melhor com o termo."""
+        return self.disciplinas_index.search(term, limit)
+
+    def _unit_with_most_courses(self) -> Tuple[Unidade, int]:
+        return self.stats.unit_with_most_courses()
+
+    def _course_with_most_mandatory(self) -> Tuple[Optional[Curso], int]:
+        return self.stats.course_with_most_mandatory()
+
+    def _top_disciplines(self, k: int) -> List[Tuple[Disciplina, int]]:
+        """As `k` disciplinas usadas em mais cursos."""
+        return self.stats.top_disciplines(k)
+
+    def _unit_distributions(self) -> List[DistribuicaoUnidade]:
+        """Média, mínimo e máximo de créditos-aula e carga horária das disciplinas de cada unidade."""
+        return self.stats.unit_distributions()
+
+    def _duration_histograms(self) -> Dict[str, List[Tuple[int, int]]]:
+        """Número de cursos por duração (ideal, mínima e máxima), em semestres."""
+        return self.stats.duration_histograms()
+
+    def _similar_courses(self, curso: Curso, k: int) -> List['Similaridade']:
+        """Os `k` cursos com mais disciplinas obrigatórias em comum com `curso` (índice de Jaccard)."""
+        return self.similarity.similar_to(curso, k)
+
+    def _overlapping_pairs(self, k: int) -> List['Similaridade']:
+        """Os `k` pares de cursos com mais disciplinas obrigatórias em comum (índice de Jaccard)."""
+        return self.similarity.top_pairs(k)
 
     def _print_help(self):
         """Imprime o menu de ajuda com as instruções de comando."""
-        print("\n--- Menu de Consulta ---")
-        print("Comandos de Listagem Geral:")
-        print("  U                               - Lista todas as unidades.")
-        print("  C                               - Lista todos os cursos, agrupados por unidade.")
-        print("  D COMUM                         - Lista disciplinas que pertencem a mais de um curso.")
-        print("\nComandos de Consulta Específica:")
-        print("  U [sigla/nome]                  - Mostra os cursos de uma unidade específica.")
-        print("  C [sigla/nome] [Nº]             - Mostra os dados de um curso específico.")
-        print("  DC [sigla/nome] [Nº]            - Lista todas as disciplinas de um curso específico.")
-        print("  D [código/nome]                 - Mostra os dados de uma disciplina específica.")
-        print("\nComandos de Busca e Estatísticas:")
-        print("  BUSCAR C [termo]                - Busca cursos que contêm o termo no nome.")
-        print("  STATS                           - Mostra estatísticas gerais sobre os dados coletados.")
-        print("  AJUDA                           - Mostra este menu de ajuda.")
-        print("  SAIR                            - Encerra o programa.")
-        print("-" * 35)
+        self.out.line("\n--- Menu de Consulta ---")
+        self.out.line("Comandos de Listagem Geral:")
+        self.out.line("  U                               - Lista todas as unidades.")
+        self.out.line("  C                               - Lista todos os cursos, agrupados por unidade.")
+        self.out.line("  D COMUM                         - Lista disciplinas que pertencem a mais de um curso.")
+        self.out.line("\nComandos de Consulta Específica:")
+        self.out.line("  U [sigla/nome]                  - Mostra os cursos de uma unidade específica.")
+        self.out.line("  C [sigla/nome] [Nº]             - Mostra os dados de um curso específico.")
+        self.out.line("  DC [sigla/nome] [Nº]            - Lista todas as disciplinas de um curso específico.")
+        self.out.line("  D [código/nome]                 - Mostra os dados de uma disciplina específica.")
+        self.out.line("\nComandos de Busca e Estatísticas:")
+        self.out.line("  BUSCAR C [termo]                - Busca cursos pelo nome (sem diferenciar acentos).")
+        self.out.line("  BUSCAR D [termo]                - Busca disciplinas pelo código ou nome.")
+        self.out.line("  FILTRAR C|D [condições]         - Filtra cursos ou disciplinas por faixas de valores.")
+        self.out.line("  STATS                           - Mostra estatísticas gerais sobre os dados coletados.")
+        self.out.line("  SIMILARES [sigla/nome] [Nº]     - Cursos com mais disciplinas obrigatórias em comum com um curso.")
+        self.out.line("  PARES [quantidade]              - Pares de cursos com mais disciplinas obrigatórias em comum.")
+        self.out.line("  AJUDA                           - Mostra este menu de ajuda.")
+        self.out.line("  SAIR                            - Encerra o programa.")
+        self.out.line("\nListagens aceitam --limit N e --offset N (ex.: D COMUM --limit 50 --offset 100).")
+        self.out.line("Condições do FILTRAR: campo=N, campo=N..M, campo>N, campo>=N, campo<N, campo<=N e unidade=SIGLA")
+        self.out.line("  (ex.: FILTRAR D creditos_aula=4..6 carga_horaria>60; FILTRAR C duracao_ideal<=8).")
+        self.out.line("-" * 35)
 
     def _find_unidade(self, query: str) -> Optional[Unidade]:
         """Encontra uma unidade por nome completo ou pela sigla entre parênteses."""
-        query_lower = query.lower()
-        sigla_pattern = f"( {query_lower} )"
-        for unidade in self.unidades_list:
-            unidade_nome_lower = unidade.nome.lower()
-            if query_lower == unidade_nome_lower or sigla_pattern in unidade_nome_lower:
-                return unidade
-        return None
-
-    def _display_all_unidades(self):
-        print("\n--- Todas as Unidades ---")
-        for i, unidade in enumerate(self.unidades_list):
-            print(f"{i+1:2d}. {unidade.nome}")
-
-    def _display_all_cursos(self):
-        print("\n--- Todos os Cursos ---")
-        for unidade in self.unidades_list:
-            if unidade.cursos:
-                print(f"\n> {unidade.nome}:")
-                for curso in sorted(unidade.cursos, key=lambda c: c.nome):
-                    print(f"  - {curso.nome}")
+        return self._unidades_by_key.get(query.lower())
+
+    def _render(self, rows: Iterable[Linha], paginacao: Paginacao) -> int:
+        """Escreve as linhas de uma listagem, paginadas conforme `paginacao` e o pager."""
+        return render_rows(self.out, rows, paginacao, self.pager)
 
-    def _display_unidade_details(self, unidade: Unidade):
+    def _display_all_unidades(self, paginacao: Paginacao = Paginacao()):
+        self.out.line("\n--- Todas as Unidades ---")
+        self._render(((None, f"{i+1:2d}. {unidade.nome}") for i, unidade in enumerate(self.unidades_list)), paginacao)
+
+    def _display_all_cursos(self, paginacao: Paginacao = Paginacao()):
+        self.out.line("\n--- Todos os Cursos ---")
+        self._render((
+            (f"\n> {unidade.nome}:", f"  - {curso.nome}")
+            for unidade in self.unidades_list for curso in self._sorted_cursos(unidade)
+        ), paginacao)
+
+    def _display_unidade_details(self, unidade: Unidade, paginacao: Paginacao = Paginacao()):
         """Imprime os detalhes de uma unidade encontrada."""
-        print(f"\n> Unidade: {unidade.nome}")
-        if not unidade.cursos:
-            print("  - Nenhum curso encontrado para esta unidade.")
+        self.out.line(f"\n> Unidade: {unidade.nome}")
+        cursos = self._sorted_cursos(unidade)
+        if not cursos:
+            self.out.line("  - Nenhum curso encontrado para esta unidade.")
             return
-        print("  Cursos oferecidos:")
-        for i, curso in enumerate(sorted(unidade.cursos, key=lambda c: c.nome)):
-            print(f"    {i+1}. {curso.nome}")
+        self.out.line("  Cursos oferecidos:")
+        self._render(((None, f"    {i+1}. {curso.nome}") for i, curso in enumerate(cursos)), paginacao)
 
     def _get_curso_by_number(self, unit_query: str, course_number_str: str) -> Optional[Curso]:
         """Busca um curso em uma unidade pelo seu número na lista ordenada."""
         unidade = self._find_unidade(unit_query)
         if not unidade:
-            print(f"ERRO: Unidade '{unit_query}' não encontrada.")
+            self.out.line(f"ERRO: Unidade '{unit_query}' não encontrada.")
             return None
         try:
             course_number = int(course_number_str)
-            sorted_cursos = sorted(unidade.cursos, key=lambda c: c.nome)
+            sorted_cursos = self._sorted_cursos(unidade)
             if 1 <= course_number <= len(sorted_cursos):
-                return sorted_cursos[course_number - 1]
+                return self._load_curso(sorted_cursos[course_number - 1])
             else:
-                print(f"ERRO: Número do curso inválido. A unidade tem apenas {len(sorted_cursos)} cursos.")
+                self.out.line(f"ERRO: Número do curso inválido. A unidade tem apenas {len(sorted_cursos)} cursos.")
                 return None
         except ValueError:
-            print(f"ERRO: '{course_number_str}' não é um número de curso válido.")
+            self.out.line(f"ERRO: '{course_number_str}' não é um número de curso válido.")
             return None
 
     def _find_and_display_curso_details(self, curso: Curso):
         """Exibe os dados de um objeto de curso."""
-        print(f"\n> Curso: {curso.nome}")
-        print(f"  - Unidade: {curso.unidade}")
-        print(f"  - Duração Ideal: {curso.duracao_ideal} semestres")
-        print(f"  - Duração Mínima: {curso.duracao_minima} semestres")
-        print(f"  - Duração Máxima: {curso.duracao_maxima} semestres")
-        print("\n  Quantidade de Disciplinas:")
-        print(f"    - Obrigatórias: {len(curso.obrigatorias)}")
-        print(f"    - Optativas Eletivas: {len(curso.optativas_eletivas)}")
-        print(f"    - Optativas Livres: {len(curso.optativas_livres)}")
-
-    def _find_and_display_course_disciplines(self, curso: Curso):
-        """Exibe as listas de disciplinas de um objeto de curso."""
-        print(f"\n--- Disciplinas do Curso: {curso.nome} ---")
-        
-        if curso.obrigatorias:
-            print("\n> Disciplinas Obrigatórias:")
-            for disc in sorted(curso.obrigatorias, key=lambda d: d.nome):
-                print(f"  - {disc.codigo} - {disc.nome}")
-        
-        if curso.optativas_eletivas:
-            print("\n> Disciplinas Optativas Eletivas:")
-            for disc in sorted(curso.optativas_eletivas, key=lambda d: d.nome):
-                print(f"  - {disc.codigo} - {disc.nome}")
-        
-        if curso.optativas_livres:
-            print("\n> Disciplinas Optativas Livres:")
-            for disc in sorted(curso.optativas_livres, key=lambda d: d.nome):
-                print(f"  - {disc.codigo} - {disc.nome}")
+        self.out.line(f"\n> Curso: {curso.nome}")
+        self.out.line(f"  - Unidade: {curso.unidade}")
+        self.out.line(f"  - Duração Ideal: {curso.duracao_ideal} semestres")
+        self.out.line(f"  - Duração Mínima: {curso.duracao_minima} semestres")
+        self.out.line(f"  - Duração Máxima: {curso.duracao_maxima} semestres")
+        self.out.line("\n  Quantidade de Disciplinas:")
+        self.out.line(f"    - Obrigatórias: {len(curso.obrigatorias)}")
+        self.out.line(f"    - Optativas Eletivas: {len(curso.optativas_eletivas)}")
+        self.out.line(f"    - Optativas Livres: {len(curso.optativas_livres)}")
 
-        if not (curso.obrigatorias or curso.optativas_eletivas or curso.optativas_livres):
-            print("Nenhuma disciplina encontrada para este curso.")
+    def _find_and_display_course_disciplines(self, curso: Curso, paginacao: Paginacao = Paginacao()):
+        """Exibe as listas de disciplinas de um objeto de curso."""
+        self.out.line(f"\n--- Disciplinas do Curso: {curso.nome} ---")
+        sections = (
+            ("\n> Disciplinas Obrigatórias:", curso.obrigatorias),
+            ("\n> Disciplinas Optativas Eletivas:", curso.optativas_eletivas),
+            ("\n> Disciplinas Optativas Livres:", curso.optativas_livres),
+        )
+        if not any(disciplinas for _, disciplinas in sections):
+            self.out.line("Nenhuma disciplina encontrada para este curso.")
+            return
+        # Cada lista só é ordenada quando a listagem chega nela.
+        self._render((
+            (titulo, f"  - {disc.codigo} - {disc.nome}")
+            for titulo, disciplinas in sections for disc in sorted(disciplinas, key=lambda d: d.nome)
+        ), paginacao)
 
-    def _find_and_display_disciplina(self, query: str):
+    def _find_and_display_disciplina(self, query: str, paginacao: Paginacao = Paginacao()):
         """Encontra e exibe uma disciplina por código ou nome."""
-        disciplina = self.disciplinas_db.get(query.upper()) or self.disciplinas_by_name_map.get(query.lower())
+        disciplina = self._find_disciplina(query)
         if not disciplina:
-            print(f"ERRO: Disciplina '{query}' não encontrada.")
+            self.out.line(f"ERRO: Disciplina '{query}' não encontrada.")
             return
         
-        print(f"\n> Disciplina: {disciplina.nome} ({disciplina.codigo})")
-        print(f"  - Créditos Aula: {disciplina.creditos_aula}, Créditos Trabalho: {disciplina.creditos_trabalho}")
-        print(f"  - Carga Horária Total: {disciplina.carga_horaria}h")
+        self.out.line(f"\n> Disciplina: {disciplina.nome} ({disciplina.codigo})")
+        self.out.line(f"  - Créditos Aula: {disciplina.creditos_aula}, Créditos Trabalho: {disciplina.creditos_trabalho}")
+        self.out.line(f"  - Carga Horária Total: {disciplina.carga_horaria}h")
         if disciplina.cursos:
-            print("\n  Oferecida nos seguintes cursos:")
-            for i, curso_nome in enumerate(sorted(list(disciplina.cursos))):
-                print(f"    {i+1}. {curso_nome}")
+            self.out.line("\n  Oferecida nos seguintes cursos:")
+            self._render(((None, f"    {i+1}. {nome}") for i, nome in enumerate(sorted(disciplina.cursos))), paginacao)
 
-    def _display_common_disciplines(self):
+    def _display_common_disciplines(self, paginacao: Paginacao = Paginacao()):
         """Exibe disciplinas que são utilizadas em mais de um curso."""
-        print("\n--- Disciplinas Comuns (em mais de um curso) ---")
-        common_disciplines = [d for d in self.disciplinas_db.values() if len(d.cursos) > 1]
-        if not common_disciplines:
-            print("Nenhuma disciplina encontrada em mais de um curso.")
+        self.out.line("\n--- Disciplinas Comuns (em mais de um curso) ---")
+        # Uma a mais que o trecho pedido, para avisar quando a listagem continua.
+        common_disciplines = iter(self._common_disciplines(None if paginacao.stop is None else paginacao.stop + 1))
+        first = next(common_disciplines, None)
+        if first is None:
+            self.out.line("Nenhuma disciplina encontrada em mais de um curso.")
             return
-        
-        for disc in sorted(common_disciplines, key=lambda d: len(d.cursos), reverse=True):
-            print(f"- {disc.codigo} - {disc.nome} (usada em {len(disc.cursos)} cursos)")
 
-    def _search_courses(self, term: str):
+        self._render((
+            (None, f"- {disc.codigo} - {disc.nome} (usada em {num_cursos} cursos)")
+            for disc, num_cursos in chain([first], common_disciplines)
+        ), paginacao)
+
+    def _search_courses(self, term: str, paginacao: Paginacao = Paginacao()):
         """Busca cursos contendo um termo no nome."""
-        print(f"\n--- Buscando cursos com o termo '{term}' ---")
-        term_lower = term.lower()
-        found_courses = [c for c in self.cursos_list if term_lower in c.nome.lower()]
+        self.out.line(f"\n--- Buscando cursos com o termo '{term}' ---")
+        found_courses = self._matching_courses(term)
         if not found_courses:
-            print("Nenhum curso encontrado.")
+            self.out.line("Nenhum curso encontrado.")
             return
-        
-        for curso in found_courses:
-            print(f"- {curso.nome} ({curso.unidade})")
+
+        self._render(((None, f"- {curso.nome} ({curso.unidade})") for curso in found_courses), paginacao)
+
+    def _search_disciplines(self, term: str, paginacao: Paginacao = Paginacao()):
+        """
+        Busca disciplinas pelo código ou por palavras do nome. Sem --limit/--offset mostra as
+        DISCIPLINE_SEARCH_LIMIT mais relevantes; com eles, o trecho pedido do resultado completo.
+        """
+        self.out.line(f"\n--- Buscando disciplinas com o termo '{term}' ---")
+        if paginacao.is_default():
+            limit = DISCIPLINE_SEARCH_LIMIT + 1
+        else:
+            limit = None if paginacao.stop is None else paginacao.stop + 1
+        found = self._matching_disciplines(term, limit)
+        if not found:
+            self.out.line("Nenhuma disciplina encontrada.")
+            return
+
+        if not paginacao.is_default():
+            self._render(((None, f"- {disc.codigo} - {disc.nome}") for disc in found), paginacao)
+            return
+        for disc in found[:DISCIPLINE_SEARCH_LIMIT]:
+            self.out.line(f"- {disc.codigo} - {disc.nome}")
+        if len(found) > DISCIPLINE_SEARCH_LIMIT:
+            self.out.line(f"Mostrando as {DISCIPLINE_SEARCH_LIMIT} mais relevantes. Use --limit/--offset para ver outras.")
+
+    def _display_filter(self, tipo: str, args: str, paginacao: Paginacao = Paginacao()):
+        """Lista os cursos (C) ou disciplinas (D) que satisfazem todas as condições de `args`."""
+        condicoes, unit_query = parse_conditions(args, FILTER_FIELDS[tipo])
+        if not condicoes and unit_query is None:
+            self.out.line(FILTER_USAGE)
+            return
+        unidade = None
+        if unit_query is not None:
+            unidade = self._find_unidade(unit_query)
+            if not unidade:
+                self.out.line(f"ERRO: Unidade '{unit_query}' não encontrada.")
+                return
+
+        descricao = ' '.join([str(c) for c in condicoes] + ([f"unidade={unit_query}"] if unidade else []))
+        # Os valores dos campos filtrados são mostrados ao lado de cada item.
+        campos = list(dict.fromkeys(c.campo for c in condicoes))
+        def valores(item) -> str:
+            return f" ({', '.join(f'{campo}: {getattr(item, campo)}' for campo in campos)})" if campos else ""
+
+        if tipo == 'C':
+            total, cursos = self._filter_courses(condicoes, unidade)
+            self.out.line(f"\n--- Cursos com {descricao} ({total} encontrados) ---")
+            if not total:
+                self.out.line("Nenhum curso encontrado.")
+                return
+            self._render(((f"\n> {curso.unidade}:", f"  - {curso.nome}{valores(curso)}") for curso in cursos), paginacao)
+        else:
+            total, disciplinas = self._filter_disciplines(condicoes, unidade)
+            self.out.line(f"\n--- Disciplinas com {descricao} ({total} encontradas) ---")
+            if not total:
+                self.out.line("Nenhuma disciplina encontrada.")
+                return
+            self._render(((None, f"- {disc.codigo} - {disc.nome}{valores(disc)}") for disc in disciplinas), paginacao)
+
+    def _display_similar_courses(self, curso: Curso):
+        """Exibe os cursos cujas disciplinas obrigatórias mais se parecem com as de um curso."""
+        self.out.line(f"\n--- Cursos parecidos com: {curso.nome} ({curso.unidade}) ---")
+        similares = self._similar_courses(curso, SIMILAR_COURSES_LIMIT)
+        if not similares:
+            self.out.line("Nenhum curso com disciplinas obrigatórias em comum.")
+            return
+        for i, s in enumerate(similares):
+            self.out.line(f"  {i+1}. {s.outro.nome} ({s.outro.unidade})")
+            self.out.line(f"     Jaccard: {s.jaccard:.2f} | {s.comuns} obrigatórias em comum | sobreposição: {s.sobreposicao:.0%}")
+
+    def _display_overlapping_pairs(self, k: int):
+        """Exibe os pares de cursos com as grades obrigatórias mais parecidas."""
+        self.out.line(f"\n--- {k} pares de cursos com mais disciplinas obrigatórias em comum ---")
+        pares = self._overlapping_pairs(k)
+        if not pares:
+            self.out.line("Nenhum par de cursos com disciplinas obrigatórias em comum.")
+            return
+        for i, s in enumerate(pares):
+            self.out.line(f"  {i+1}. Jaccard: {s.jaccard:.2f} | {s.comuns} obrigatórias em comum | sobreposição: {s.sobreposicao:.0%}")
+            self.out.line(f"     - {s.curso.nome} ({s.curso.unidade})")
+            self.out.line(f"     - {s.outro.nome} ({s.outro.unidade})")
 
     def _display_stats(self):
         """Exibe estatísticas interessantes sobre os dados."""
         if not self.unidades_list:
-            print("Não há dados para gerar estatísticas.")
+            self.out.line("Não há dados para gerar estatísticas.")
             return
 
-        print("\n--- Estatísticas Gerais ---")
+        self.out.line("\n--- Estatísticas Gerais ---")
         
         # Unidade com mais cursos
-        unit_with_most_courses = max(self.unidades_list, key=lambda u: len(u.cursos))
-        print(f"Unidade com mais cursos: {unit_with_most_courses.nome} ({len(unit_with_most_courses.cursos)} cursos)")
+        unit_with_most_courses, num_cursos = self._unit_with_most_courses()
+        self.out.line(f"Unidade com mais cursos: {unit_with_most_courses.nome} ({num_cursos} cursos)")
 
         # Curso com mais disciplinas obrigatórias
-        course_with_most_mand = max(self.cursos_list, key=lambda c: len(c.obrigatorias))
-        print(f"Curso com mais disciplinas obrigatórias: {course_with_most_mand.nome} ({len(course_with_most_mand.obrigatorias)} disciplinas)")
+        course_with_most_mand, num_obrigatorias = self._course_with_most_mandatory()
+        if course_with_most_mand:
+            self.out.line(f"Curso com mais disciplinas obrigatórias: {course_with_most_mand.nome} ({num_obrigatorias} disciplinas)")
 
         # 5 disciplinas mais comuns
-        top_5_common = sorted(self.disciplinas_db.values(), key=lambda d: len(d.cursos), reverse=True)[:5]
-        print("\nTop 5 disciplinas mais comuns:")
-        for i, disc in enumerate(top_5_common):
-             print(f"  {i+1}. {disc.nome} ({disc.codigo}) - Usada em {len(disc.cursos)} cursos")
+        top_5_common = self._top_disciplines(5)
+        self.out.line("\nTop 5 disciplinas mais comuns:")
+        for i, (disc, num_cursos) in enumerate(top_5_common):
+             self.out.line(f"  {i+1}. {disc.nome} ({disc.codigo}) - Usada em {num_cursos} cursos")
+
+        # Créditos e carga horária por unidade
+        self.out.line("\nCréditos-aula e carga horária das disciplinas por unidade (média / mín. / máx.):")
+        for dist in self._unit_distributions():
+            cred, carga = dist.creditos_aula, dist.carga_horaria
+            self.out.line(f"  {dist.unidade}: {cred.media:.1f} / {cred.minimo} / {cred.maximo} créditos, "
+                  f"{carga.media:.1f}h / {carga.minimo}h / {carga.maximo}h ({dist.num_disciplinas} disciplinas)")
 
+        # Histogramas de duração dos cursos
+        self.out.line("\nDuração dos cursos (semestres: nº de cursos):")
+        for field, histogram in self._duration_histograms().items():
+            self.out.line(f"  {DURATION_LABELS[field] + ':':8s}" + " | ".join(f"{sem}: {n}" for sem, n in histogram))
+
+    @staticmethod
+    def _cache_key(command: str, args: str, paginacao: Paginacao) -> Tuple:
+        """
+        Chave do cache de resultados. As buscas de unidades, cursos e disciplinas não
+        diferenciam maiúsculas, então `C ime 1` e `C IME 1` compartilham a entrada; só
+        `D COMUM`, que é uma palavra reservada, e os comandos que repetem os argumentos na
+        saída mantêm o texto como foi digitado.
+        """
+        if command in ECHOING_COMMANDS or (command == 'D' and args == 'COMUM'):
+            return command, args, paginacao
+        return command, args.casefold(), paginacao
+
+    def execute(self, user_input: str) -> bool:
+        """
+        Executa um comando do menu e escreve sua saída de uma vez; devolve False quando o
+        comando encerra o programa.
+
+        A saída de cada comando fica no cache de resultados, indexada pelo comando, pelos
+        argumentos normalizados (ver `_cache_key`) e pela paginação. Saídas que o pager exibiu
+        em partes e mensagens de erro não são guardadas, e com o pager ativo só são
+        reaproveitadas as saídas que cabem em uma página.
+        """
+        parts = user_input.split(' ', 1)
+        command = parts[0].upper()
+        try:
+            args, paginacao = parse_paging(parts[1] if len(parts) > 1 else "")
+            args = ' '.join(args.split())
+            key = None if command in UNCACHED_COMMANDS else self._cache_key(command, args, paginacao)
+            cached = self.result_cache.get(key) if key else None
+            if cached is not None and (self.pager is None or len(cached) <= self.pager.page_size):
+                self.out.extend(cached)
+                return True
+            flushes = self.out.flushes
+            result = self._dispatch(command, args, paginacao)
+            output = self.out.pending()
+            if key and self.out.flushes == flushes and not any(line.startswith('ERRO') for line in output):
+                self.result_cache.put(key, output)
+            return result
+        except (PagingError, FilterError) as e:
+            self.out.line(f"ERRO: {e}")
+            return True
+        finally:
+            self.out.flush()
+
+    def _dispatch(self, command: str, args: str, paginacao: Paginacao) -> bool:
+        if command == "SAIR":
+            self.out.line("Encerrando..."); return False
+        elif command == "AJUDA":
+            self._print_help()
+        elif command == 'U':
+            if args:
+                unidade = self._find_unidade(args)
+                if unidade: self._display_unidade_details(unidade, paginacao)
+                else: self.out.line(f"ERRO: Unidade '{args}' não encontrada.")
+            else:
+                self._display_all_unidades(paginacao)
+        elif command == 'C':
+            if args:
+                split_args = args.rsplit(' ', 1)
+                if len(split_args) == 2:
+                    curso = self._get_curso_by_number(split_args[0], split_args[1])
+                    if curso: self._find_and_display_curso_details(curso)
+                else: self.out.line("Formato inválido. Use: C [unidade] [número]")
+            else:
+                self._display_all_cursos(paginacao)
+        elif command == 'DC' and args:
+            split_args = args.rsplit(' ', 1)
+            if len(split_args) == 2:
+                curso = self._get_curso_by_number(split_args[0], split_args[1])
+                if curso: self._find_and_display_course_disciplines(curso, paginacao)
+            else:
+                self.out.line("Formato inválido. Use: DC [unidade] [número]")
+        elif command == 'D':
+            if args == 'COMUM':
+                self._display_common_disciplines(paginacao)
+            elif args:
+                self._find_and_display_disciplina(args, paginacao)
+            else:
+                self.out.line("Argumento para 'D' faltando. Use D [código/nome] ou D COMUM.")
+        elif command == 'BUSCAR' and args:
+            search_parts = args.split(' ', 1)
+            if len(search_parts) == 2 and search_parts[0].upper() == 'C':
+                self._search_courses(search_parts[1], paginacao)
+            elif len(search_parts) == 2 and search_parts[0].upper() == 'D':
+                self._search_disciplines(search_parts[1], paginacao)
+            else:
+                self.out.line("Formato inválido. Use: BUSCAR C [termo] ou BUSCAR D [termo]")
+        elif command == 'FILTRAR':
+            tipo, _, conditions = args.partition(' ')
+            if tipo.upper() in FILTER_FIELDS:
+                self._display_filter(tipo.upper(), conditions, paginacao)
+            else:
+                self.out.line(FILTER_USAGE)
+        elif command == 'STATS':
+            self._display_stats()
+        elif command == 'SIMILARES' and args:
+            split_args = args.rsplit(' ', 1)
+            if len(split_args) == 2:
+                curso = self._get_curso_by_number(split_args[0], split_args[1])
+                if curso: self._display_similar_courses(curso)
+            else:
+                self.out.line("Formato inválido. Use: SIMILARES [unidade] [número]")
+        elif command == 'PARES':
+            if not args:
+                self._display_overlapping_pairs(SIMILAR_COURSES_LIMIT)
+            elif args.isdigit() and int(args) > 0:
+                self._display_overlapping_pairs(int(args))
+            else:
+                self.out.line(f"ERRO: '{args}' não é uma quantidade válida. Use: PARES [quantidade]")
+        else:
+            self.out.line("Comando inválido. Digite 'AJUDA' para ver as opções.")
+        return True
 
     def run(self):
         """Inicia o loop do menu interativo."""
+        if sys.stdout.isatty():
+            self.pager = Pager()
         self._print_help()
+        self.out.flush()
         while True:
             try:
                 user_input = input("\nComando > ").strip()
                 if not user_input: continue
-
-                parts = user_input.split(' ', 1)
-                command = parts[0].upper()
-                args = parts[1] if len(parts) > 1 else ""
-
-                if command == "SAIR":
-                    print("Encerrando..."); break
-                elif command == "AJUDA":
-                    self._print_help()
-                elif command == 'U':
-                    if args:
-                        unidade = self._find_unidade(args)
-                        if unidade: self._display_unidade_details(unidade)
-                        else: print(f"ERRO: Unidade '{args}' não encontrada.")
-                    else:
-                        self._display_all_unidades()
-                elif command == 'C':
-                    if args:
-                        split_args = args.rsplit(' ', 1)
-                        if len(split_args) == 2:
-                            curso = self._get_curso_by_number(split_args[0], split_args[1])
-                            if curso: self._find_and_display_curso_details(curso)
-                        else: print("Formato inválido. Use: C [unidade] [número]")
-                    else:
-                        self._display_all_cursos()
-                elif command == 'DC' and args:
-                    split_args = args.rsplit(' ', 1)
-                    if len(split_args) == 2:
-                        curso = self._get_curso_by_number(split_args[0], split_args[1])
-                        if curso: self._find_and_display_course_disciplines(curso)
-                    else:
-                        print("Formato inválido. Use: DC [unidade] [número]")
-                elif command == 'D':
-                    if args == 'COMUM':
-                        self._display_common_disciplines()
-                    elif args:
-                        self._find_and_display_disciplina(args)
-                    else:
-                        print("Argumento para 'D' faltando. Use D [código/nome] ou D COMUM.")
-                elif command == 'BUSCAR' and args:
-                    search_parts = args.split(' ', 1)
-                    if len(search_parts) == 2 and search_parts[0].upper() == 'C':
-                        self._search_courses(search_parts[1])
-                    else:
-                        print("Formato inválido. Use: BUSCAR C [termo]")
-                elif command == 'STATS':
-                    self._display_stats()
-                else:
-                    print("Comando inválido. Digite 'AJUDA' para ver as opções.")
+                if not self.execute(user_input): break
             except (KeyboardInterrupt, EOFError):
-                print("\nEncerrando por interrupção do usuário..."); break
\ No newline at end of file
+                print("\nEncerrando por interrupção do usuário..."); break
+
+class SQLiteMenuHandler(MenuHandler):
+    """
+    Variante do menu que responde cada comando com consultas indexadas a um banco
+    SQLite, sem carregar os dados em memória.
+    """
+
+    def __init__(self, store: SQLiteStore, coleta_id: int = None):
+        super().__init__([], [], {})
+        self.store = store
+        self.conn = store.conn
+        self.coleta_id = coleta_id or store.current_coleta()
+        # Só as unidades ficam em memória; cursos e disciplinas são consultados no banco.
+        self.unidades_list = [
+            Unidade(nome) for (nome,) in self.conn.execute(
+                'SELECT nome FROM unidades WHERE coleta_id = ? ORDER BY nome', (self.coleta_id,)
+            )
+        ]
+        self._unidades_by_name = {u.nome: u for u in self.unidades_list}
+        self._disciplinas_by_name_map = {}
+
+    def counts(self) -> Tuple[int, int, int]:
+        """Quantidade de unidades, cursos e disciplinas da coleta consultada."""
+        return tuple(
+            self.conn.execute(f'SELECT COUNT(*) FROM {table} WHERE coleta_id = ?', (self.coleta_id,)).fetchone()[0]
+            for table in ('unidades', 'cursos', 'disciplinas')
+        )
+
+    def _curso_from_row(self, row) -> Curso:
+        nome, unidade, ideal, minima, maxima = row
+        curso = Curso(nome, unidade)
+        curso.duracao_ideal, curso.duracao_minima, curso.duracao_maxima = ideal, minima, maxima
+        return curso
+
+    def _disciplina_from_row(self, row) -> Disciplina:
+        codigo, nome, *values = row
+        disciplina = Disciplina(codigo, nome)
+        for field, value in zip(DISCIPLINE_FIELDS, values):
+            setattr(disciplina, field, value)
+        return disciplina
+
+    def _find_unidade(self, query: str) -> Optional[Unidade]:
+        query_lower = query.lower()
+        row = self.conn.execute(
+            """SELECT nome FROM unidades WHERE coleta_id = ? AND (nome_lower = ? OR sigla_lower = ?)
+               ORDER BY nome LIMIT 1""", (self.coleta_id, query_lower, query_lower)
+        ).fetchone()
+        return self._unidades_by_name.get(row[0]) if row else None
+
+    def _sorted_cursos(self, unidade: Unidade) -> List[Curso]:
+        return [self._curso_from_row(row) for row in self.conn.execute(
+            f"""SELECT c.{CURSO_COLUMNS.replace(', ', ', c.')} FROM cursos c JOIN unidades u ON u.id = c.unidade_id
+                WHERE u.coleta_id = ? AND u.nome = ? ORDER BY c.nome, c.id""", (self.coleta_id, unidade.nome)
+        )]
+
+    def _load_curso(self, curso: Curso) -> Curso:
+        for categoria, *row in self.conn.execute(
+            f"""SELECT cd.categoria, d.{DISCIPLINA_COLUMNS.replace(', ', ', d.')}
+                FROM cursos c JOIN curso_disciplina cd ON cd.curso_id = c.id
+                JOIN disciplinas d ON d.id = cd.disciplina_id
+                WHERE c.coleta_id = ? AND c.nome = ? AND c.unidade = ?
+                ORDER BY cd.categoria, cd.posicao""", (self.coleta_id, curso.nome, curso.unidade)
+        ):
+            getattr(curso, categoria).append(self._disciplina_from_row(row))
+        return curso
+
+    def _find_disciplina(self, query: str) -> Optional[Disciplina]:
+        row = self.conn.execute(
+            f'SELECT id, {DISCIPLINA_COLUMNS} FROM disciplinas WHERE coleta_id = ? AND codigo = ?',
+            (self.coleta_id, query.upper())
+        ).fetchone() or self.conn.execute(
+            f"""SELECT id, {DISCIPLINA_COLUMNS} FROM disciplinas WHERE coleta_id = ? AND nome_lower = ?
+                ORDER BY id DESC LIMIT 1""", (self.coleta_id, query.lower())
+        ).fetchone()
+        if not row:
+            return None
+        disciplina = self._disciplina_from_row(row[1:])
+        disciplina.cursos = {nome for (nome,) in self.conn.execute(
+            """SELECT c.nome FROM curso_disciplina cd JOIN cursos c ON c.id = cd.curso_id
+               WHERE cd.disciplina_id = ?""", (row[0],)
+        )}
+        return disciplina
+
+    def _disciplines_by_course_count(self, min_cursos: int, limit: int = -1) -> List[Tuple[Disciplina, int]]:
+        rows = self.conn.execute(
+            f"""SELECT d.{DISCIPLINA_COLUMNS.replace(', ', ', d.')}, COUNT(DISTINCT c.nome) AS n
+                FROM disciplinas d
+                LEFT JOIN curso_disciplina cd ON cd.disciplina_id = d.id
+                LEFT JOIN cursos c ON c.id = cd.curso_id
+                WHERE d.coleta_id = ? GROUP BY d.id HAVING n >= ?
+                ORDER BY n DESC, d.id LIMIT ?""", (self.coleta_id, min_cursos, limit)
+        )
+        return [(self._disciplina_from_row(row[:-1]), row[-1]) for row in rows]
+
+    def _common_disciplines(self, limit: Optional[int] = None) -> List[Tuple[Disciplina, int]]:
+        return self._disciplines_by_course_count(2, -1 if limit is None else limit)
+
+    def _top_disciplines(self, k: int) -> List[Tuple[Disciplina, int]]:
+        return self._disciplines_by_course_count(0, k)
+
+    def _all_cursos(self) -> List[Curso]:
+        return [self._curso_from_row(row) for row in self.conn.execute(
+            f'SELECT {CURSO_COLUMNS} FROM cursos WHERE coleta_id = ? ORDER BY nome, id', (self.coleta_id,)
+        )]
+
+    def _all_disciplinas(self) -> List[Disciplina]:
+        return [self._disciplina_from_row(row) for row in self.conn.execute(
+            f'SELECT {DISCIPLINA_COLUMNS} FROM disciplinas WHERE coleta_id = ? ORDER BY id', (self.coleta_id,)
+        )]
+
+    def _unit_discipline_codes(self) -> Dict[str, Iterable[str]]:
+        codigos: Dict[str, List[str]] = {}
+        for nome, codigo in self.conn.execute(
+            """SELECT DISTINCT u.nome, d.codigo FROM unidades u JOIN cursos c ON c.unidade_id = u.id
+               JOIN curso_disciplina cd ON cd.curso_id = c.id JOIN disciplinas d ON d.id = cd.disciplina_id
+               WHERE u.coleta_id = ?""", (self.coleta_id,)
+        ):
+            codigos.setdefault(nome, []).append(codigo)
+        return codigos
+
+    @property
+    def similarity(self) -> 'SimilarityEngine':
+        """Monta os bitsets direto da tabela curso_disciplina, sem carregar as disciplinas."""
+        if self._similarity is None:
+            cursos, codigos = [], {}
+            for curso_id, *row in self.conn.execute(
+                f'SELECT id, {CURSO_COLUMNS} FROM cursos WHERE coleta_id = ? ORDER BY nome, id', (self.coleta_id,)
+            ):
+                cursos.append(self._curso_from_row(row))
+                codigos[curso_id] = []
+            for curso_id, codigo in self.conn.execute(
+                """SELECT cd.curso_id, d.codigo FROM curso_disciplina cd JOIN disciplinas d ON d.id = cd.disciplina_id
+                   JOIN cursos c ON c.id = cd.curso_id
+                   WHERE c.coleta_id = ? AND cd.categoria = 'obrigatorias'""", (self.coleta_id,)
+            ):
+                codigos[curso_id].append(codigo)
+            from similarity import SimilarityEngine
+            self._similarity = SimilarityEngine(cursos, list(codigos.values()))
+        return self._similarity
+
+    def _unit_with_most_courses(self) -> Tuple[Unidade, int]:
+        nome, n = self.conn.execute(
+            """SELECT u.nome, COUNT(c.id) AS n FROM unidades u LEFT JOIN cursos c ON c.unidade_id = u.id
+               WHERE u.coleta_id = ? GROUP BY u.id ORDER BY n DESC, u.nome LIMIT 1""", (self.coleta_id,)
+        ).fetchone()
+        return self._unidades_by_name[nome], n
+
+    def _course_with_most_mandatory(self) -> Tuple[Optional[Curso], int]:
+        row = self.conn.execute(
+            f"""SELECT c.{CURSO_COLUMNS.replace(', ', ', c.')}, COUNT(cd.disciplina_id) AS n
+                FROM cursos c LEFT JOIN curso_disciplina cd ON cd.curso_id = c.id AND cd.categoria = 'obrigatorias'
+                WHERE c.coleta_id = ? GROUP BY c.id ORDER BY n DESC, c.nome, c.id LIMIT 1""", (self.coleta_id,)
+        ).fetchone()
+        if not row:
+            return None, 0
+        return self._curso_from_row(row[:-1]), row[-1]
+
+    def _unit_distributions(self) -> List[DistribuicaoUnidade]:
+        rows = self.conn.execute(
+            """SELECT u.nome, COUNT(*), AVG(d.creditos_aula), MIN(d.creditos_aula), MAX(d.creditos_aula),
+                      AVG(d.carga_horaria), MIN(d.carga_horaria), MAX(d.carga_horaria)
+               FROM (SELECT DISTINCT c.unidade_id, cd.disciplina_id FROM cursos c
+                     JOIN curso_disciplina cd ON cd.curso_id = c.id WHERE c.coleta_id = ?) ud
+               JOIN unidades u ON u.id = ud.unidade_id JOIN disciplinas d ON d.id = ud.disciplina_id
+               GROUP BY u.id ORDER BY u.nome""", (self.coleta_id,)
+        )
+        return [DistribuicaoUnidade(nome, n, Resumo(*row[:3]), Resumo(*row[3:])) for nome, n, *row in rows]
+
+    def _duration_histograms(self) -> Dict[str, List[Tuple[int, int]]]:
+        return {
+            field: self.conn.execute(
+                f'SELECT {field}, COUNT(*) FROM cursos WHERE coleta_id = ? GROUP BY {field} ORDER BY {field}',
+                (self.coleta_id,)
+            ).fetchall()
+            for field in DURATION_FIELDS
+        }
+
+
+class ShardedMenuHandler(MenuHandler):
+    """
+    Variante do menu sobre dados particionados por unidade (shard_store.py). Unidades e
+    cursos vêm do manifesto; o shard de uma unidade só é lido quando um comando precisa
+    das disciplinas dela, e apenas as consultas que percorrem todas as disciplinas (BUSCAR D,
+    D COMUM, FILTRAR D, STATS) leem os shards restantes.
+    """
+
+    def __init__(self, store: ShardStore):
+        self.store = store
+        unidades = []
+        for position, entry in enumerate(store.unidades):
+            unidade = Unidade(entry['nome'])
+            unidade.cursos = store.course_summaries(position)
+            unidades.append(unidade)
+        self._unidades_in_order = unidades
+        self._positions = {}
+        for position, unidade in enumerate(unidades):
+            self._positions.setdefault(unidade.nome, position)
+        self._loaded_cursos: Dict[Tuple[str, str], Curso] = {}
+        self._all_loaded = False
+        self._codigos_by_name: Optional[Dict[str, str]] = None
+        super().__init__(unidades, [c for u in unidades for c in u.cursos], {})
+
+    def counts(self) -> Tuple[int, int, int]:
+        """Quantidade de unidades, cursos e disciplinas, lida do manifesto."""
+        return len(self.store.unidades), self.store.num_cursos, self.store.num_disciplinas
+
+    def _load_unit(self, position: int):
+        """Lê o shard da unidade e troca os cursos resumidos da unidade pelos completos."""
+        if self.store.is_loaded(position):
+            return
+        unidade = self._unidades_in_order[position]
+        unidade.cursos = self.store.load_unit(position)
+        for curso in unidade.cursos:
+            self._loaded_cursos.setdefault((curso.unidade, curso.nome), curso)
+        self._cursos_by_unidade[unidade.nome] = tuple(sorted(unidade.cursos, key=lambda c: c.nome))
+        self.disciplinas_db = self.store.disciplinas
+        if self._stats is not None:
+            self._stats.add_unidade(unidade)
+
+    def _load_all(self):
+        if self._all_loaded:
+            return
+        for position in range(len(self._unidades_in_order)):
+            self._load_unit(position)
+        self.cursos_list = sorted((c for u in self._unidades_in_order for c in u.cursos), key=lambda c: c.nome)
+        self.disciplinas_db = self.store.loaded_disciplinas()
+        self._all_loaded = True
+
+    @property
+    def stats(self) -> StatsEngine:
+        """
+        A engine começa com as unidades já lidas e recebe as demais por `_load_unit`, à
+        medida que os shards são lidos, sem recalcular o que já foi agregado.
+        """
+        if self._stats is None:
+            self._stats = StatsEngine([], [], {}, ordem=self.store.position)
+            for position, unidade in enumerate(self._unidades_in_order):
+                if self.store.is_loaded(position):
+                    self._stats.add_unidade(unidade)
+        self._load_all()
+        return self._stats
+
+    @property
+    def similarity(self) -> 'SimilarityEngine':
+        self._load_all()
+        return super().similarity
+
+    def _load_curso(self, curso: Curso) -> Curso:
+        position = self._positions.get(curso.unidade)
+        if position is not None:
+            self._load_unit(position)
+        return self._loaded_cursos.get((curso.unidade, curso.nome), curso)
+
+    def _find_disciplina(self, query: str) -> Optional[Disciplina]:
+        index = self.store.index
+        codigo = query.upper()
+        if codigo not in index:
+            if self._codigos_by_name is None:
+                self._codigos_by_name = {entry.nome.lower(): cod for cod, entry in index.items()}
+            codigo = self._codigos_by_name.get(query.lower())
+            if codigo is None:
+                return None
+        self._load_unit(index[codigo].shard)
+        return self.store.disciplinas.get(codigo)
+
+    def _common_disciplines(self, limit: Optional[int] = None) -> Iterable[Tuple[Disciplina, int]]:
+        self._load_all()
+        return super()._common_disciplines(limit)
+
+    def _all_disciplinas(self) -> List[Disciplina]:
+        self._load_all()
+        return super()._all_disciplinas()
+
+    def _unit_discipline_codes(self) -> Dict[str, Iterable[str]]:
+        self._load_all()
+        return super()._unit_discipline_codes()
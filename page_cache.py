@@ -0,0 +1,224 @@
+"""
+Cache em disco das páginas de grade curricular baixadas durante a coleta, para refazer o
+parsing sem acessar o Júpiter Web de novo.
+
+Estrutura da pasta (por padrão `usp_data.pages`, ao lado do arquivo de dados):
+    index.jsonl                    registros 'unidades' (ordem do formulário), 'unidade'
+                                   (cursos de cada unidade) e 'pagina' (hash da página de
+                                   cada curso); em caso de repetição vale o último
+    objetos/ab/abcdef....html.gz   conteúdo comprimido, nomeado pelo SHA-256 do original
+
+As páginas são guardadas pelo conteúdo: um curso que não mudou entre duas coletas, ou
+duas coletas da mesma página, ocupam um único arquivo. Com o backend selenium no modo
+'script' a "página" é o JSON devolvido pelo EXTRACTION_SCRIPT, e não o HTML.
+
+Uso:
+    python main.py --reparse                 # reconstrói usp_data.json só a partir do cache
+    python main.py --reparse --workers 8
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from collector_base import BaseCollector
+from course_parser import CourseParser, ScriptCourseParser, get_parser
+from crawl_metrics import CrawlMetrics
+from data_models import Unidade, Curso, Disciplina, novas_tabelas
+from sqlite_store import SQLiteStore
+
+PAGE_FORMATS = {'html': '.html.gz', 'script': '.json.gz'}
+COMPRESS_LEVEL = 6
+
+
+class PageCacheError(Exception):
+    """Cache de páginas ausente ou sem unidades registradas."""
+
+
+class PageCache:
+    """
+    Guarda as páginas de curso comprimidas e endereçadas pelo conteúdo. Pode ser usado por
+    várias threads ao mesmo tempo (workers do coletor com navegador).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_file = os.path.join(directory, 'index.jsonl')
+        self._lock = threading.Lock()
+        self._units: List[Dict] = []
+        self._unit_courses: Dict[str, Dict] = {}
+        self._pages: Dict[Tuple[str, str], Dict] = {}
+        self._file = None
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self._index(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Linha incompleta gravada durante uma interrupção.
+                        continue
+
+    def _index(self, record: Dict):
+        if record.get('tipo') == 'pagina':
+            self._pages[(record['unidade'], record['curso'])] = record
+        elif record.get('tipo') == 'unidade':
+            self._unit_courses[record['unidade']] = record
+        elif record.get('tipo') == 'unidades':
+            self._units = record['unidades']
+
+    def _append(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = open(self.index_file, 'a', encoding='utf-8')
+            self._index(record)
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def object_path(self, content_hash: str, formato: str) -> str:
+        return os.path.join(self.directory, 'objetos', content_hash[:2], content_hash + PAGE_FORMATS[formato])
+
+    def store_page(self, unit_code: str, course_code: str, content: str, formato: str = 'html') -> str:
+        """Grava a página de um curso (se o conteúdo ainda não estiver no cache) e devolve o hash."""
+        raw = content.encode('utf-8')
+        content_hash = hashlib.sha256(raw).hexdigest()
+        path = self.object_path(content_hash, formato)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Nome temporário por thread: dois workers podem gravar a mesma página.
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(gzip.compress(raw, COMPRESS_LEVEL))
+            os.replace(temp_path, path)
+        previous = self._pages.get((unit_code, course_code))
+        if previous is None or previous['hash'] != content_hash or previous['formato'] != formato:
+            self._append({'tipo': 'pagina', 'unidade': unit_code, 'curso': course_code,
+                          'formato': formato, 'hash': content_hash})
+        return content_hash
+
+    def record_units(self, units: List[Dict]):
+        """Registra as unidades da coleta (código e nome), na ordem do formulário."""
+        self._append({'tipo': 'unidades', 'unidades': [{'codigo': u['codigo'], 'nome': u['nome']} for u in units]})
+
+    def record_unit(self, unit_code: str, course_codes: List[str]):
+        self._append({'tipo': 'unidade', 'unidade': unit_code, 'cursos': course_codes})
+
+    def units(self) -> List[Dict]:
+        return self._units
+
+    def unit_courses(self, unit_code: str) -> Optional[List[str]]:
+        record = self._unit_courses.get(unit_code)
+        return record['cursos'] if record is not None else None
+
+    def page(self, unit_code: str, course_code: str) -> Optional[Dict]:
+        """Registro ('formato' e 'hash') da última página guardada para o curso, se houver."""
+        return self._pages.get((unit_code, course_code))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_page(path: str) -> str:
+    with open(path, 'rb') as f:
+        return gzip.decompress(f.read()).decode('utf-8')
+
+
+# Parsers de cada processo do pool, criados na primeira página de cada formato.
+_parsers: Dict[str, CourseParser] = {}
+
+def _parser_for(formato: str) -> CourseParser:
+    if formato not in _parsers:
+        _parsers[formato] = ScriptCourseParser() if formato == 'script' else get_parser()
+    return _parsers[formato]
+
+
+def _parse_pages(pages: List[Tuple[str, str]]) -> List[Tuple[Optional[Dict], float]]:
+    """
+    Executado nos processos do pool: lê e processa as páginas (caminho, formato) de uma
+    unidade, devolvendo para cada uma o registro do curso e o tempo gasto no parsing.
+    """
+    results = []
+    for path, formato in pages:
+        content = read_page(path)
+        start = time.perf_counter()
+        parsed = json.loads(content) if formato == 'script' else content
+        record = _parser_for(formato).parse(parsed)
+        results.append((record, time.perf_counter() - start))
+    return results
+
+
+class CacheReparser(BaseCollector):
+    """
+    Reconstrói os dados a partir do cache de páginas, sem navegador nem requisições. O
+    parsing de cada unidade é feito em um processo do pool; a montagem dos objetos segue
+    a ordem original das unidades, para que o resultado seja igual ao da coleta.
+    """
+
+    def __init__(self, cache: PageCache, max_units: int = None, workers: int = None,
+                 store: SQLiteStore = None, metrics: CrawlMetrics = None, metrics_file: str = None):
+        self.cache = cache
+        self.max_units = max_units
+        self.workers = workers
+        self.store = store
+        self.metrics = metrics or CrawlMetrics()
+        self.metrics_file = metrics_file
+
+    def _unit_jobs(self, units: List[Dict]) -> List[List[Tuple[str, Dict]]]:
+        """Para cada unidade, os cursos (código e registro da página) presentes no cache."""
+        jobs = []
+        for unit_data in units:
+            courses = []
+            for course_code in self.cache.unit_courses(unit_data['codigo']) or []:
+                page = self.cache.page(unit_data['codigo'], course_code)
+                if page is None:
+                    self.metrics.count('pagina_ausente')
+                    continue
+                courses.append((course_code, page))
+            jobs.append(courses)
+        return jobs
+
+    def collect_data(self) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+        novas_tabelas()
+        unidades_db: List[Unidade] = []
+        cursos_db: List[Curso] = []
+        disciplinas_db: Dict[str, Disciplina] = {}
+
+        units = self.cache.units()
+        if not units:
+            raise PageCacheError(f"Nenhuma unidade registrada no cache de páginas '{self.cache.directory}'.")
+        units_to_process = units[:self.max_units] if self.max_units is not None else units
+        jobs = self._unit_jobs(units_to_process)
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = pool.map(_parse_pages, [
+                    [(self.cache.object_path(page['hash'], page['formato']), page['formato']) for _, page in courses]
+                    for courses in jobs
+                ])
+                for unit_data, courses, parsed in zip(units_to_process, jobs, results):
+                    if self.cache.unit_courses(unit_data['codigo']) is None:
+                        self.metrics.count('unidade_ausente')
+                        continue
+                    unidade_obj = Unidade(unit_data['nome'])
+                    for (course_code, _), (record, seconds) in zip(courses, parsed):
+                        with self.metrics.course(unit_data['codigo'], course_code):
+                            self.metrics.record('parsing', seconds)
+                            if record is None:
+                                self.metrics.count('pagina_sem_curso')
+                                continue
+                            parsed_data = self._restore_course(record, disciplinas_db)
+                        unidade_obj.cursos.append(self._build_course(parsed_data, unit_data['nome']))
+                    unidades_db.append(unidade_obj)
+                    cursos_db.extend(unidade_obj.cursos)
+                    self._unit_finished(unidade_obj)
+        finally:
+            self._report_metrics()
+
+        return unidades_db, cursos_db, disciplinas_db
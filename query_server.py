@@ -0,0 +1,205 @@
+"""
+Serviço HTTP local que carrega os dados uma vez e responde às consultas do menu em JSON.
+
+Rotas (todas GET):
+    /unidades                                        lista das unidades
+    /unidades/{unidade}                              cursos de uma unidade (sigla ou nome)
+    /unidades/{unidade}/cursos/{numero}              dados de um curso
+    /unidades/{unidade}/cursos/{numero}/disciplinas  disciplinas de um curso
+    /unidades/{unidade}/cursos/{numero}/similares    cursos com mais obrigatórias em comum
+    /cursos/pares?k=10                               pares de cursos com mais obrigatórias em comum
+    /disciplinas/comuns                              disciplinas usadas em mais de um curso
+    /disciplinas/{codigo ou nome}                    dados de uma disciplina
+    /busca/cursos?q=termo                            busca de cursos
+    /busca/disciplinas?q=termo                       busca de disciplinas
+    /filtro/cursos?q=duracao_ideal<=8                cursos por faixas de duração
+    /filtro/disciplinas?q=creditos_aula=4..6         disciplinas por faixas de créditos e carga
+    /stats                                           estatísticas gerais
+
+As respostas têm o mesmo conteúdo do modo em lote (`resultado`) e ficam em um cache
+LRU, já serializadas. As respostas em cache saem direto do loop de eventos; as demais são
+calculadas em uma thread separada (uma só, porque o MenuHandler não pode ser usado por
+duas threads ao mesmo tempo), então uma consulta pesada não atrasa as outras conexões, e
+requisições simultâneas pelo mesmo comando esperam um único cálculo. Com --watch, quando o
+arquivo de dados muda o menu é remontado fora do loop de eventos e trocado, junto com um
+cache vazio, entre duas requisições.
+
+Uso:
+    python main.py --serve --port 8080
+    curl http://localhost:8080/unidades/IME/cursos/1
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+from batch import BatchRunner, CommandError, internal_error
+from hot_reload import Dados, DataFileWatcher
+from menu import MenuHandler
+from result_cache import LRUCache
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class ResponseCache(LRUCache[Tuple[int, bytes]]):
+    """
+    Cache LRU de respostas já serializadas (status e corpo), indexado pelo comando
+    equivalente do menu. Só é usado a partir do loop de eventos, então dispensa lock.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        super().__init__(max_size)
+
+
+class QueryService:
+    """Traduz cada rota em um comando do menu e executa-o com o BatchRunner."""
+
+    def __init__(self, menu: MenuHandler, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.runner = BatchRunner(menu)
+        self.cache = ResponseCache(cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='consultas')
+        # Cálculos em andamento, por comando.
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def replace_menu(self, menu: MenuHandler):
+        """Passa a responder com `menu`; chamado no loop de eventos, entre duas requisições."""
+        self.runner = BatchRunner(menu)
+        self.cache.clear()
+        self._pending.clear()
+
+    @staticmethod
+    def _execute(runner: BatchRunner, command: str) -> Tuple[int, bytes]:
+        """Resposta serializada de um comando: 200, 404 (comando inválido ou não encontrado) ou 500."""
+        try:
+            status, body = 200, {'resultado': runner.result(command)}
+        except CommandError as e:
+            status, body = 404, {'erro': str(e)}
+        except Exception as e:
+            status, body = 500, {'erro': internal_error(e)}
+        return status, json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+    async def _compute(self, command: str) -> Tuple[int, bytes]:
+        runner = self.runner
+        try:
+            entry = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._execute, runner, command
+            )
+        finally:
+            if self._pending.get(command) is asyncio.current_task():
+                del self._pending[command]
+        # Um resultado calculado com o menu anterior a uma recarga não entra no cache novo.
+        if runner is self.runner:
+            self.cache.put(command, entry)
+        return entry
+
+    async def _respond(self, command: str) -> web.Response:
+        entry = self.cache.get(command)
+        if entry is None:
+            pending = self._pending.get(command)
+            if pending is None:
+                pending = self._pending[command] = asyncio.ensure_future(self._compute(command))
+            entry = await asyncio.shield(pending)
+        status, body = entry
+        return web.Response(body=body, status=status, content_type='application/json', charset='utf-8')
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    @staticmethod
+    def _query_param(request: web.Request) -> str:
+        term = request.query.get('q', '').strip()
+        if not term:
+            raise web.HTTPBadRequest(
+                text=json.dumps({'erro': "Parâmetro 'q' faltando."}, ensure_ascii=False), content_type='application/json'
+            )
+        return term
+
+    async def unidades(self, request: web.Request) -> web.Response:
+        return await self._respond('U')
+
+    async def unidade(self, request: web.Request) -> web.Response:
+        return await self._respond(f"U {request.match_info['unidade']}")
+
+    async def curso(self, request: web.Request) -> web.Response:
+        return await self._respond(f"C {request.match_info['unidade']} {request.match_info['numero']}")
+
+    async def curso_disciplinas(self, request: web.Request) -> web.Response:
+        return await self._respond(f"DC {request.match_info['unidade']} {request.match_info['numero']}")
+
+    async def curso_similares(self, request: web.Request) -> web.Response:
+        return await self._respond(f"SIMILARES {request.match_info['unidade']} {request.match_info['numero']}")
+
+    async def pares_cursos(self, request: web.Request) -> web.Response:
+        return await self._respond(f"PARES {request.query.get('k', '').strip()}".rstrip())
+
+    async def disciplinas_comuns(self, request: web.Request) -> web.Response:
+        return await self._respond('D COMUM')
+
+    async def disciplina(self, request: web.Request) -> web.Response:
+        return await self._respond(f"D {request.match_info['query']}")
+
+    async def busca_cursos(self, request: web.Request) -> web.Response:
+        return await self._respond(f"BUSCAR C {self._query_param(request)}")
+
+    async def busca_disciplinas(self, request: web.Request) -> web.Response:
+        return await self._respond(f"BUSCAR D {self._query_param(request)}")
+
+    async def filtro_cursos(self, request: web.Request) -> web.Response:
+        return await self._respond(f"FILTRAR C {self._query_param(request)}")
+
+    async def filtro_disciplinas(self, request: web.Request) -> web.Response:
+        return await self._respond(f"FILTRAR D {self._query_param(request)}")
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return await self._respond('STATS')
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get('/unidades', self.unidades),
+            web.get('/unidades/{unidade}', self.unidade),
+            web.get('/unidades/{unidade}/cursos/{numero}', self.curso),
+            web.get('/unidades/{unidade}/cursos/{numero}/disciplinas', self.curso_disciplinas),
+            web.get('/unidades/{unidade}/cursos/{numero}/similares', self.curso_similares),
+            web.get('/cursos/pares', self.pares_cursos),
+            web.get('/disciplinas/comuns', self.disciplinas_comuns),
+            web.get('/disciplinas/{query}', self.disciplina),
+            web.get('/busca/cursos', self.busca_cursos),
+            web.get('/busca/disciplinas', self.busca_disciplinas),
+            web.get('/filtro/cursos', self.filtro_cursos),
+            web.get('/filtro/disciplinas', self.filtro_disciplinas),
+            web.get('/stats', self.stats),
+        ])
+        return app
+
+
+def serve(menu: MenuHandler, host: str = '127.0.0.1', port: int = 8080, cache_size: int = DEFAULT_CACHE_SIZE,
+          watcher: Optional[DataFileWatcher] = None):
+    """Sobe o serviço e atende até ser interrompido (Ctrl+C)."""
+    service = QueryService(menu.build_indexes(), cache_size)
+    app = service.make_app()
+
+    async def stop_service(app: web.Application):
+        service.close()
+    app.on_cleanup.append(stop_service)
+
+    if watcher is not None:
+        async def start_watcher(app: web.Application):
+            loop = asyncio.get_running_loop()
+
+            def reload(data: Dados):
+                new_menu = MenuHandler(*data).build_indexes()
+                loop.call_soon_threadsafe(service.replace_menu, new_menu)
+                print(f"Dados atualizados de '{watcher.filename}'.")
+            watcher.start(reload)
+
+        async def stop_watcher(app: web.Application):
+            watcher.stop()
+
+        app.on_startup.append(start_watcher)
+        app.on_cleanup.append(stop_watcher)
+
+    print(f"\nServindo consultas em http://{host}:{port}/ (Ctrl+C para encerrar)")
+    web.run_app(app, host=host, port=port, print=None, access_log=None)
@@ -0,0 +1,139 @@
+"""
+Saída dos comandos do menu: as linhas de cada comando são acumuladas em um buffer e
+escritas de uma vez só, e as listagens longas podem ser paginadas.
+
+As listagens (U, C, DC, D, D COMUM, BUSCAR, FILTRAR) aceitam `--limit N` e `--offset N` para
+mostrar só um trecho; no terminal interativo elas também são exibidas uma página por vez.
+Em ambos os casos as linhas são geradas sob demanda: só o trecho exibido é montado.
+"""
+import shutil
+import sys
+from itertools import islice
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+PAGING_OPTIONS = ('--limit', '--offset')
+
+# Uma linha de listagem e o cabeçalho do grupo a que ela pertence (None se não houver),
+# exibido antes da primeira linha do grupo em cada página.
+Linha = Tuple[Optional[str], str]
+
+
+class PagingError(ValueError):
+    """Valor inválido para --limit ou --offset."""
+
+
+class Paginacao(NamedTuple):
+    offset: int = 0
+    limit: Optional[int] = None
+
+    @property
+    def stop(self) -> Optional[int]:
+        return None if self.limit is None else self.offset + self.limit
+
+    def is_default(self) -> bool:
+        return self.offset == 0 and self.limit is None
+
+
+def parse_paging(args: str) -> Tuple[str, Paginacao]:
+    """Separa `--limit N` e `--offset N` (ou `--limit=N`) dos demais argumentos de um comando."""
+    if '--' not in args:
+        return args, Paginacao()
+    tokens = args.split(' ')
+    rest, values = [], {}
+    i = 0
+    while i < len(tokens):
+        option, _, value = tokens[i].partition('=')
+        if option.lower() not in PAGING_OPTIONS:
+            rest.append(tokens[i])
+            i += 1
+            continue
+        if not value:
+            i += 1
+            value = tokens[i] if i < len(tokens) else ''
+        option = option.lower()
+        if not value.isdigit() or (option == '--limit' and int(value) == 0):
+            kind = 'positivo' if option == '--limit' else 'não negativo'
+            raise PagingError(f"{option} exige um número inteiro {kind}.")
+        values[option] = int(value)
+        i += 1
+    return ' '.join(rest), Paginacao(values.get('--offset', 0), values.get('--limit'))
+
+
+class OutputBuffer:
+    """Acumula as linhas de um comando; `flush` as escreve na saída padrão com uma única escrita."""
+
+    def __init__(self):
+        self._lines: List[str] = []
+        # Quantas escritas já foram feitas; o pager escreve no meio de um comando.
+        self.flushes = 0
+
+    def line(self, text: str = ''):
+        self._lines.append(text)
+
+    def extend(self, lines: Iterable[str]):
+        self._lines.extend(lines)
+
+    def pending(self) -> Tuple[str, ...]:
+        """As linhas ainda não escritas."""
+        return tuple(self._lines)
+
+    def flush(self):
+        if self._lines:
+            # sys.stdout é consultado aqui, e não na criação, para respeitar redirecionamentos.
+            sys.stdout.write('\n'.join(self._lines) + '\n')
+            sys.stdout.flush()
+            self._lines = []
+            self.flushes += 1
+
+
+class Pager:
+    """Pausa uma listagem a cada página, até o usuário pedir para parar."""
+
+    def __init__(self, page_size: int = None):
+        self.page_size = page_size or max(5, shutil.get_terminal_size().lines - 3)
+
+    def more(self, out: OutputBuffer) -> bool:
+        out.flush()
+        try:
+            answer = input("-- Mais (Enter para continuar, Q para parar) -- ")
+        except (KeyboardInterrupt, EOFError):
+            print()
+            return False
+        return answer.strip().upper() != 'Q'
+
+
+def render_rows(out: OutputBuffer, rows: Iterable[Linha], paginacao: Paginacao = Paginacao(),
+                pager: Optional[Pager] = None) -> int:
+    """
+    Escreve o trecho de `rows` pedido em `paginacao`, página por página se houver `pager`,
+    e devolve quantas linhas foram exibidas. Só as linhas exibidas (e uma a mais, para saber
+    se a listagem continua) são consumidas do iterador.
+    """
+    source = iter(rows)
+    selected = islice(source, paginacao.offset, paginacao.stop)
+    page_size = pager.page_size if pager else None
+    shown, group = 0, None
+    page = list(islice(selected, page_size))
+    while page:
+        for grupo, text in page:
+            if grupo is not None and grupo != group:
+                out.line(grupo)
+            group = grupo
+            out.line(text)
+        shown += len(page)
+        following = next(selected, None) if page_size else None
+        if following is None:
+            break
+        if not pager.more(out):
+            position = paginacao.offset + shown
+            out.line(f"Listagem interrompida. Use --offset {position} para continuar deste ponto.")
+            return shown
+        page = [following] + list(islice(selected, page_size - 1))
+        group = None
+
+    if shown == 0 and paginacao.offset:
+        out.line(f"Nenhum item a partir da posição {paginacao.offset}.")
+    elif paginacao.limit is not None and shown == paginacao.limit and next(source, None) is not None:
+        position = paginacao.offset + shown
+        out.line(f"Mostrando itens {paginacao.offset + 1} a {position}. Use --offset {position} para ver os seguintes.")
+    return shown
@@ -1,26 +1,86 @@
-import re
-from typing import Dict, List, Tuple
-from bs4 import BeautifulSoup
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select, WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, SessionNotCreatedException
 
-from data_models import Unidade, Curso, Disciplina
+from checkpoint import CheckpointJournal
+from crawl_metrics import CrawlMetrics
+from crawl_pipeline import PARSE_WORKERS, CoursePipeline
+from collector_base import BaseCollector
+from course_parser import EXTRACTION_SCRIPT, ScriptCourseParser
+from page_cache import PageCache
+from sqlite_store import SQLiteStore
+from data_models import Unidade, Curso, Disciplina, novas_tabelas
+from webdriver_cache import resolve_chromedriver
 
-class USPDataCollector:
-    """Coleta dados de cursos e disciplinas do portal Júpiter Web."""
 
-    BASE_URL = "https://uspdigital.usp.br/jupiterweb/jupCarreira.jsp?codmnu=8275"
+class PaginaCurso(NamedTuple):
+    """Item do pipeline: o conteúdo da grade do curso na posição `posicao` da unidade `indice`."""
+    indice: int
+    unidade: Dict
+    posicao: int
+    curso: Dict
+    content_hash: Optional[str]
+    formato: str  # 'script', 'html' ou 'registro' (já processado, vindo do journal)
+    conteudo: Any
+    # Registro do curso nas métricas, para que o parsing (em outra thread) conte para ele.
+    metricas: Optional[Dict] = None
 
-    def __init__(self, max_units: int = None):
+
+class FimUnidade(NamedTuple):
+    """Marca o fim da busca de uma unidade, depois de `entregues` cursos."""
+    indice: int
+    unidade: Dict
+    cursos: Optional[List[str]]  # códigos listados no formulário (None se a lista não foi lida)
+    entregues: int
+    completa: bool
+    restaurada: bool = False  # unidade já concluída no journal: montada sem buscar nada
+
+
+class USPDataCollector(BaseCollector):
+    """
+    Coleta dados de cursos e disciplinas do portal Júpiter Web.
+
+    Com `extraction='script'` (padrão) a grade de cada curso é lida por um único script
+    executado na página, que devolve só os campos usados; com 'html' a página inteira é
+    transferida (page_source) e processada pelo parser em Python.
+
+    A busca, o parsing e a montagem dos objetos rodam em pipeline (crawl_pipeline.py): o
+    navegador já abre o curso seguinte enquanto `parse_workers` threads processam os anteriores.
+    """
+
+    WAIT_TIMEOUT = 20
+    # Intervalo entre as verificações de que a grade do curso pedido já foi carregada.
+    GRADE_POLL_INTERVAL = 0.05
+
+    def __init__(self, max_units: int = None, workers: int = 1, base_url: str = None,
+                 journal: CheckpointJournal = None, store: SQLiteStore = None,
+                 metrics: CrawlMetrics = None, metrics_file: str = None, extraction: str = 'script',
+                 page_cache: PageCache = None, parse_workers: int = PARSE_WORKERS, driver_path: str = None):
         self.max_units = max_units
+        self.workers = max(1, workers)
+        self.parse_workers = max(1, parse_workers)
+        self.driver_path = driver_path
+        self.base_url = base_url or self.BASE_URL
+        self.journal = journal
+        self.store = store
+        self.metrics = metrics or CrawlMetrics()
+        self.metrics_file = metrics_file
+        self.extraction = extraction
+        self.page_cache = page_cache
+        self.script_parser = ScriptCourseParser()
+        self._previous_step4: Optional[str] = None
         self.driver = self._setup_driver()
-        self.wait = WebDriverWait(self.driver, 20)
+        self.wait = WebDriverWait(self.driver, self.WAIT_TIMEOUT)
+        self.grade_wait = WebDriverWait(self.driver, self.WAIT_TIMEOUT, poll_frequency=self.GRADE_POLL_INTERVAL)
 
     def _setup_driver(self) -> webdriver.Chrome:
         """Configura e inicializa o WebDriver do Selenium."""
@@ -28,166 +88,316 @@ class USPDataCollector:
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920x1080")
-        chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        chrome_options.add_argument(f"user-agent={self.USER_AGENT}")
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        with self.metrics.phase('instalar_driver'):
+            driver_path = self.driver_path or resolve_chromedriver()
+        with self.metrics.phase('iniciar_navegador'):
+            try:
+                driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+            except SessionNotCreatedException:
+                if self.driver_path:
+                    raise
+                # O driver fixado não é compatível com o Chrome instalado (ex.: o Chrome foi atualizado).
+                self.metrics.count('driver_incompativel')
+                driver_path = resolve_chromedriver(stale=driver_path)
+                driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
         return driver
 
-    def _parse_number(self, text: str) -> int:
-        """Extrai um número de uma string, retornando 0 se não encontrar."""
-        if text:
-            match = re.search(r'\d+', text)
-            if match:
-                return int(match.group())
-        return 0
-
-    def _get_or_create_discipline(self, disciplinas_db: Dict[str, Disciplina], codigo: str, nome: str) -> Disciplina:
-        """Retorna uma disciplina existente do banco de dados ou cria uma nova."""
-        if codigo not in disciplinas_db:
-            disciplinas_db[codigo] = Disciplina(codigo, nome)
-        return disciplinas_db[codigo]
-        
-    def _extract_course_data(self, soup: BeautifulSoup, disciplinas_db: Dict[str, Disciplina]) -> Dict:
-        """
-        Extrai todos os dados de uma página de curso, implementando a lógica de parsing correta.
-        """
-        course_name_element = soup.select_one('#step4 .curso')
-        if not course_name_element:
-            return None
-
-        data = {
-            'nome': course_name_element.text.strip(),
-            'duracao_ideal': self._parse_number(soup.select_one('#step4 .duridlhab').text),
-            'duracao_minima': self._parse_number(soup.select_one('#step4 .durminhab').text),
-            'duracao_maxima': self._parse_number(soup.select_one('#step4 .durmaxhab').text),
-            'obrigatorias': [], 'optativas_livres': [], 'optativas_eletivas': []
-        }
-        
-        grade_div = soup.find('div', id='gradeCurricular')
-        if not grade_div:
-            return data
-
-        current_list = None
-        for row in grade_div.find_all('tr'):
-            style = row.get('style', '')
-
-            if 'background-color: rgb(16, 148, 171);' in style:
-                header_text = row.get_text(strip=True)
-                if 'Obrigatórias' in header_text:
-                    current_list = data['obrigatorias']
-                elif 'Optativas Livres' in header_text:
-                    current_list = data['optativas_livres']
-                elif 'Optativas Eletivas' in header_text:
-                    current_list = data['optativas_eletivas']
-                else:
-                    current_list = None
-                continue
-
-            if current_list is None:
-                continue
-            
-            if 'color: rgb(235, 143, 0);' in style or 'background-color: rgb(204, 204, 204);' in style:
-                continue
-
-            cells = row.find_all('td')
-            if len(cells) >= 8 and cells[0].find('a'):
-                codigo = cells[0].get_text(strip=True)
-                nome = cells[1].get_text(strip=True)
-                
-                disciplina = self._get_or_create_discipline(disciplinas_db, codigo, nome)
-                disciplina.creditos_aula = self._parse_number(cells[2].text)
-                disciplina.creditos_trabalho = self._parse_number(cells[3].text)
-                disciplina.carga_horaria = self._parse_number(cells[4].text)
-                disciplina.carga_estagio = self._parse_number(cells[5].text)
-                disciplina.carga_praticas = self._parse_number(cells[6].text)
-                disciplina.atividades_aprofundamento = self._parse_number(cells[7].text)
-                
-                current_list.append(disciplina)
-        
-        return data
+    def _js_click(self, element_id: str):
+        """Clica pelo JavaScript quando o clique normal é interceptado ou o elemento não fica clicável."""
+        self.metrics.count(f'clique_js_{element_id}')
+        self.driver.execute_script("arguments[0].click();", self.driver.find_element(By.ID, element_id))
 
     def _navigate_to_curriculum(self, course_code: str):
-        Select(self.driver.find_element(By.ID, "comboCurso")).select_by_value(course_code)
-        try:
-            self.driver.find_element(By.ID, "enviar").click()
-        except ElementClickInterceptedException:
-            self.driver.execute_script("arguments[0].click();", self.driver.find_element(By.ID, "enviar"))
+        with self.metrics.phase('enviar_busca'):
+            Select(self.driver.find_element(By.ID, "comboCurso")).select_by_value(course_code)
+            try:
+                self.driver.find_element(By.ID, "enviar").click()
+            except ElementClickInterceptedException:
+                self._js_click("enviar")
 
-        try:
-            step4_tab = self.wait.until(EC.element_to_be_clickable((By.ID, 'step4-tab')))
-            step4_tab.click()
-        except (ElementClickInterceptedException, TimeoutException):
-            self.driver.execute_script("arguments[0].click();", self.driver.find_element(By.ID, 'step4-tab'))
+        with self.metrics.phase('espera_aba_grade'):
+            try:
+                step4_tab = self.wait.until(EC.element_to_be_clickable((By.ID, 'step4-tab')))
+                step4_tab.click()
+            except ElementClickInterceptedException:
+                self._js_click('step4-tab')
+            except TimeoutException:
+                self.metrics.count('timeout_aba_grade')
+                self._js_click('step4-tab')
+
+        if self.extraction == 'script':
+            # A espera pela grade é feita pelo próprio script de extração.
+            return
+        with self.metrics.phase('espera_disciplinas'):
+            try:
+                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#gradeCurricular a.disciplina")))
+            except TimeoutException:
+                self.metrics.count('timeout_disciplinas')
+
+    def _return_to_search_form(self, unit_code: str):
+        with self.metrics.phase('voltar_formulario'):
+            try:
+                tab_element = self.wait.until(EC.element_to_be_clickable((By.ID, 'step1-tab')))
+                tab_element.click()
+            except ElementClickInterceptedException:
+                self._js_click('step1-tab')
 
+            self.wait.until(EC.presence_of_element_located((By.ID, "comboUnidade")))
+            Select(self.driver.find_element(By.ID, "comboUnidade")).select_by_value(unit_code)
+            self.wait.until(EC.presence_of_element_located((By.XPATH, "//select[@id='comboCurso']/option[2]")))
+
+    def _extract_in_browser(self) -> Dict:
+        """
+        Executa o EXTRACTION_SCRIPT até que a grade do curso pedido esteja pronta: nome do
+        curso preenchido, #step4 diferente do curso anterior e nenhuma requisição AJAX em
+        andamento. Se isso não acontecer no prazo, extrai o que estiver na página.
+        """
+        arguments = self.script_parser.script_arguments(self._previous_step4)
         try:
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#gradeCurricular a.disciplina")))
+            extracted = self.grade_wait.until(lambda driver: driver.execute_script(EXTRACTION_SCRIPT, *arguments))
         except TimeoutException:
-            pass
+            self.metrics.count('timeout_grade')
+            extracted = self.driver.execute_script(
+                EXTRACTION_SCRIPT, *self.script_parser.script_arguments(None, force=True)
+            )
+        self._previous_step4 = extracted.get('assinatura')
+        return extracted
 
-    def _return_to_search_form(self, unit_code: str):
+    def _curriculum_hash(self) -> str:
+        """Hash do cabeçalho e da grade do curso aberto, lido direto do navegador."""
+        parts = [
+            element.get_attribute('outerHTML')
+            for element_id in ('step4', 'gradeCurricular')
+            for element in self.driver.find_elements(By.ID, element_id)
+        ]
+        return self._content_hash(*parts)
+
+    def _open_search_form(self):
+        """Abre o formulário de busca e aguarda a lista de unidades ser carregada."""
+        with self.metrics.phase('abrir_formulario'):
+            self.driver.get(self.base_url)
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#comboUnidade option[value]:not([value=''])")))
+
+    def _read_options(self, select_id: str) -> List[Dict]:
+        """Lê as opções de um <select> da página, ignorando a primeira (vazia)."""
+        select = Select(self.driver.find_element(By.ID, select_id))
+        return [{'codigo': opt.get_attribute('value'), 'nome': opt.text.strip()} for opt in select.options[1:]]
+
+    def _select_unit(self, unit_code: str) -> List[Dict]:
+        """Escolhe a unidade no formulário e devolve a lista de cursos carregada."""
+        with self.metrics.phase('selecionar_unidade'):
+            Select(self.driver.find_element(By.ID, "comboUnidade")).select_by_value(unit_code)
+            self.wait.until(EC.presence_of_element_located((By.XPATH, "//select[@id='comboCurso']/option[2]")))
+            return self._read_options("comboCurso")
+
+    def _fetch_course(self, index: int, position: int, unit_data: Dict, course_data: Dict) -> PaginaCurso:
+        """Abre a grade de um curso e lê o conteúdo a processar (ou o registro do journal, se ela não mudou)."""
+        self._navigate_to_curriculum(course_data['codigo'])
+
+        content_hash = None
+        if self.extraction == 'script':
+            with self.metrics.phase('extrair_grade'):
+                extracted = self._extract_in_browser()
+            serialized = json.dumps(extracted, ensure_ascii=False, sort_keys=True)
+            self._cache_page(unit_data['codigo'], course_data['codigo'], serialized, 'script')
+            if self.journal is not None:
+                content_hash = self._content_hash(serialized)
+            formato, conteudo = 'script', extracted
+        else:
+            html = None
+            if self.page_cache is not None:
+                # A página é guardada mesmo quando o journal dispensa o parsing.
+                with self.metrics.phase('page_source'):
+                    html = self.driver.page_source
+                self._cache_page(unit_data['codigo'], course_data['codigo'], html)
+            if self.journal is not None:
+                with self.metrics.phase('hash_grade'):
+                    content_hash = self._curriculum_hash()
+            formato, conteudo = 'html', html
+
+        record = self._checkpointed_record(unit_data['codigo'], course_data['codigo'], content_hash)
+        if record is not None:
+            formato, conteudo = 'registro', record
+        elif conteudo is None:
+            with self.metrics.phase('page_source'):
+                conteudo = self.driver.page_source
+
+        self._return_to_search_form(unit_data['codigo'])
+        return PaginaCurso(index, unit_data, position, course_data, content_hash, formato, conteudo)
+
+    def _fetch_unit(self, index: int, unit_data: Dict, pipeline: CoursePipeline):
+        """
+        Estágio de busca de uma unidade: entrega ao pipeline o conteúdo da grade de cada curso
+        e, no fim, um FimUnidade. Em caso de erro a unidade fica incompleta, com os cursos
+        entregues até o momento (ou None, se a lista de cursos nem chegou a ser lida).
+        """
+        if self.journal is not None and self.journal.completed_unit(unit_data['codigo']) is not None:
+            pipeline.submit_parsed(FimUnidade(index, unit_data, None, 0, False, restaurada=True))
+            return
+
+        course_codes, delivered, complete = None, 0, False
         try:
-            tab_element = self.wait.until(EC.element_to_be_clickable((By.ID, 'step1-tab')))
-            tab_element.click()
-        except ElementClickInterceptedException:
-            self.driver.execute_script("arguments[0].click();", self.driver.find_element(By.ID, 'step1-tab'))
-        
-        self.wait.until(EC.presence_of_element_located((By.ID, "comboUnidade")))
-        Select(self.driver.find_element(By.ID, "comboUnidade")).select_by_value(unit_code)
-        self.wait.until(EC.presence_of_element_located((By.XPATH, "//select[@id='comboCurso']/option[2]")))
+            courses = self._select_unit(unit_data['codigo'])
+            course_codes = [c['codigo'] for c in courses]
 
-    def collect_data(self) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
-        unidades_db: List[Unidade] = []
-        cursos_db: List[Curso] = []
-        disciplinas_db: Dict[str, Disciplina] = {}
+            for course_data in courses:
+                with self.metrics.course(unit_data['codigo'], course_data['codigo'], course_data['nome']) as metricas:
+                    record = self._checkpointed_record(unit_data['codigo'], course_data['codigo'])
+                    if record is not None:
+                        item = PaginaCurso(index, unit_data, delivered, course_data, None, 'registro', record)
+                    else:
+                        item = self._fetch_course(index, delivered, unit_data, course_data)
+                pipeline.submit(item._replace(metricas=metricas))
+                delivered += 1
+            complete = True
+        except Exception as e:
+            print(f"ERRO inesperado ao processar a unidade {unit_data['nome']}: {e}")
+            self.metrics.count('erro_unidade')
+            if isinstance(e, TimeoutException):
+                self.metrics.count('timeout_unidade')
+            with self.metrics.phase('recuperacao'):
+                self.driver.get(self.base_url)
+                self.wait.until(EC.presence_of_element_located((By.ID, "comboUnidade")))
+        pipeline.submit_parsed(FimUnidade(index, unit_data, course_codes, delivered, complete))
+
+    def _parse_page(self, item: PaginaCurso) -> Optional[Dict]:
+        """Estágio de parsing: conteúdo da grade -> registro do curso."""
+        if item.formato == 'registro':
+            return item.conteudo
+        with self.metrics.within(item.metricas), self.metrics.phase('parsing'):
+            if item.formato == 'script':
+                return self.script_parser.parse(item.conteudo)
+            return self.parser.parse(item.conteudo)
+
+    def _link(self, item, record: Optional[Dict]):
+        """
+        Estágio de ligação (uma única thread): monta os cursos de cada unidade na ordem da
+        página, cada unidade com seu banco de disciplinas, e conclui a unidade quando o
+        FimUnidade chegou e todos os cursos entregues já foram montados.
+        """
+        state = self._linking.setdefault(item.indice, {'disciplinas': {}, 'cursos': [], 'prontos': {}, 'fim': None})
+        if isinstance(item, FimUnidade):
+            state['fim'] = item
+        else:
+            state['prontos'][item.posicao] = (item, record)
+
+        while len(state['cursos']) in state['prontos']:
+            page, record = state['prontos'].pop(len(state['cursos']))
+            parsed_data = self._restore_course(record, state['disciplinas']) if record else None
+            if page.formato != 'registro':
+                self._checkpoint_course(page.unidade['codigo'], page.curso['codigo'], page.content_hash, parsed_data)
+            state['cursos'].append(self._build_course(parsed_data, page.unidade['nome']) if parsed_data else None)
+
+        fim = state['fim']
+        if fim is None or len(state['cursos']) < fim.entregues:
+            return
+        del self._linking[fim.indice]
+        if fim.restaurada:
+            unidade_obj = self._restore_unit(fim.unidade, state['disciplinas'])
+        elif fim.cursos is None:
+            unidade_obj = None
+        else:
+            unidade_obj = Unidade(fim.unidade['nome'])
+            unidade_obj.cursos = [c for c in state['cursos'] if c is not None]
+        if fim.cursos is not None:
+            # Uma unidade interrompida registra os cursos entregues até o erro, como na coleta
+            # HTTP, para que o --reparse reconstrua o que chegou a ser baixado.
+            self._cache_unit(fim.unidade, fim.cursos[:fim.entregues])
+        if fim.completa:
+            self._checkpoint_unit(fim.unidade, fim.cursos)
+        self._results[fim.indice] = (unidade_obj, state['disciplinas'])
+        if unidade_obj is not None:
+            self._unit_finished(unidade_obj)
 
+    def _fetch_parallel(self, units: List[Dict], pipeline: CoursePipeline):
+        """
+        Distribui a busca das unidades entre `self.workers` sessões independentes do
+        navegador, todas entregando ao mesmo pipeline.
+        """
+        jobs: "queue.Queue[Tuple[int, Dict]]" = queue.Queue()
+        for index, unit_data in enumerate(units):
+            jobs.put((index, unit_data))
+        pending = [len(units)]
+        lock = threading.Lock()
+
+        def worker(worker_id: int):
+            try:
+                if worker_id == 0:
+                    collector = self
+                else:
+                    collector = type(self)(
+                        base_url=self.base_url, journal=self.journal, store=self.store, metrics=self.metrics,
+                        extraction=self.extraction, page_cache=self.page_cache, driver_path=self.driver_path
+                    )
+                    collector._open_search_form()
+            except Exception as e:
+                print(f"ERRO ao iniciar o worker {worker_id}: {e}")
+                return
+
+            try:
+                while True:
+                    try:
+                        index, unit_data = jobs.get(timeout=0.2)
+                    except queue.Empty:
+                        # Uma unidade em andamento em outro worker ainda pode voltar para a fila.
+                        with lock:
+                            if pending[0] == 0:
+                                return
+                        continue
+                    try:
+                        collector._fetch_unit(index, unit_data, pipeline)
+                    except Exception as e:
+                        # A sessão do navegador não se recuperou; a unidade volta para a fila
+                        # e é coletada de novo por outro worker. Os cursos que já chegaram ao
+                        # pipeline são entregues outra vez nas mesmas posições.
+                        print(f"ERRO fatal no worker {worker_id} ({unit_data['nome']}): {e}")
+                        jobs.put((index, unit_data))
+                        return
+                    with lock:
+                        pending[0] -= 1
+            finally:
+                if collector is not self:
+                    collector.driver.quit()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(worker, range(min(self.workers, len(units)))))
+
+        if not jobs.empty():
+            print(f"AVISO: {jobs.qsize()} unidades não foram processadas porque todos os workers falharam.")
+
+    def collect_data(self) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+        """
+        Coleta as unidades em pipeline (veja crawl_pipeline.py). Cada unidade é montada com
+        seu próprio banco de disciplinas e o resultado fica na posição original da unidade,
+        para que a junção seja determinística com qualquer número de sessões.
+        """
+        novas_tabelas()
         try:
-            self.driver.get(self.BASE_URL)
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#comboUnidade option[value]:not([value=''])")))
+            self._open_search_form()
 
-            unit_select = Select(self.driver.find_element(By.ID, "comboUnidade"))
-            units = [{'codigo': opt.get_attribute('value'), 'nome': opt.text.strip()} for opt in unit_select.options[1:]]
+            units = self._read_options("comboUnidade")
             units_to_process = units[:self.max_units] if self.max_units is not None else units
+            self._cache_units(units_to_process)
 
-            for unit_data in units_to_process:
-                try:
-                    Select(self.driver.find_element(By.ID, "comboUnidade")).select_by_value(unit_data['codigo'])
-                    self.wait.until(EC.presence_of_element_located((By.XPATH, "//select[@id='comboCurso']/option[2]")))
-                    
-                    course_select = Select(self.driver.find_element(By.ID, "comboCurso"))
-                    courses = [{'codigo': opt.get_attribute('value'), 'nome': opt.text.strip()} for opt in course_select.options[1:]]
-
-                    unidade_obj = Unidade(unit_data['nome'])
-                    unidades_db.append(unidade_obj)
-
-                    for course_data in courses:
-                        self._navigate_to_curriculum(course_data['codigo'])
-                        
-                        soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                        parsed_data = self._extract_course_data(soup, disciplinas_db)
-
-                        if parsed_data:
-                            curso_obj = Curso(parsed_data['nome'], unit_data['nome'])
-                            curso_obj.duracao_ideal = parsed_data['duracao_ideal']
-                            curso_obj.duracao_minima = parsed_data['duracao_minima']
-                            curso_obj.duracao_maxima = parsed_data['duracao_maxima']
-                            
-                            for disc_type in ['obrigatorias', 'optativas_livres', 'optativas_eletivas']:
-                                for disc_obj in parsed_data[disc_type]:
-                                    getattr(curso_obj, disc_type).append(disc_obj)
-                                    disc_obj.cursos.add(curso_obj.nome)
-                            
-                            unidade_obj.cursos.append(curso_obj)
-                            cursos_db.append(curso_obj)
-                        
-                        self._return_to_search_form(unit_data['codigo'])
-                except Exception as e:
-                    print(f"ERRO inesperado ao processar a unidade {unit_data['nome']}: {e}")
-                    self.driver.get(self.BASE_URL)
-                    self.wait.until(EC.presence_of_element_located((By.ID, "comboUnidade")))
-                    continue
+            self._results: List[Tuple[Optional[Unidade], Dict[str, Disciplina]]] = [(None, {})] * len(units_to_process)
+            self._linking: Dict[int, Dict] = {}
+            parallel = self.workers > 1 and len(units_to_process) > 1
+            pipeline = CoursePipeline(
+                self._parse_page, self._link, self.metrics,
+                fetchers=min(self.workers, len(units_to_process)) if parallel else 1, parse_workers=self.parse_workers
+            )
+            try:
+                if parallel:
+                    self._fetch_parallel(units_to_process, pipeline)
+                else:
+                    for index, unit_data in enumerate(units_to_process):
+                        self._fetch_unit(index, unit_data, pipeline)
+            finally:
+                pipeline.close()
+            return self._merge_unit_results(self._results)
         finally:
             self.driver.quit()
-        
-        return unidades_db, cursos_db, disciplinas_db
\ No newline at end of file
+            self._report_metrics()
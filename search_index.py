@@ -0,0 +1,152 @@
+"""
+Índice de busca por nome, sem diferenciar maiúsculas nem acentos.
+
+Os nomes são quebrados em palavras (tokens) e cada token aponta para os itens em que
+aparece (índice invertido). Sobre o vocabulário há ainda um índice de bigramas e
+trigramas, usado para encontrar tokens que contêm o termo buscado no meio.
+
+Cada termo da consulta precisa casar com algum token do item. O casamento vale mais
+quando é exato (3), depois por prefixo (2) e por último por trecho no meio (1); os
+resultados são ordenados pela soma dessas notas, depois pelos que contêm a consulta
+inteira, pelo tamanho do nome e pelo nome. Os itens são numerados já nessa última ordem,
+então as listas de itens de cada token saem ordenadas por relevância.
+"""
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+EXACT, PREFIX, INFIX = 3, 2, 1
+TOKEN_PATTERN = re.compile(r'\w+')
+COMBINING_PATTERN = re.compile('[\u0300-\u036f]')
+
+
+def normalize(text: str) -> str:
+    """Remove acentos e converte para minúsculas ('Cálculo' -> 'calculo')."""
+    return COMBINING_PATTERN.sub('', unicodedata.normalize('NFKD', text)).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+def _grams(token: str) -> set:
+    """Bigramas e trigramas de um token."""
+    return {token[i:i + n] for n in (2, 3) for i in range(len(token) - n + 1)}
+
+
+class SearchIndex(Generic[T]):
+    """Índice invertido sobre o texto devolvido por `key` para cada item."""
+
+    def __init__(self, items: Iterable[T], key: Callable[[T], str]):
+        texts = [(normalize(key(item)), item) for item in items]
+        texts.sort(key=lambda pair: (len(pair[0]), pair[0]))
+        self.items: List[T] = [item for _, item in texts]
+        self._texts: List[str] = [text for text, _ in texts]
+
+        postings: Dict[str, array] = {}
+        for doc, text in enumerate(self._texts):
+            for token in dict.fromkeys(TOKEN_PATTERN.findall(text)):
+                postings.setdefault(token, array('I')).append(doc)
+
+        self._vocab: List[str] = sorted(postings)
+        self._postings: List[array] = [postings[token] for token in self._vocab]
+
+        grams: Dict[str, array] = {}
+        for token_id, token in enumerate(self._vocab):
+            for gram in _grams(token):
+                grams.setdefault(gram, array('I')).append(token_id)
+        self._grams = grams
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _matching_tokens(self, term: str) -> Dict[int, int]:
+        """Tokens do vocabulário que casam com o termo, com a nota de cada casamento."""
+        matches = {}
+        start = bisect_left(self._vocab, term)
+        end = bisect_left(self._vocab, term + '\uffff', start)
+        for token_id in range(start, end):
+            matches[token_id] = EXACT if self._vocab[token_id] == term else PREFIX
+
+        if len(term) == 1:
+            candidates = (i for i, token in enumerate(self._vocab) if term in token)
+        else:
+            keys = [term] if len(term) == 2 else [term[i:i + 3] for i in range(len(term) - 2)]
+            lists = sorted((self._grams.get(k, ()) for k in keys), key=len)
+            if not lists[0]:
+                return matches
+            candidates = set(lists[0])
+            for ids in lists[1:]:
+                candidates.intersection_update(ids)
+                if not candidates:
+                    break
+        for token_id in candidates:
+            if token_id not in matches and term in self._vocab[token_id]:
+                matches[token_id] = INFIX
+        return matches
+
+    def _docs(self, token_ids: Iterable[int]) -> set:
+        return set().union(*(self._postings[t] for t in token_ids))
+
+    def _search_single(self, matches: Dict[int, int], limit: Optional[int]) -> List[int]:
+        """Um termo só: percorre as listas de cada nota já em ordem, até completar o limite."""
+        found, seen = [], set()
+        for score in (EXACT, PREFIX, INFIX):
+            lists = [self._postings[t] for t, s in matches.items() if s == score]
+            for doc in heapq.merge(*lists):
+                if doc not in seen:
+                    seen.add(doc)
+                    found.append(doc)
+                    if limit is not None and len(found) >= limit:
+                        return found
+        return found
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[T]:
+        """Itens que casam com todos os termos da consulta, do mais para o menos relevante."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        term_matches = [self._matching_tokens(term) for term in terms]
+        if not all(term_matches):
+            return []
+        if len(terms) == 1:
+            return [self.items[doc] for doc in self._search_single(term_matches[0], limit)]
+
+        # Começa pelo termo mais seletivo e vai restringindo os candidatos.
+        term_matches.sort(key=lambda m: sum(len(self._postings[t]) for t in m))
+        candidates = self._docs(term_matches[0])
+        for matches in term_matches[1:]:
+            if len(matches) == 1:
+                candidates.intersection_update(self._postings[next(iter(matches))])
+            else:
+                candidates &= self._docs(matches)
+            if not candidates:
+                return []
+
+        # Termos que casam sempre com a mesma nota somam uma constante; para os demais, a
+        # nota é 1 + (casou por prefixo ou exato) + (casou exato).
+        base, tiers = 0, []
+        for matches in term_matches:
+            scores = set(matches.values())
+            if len(scores) == 1:
+                base += scores.pop()
+            else:
+                exact = candidates.intersection(self._docs(t for t, s in matches.items() if s == EXACT))
+                prefix = exact | candidates.intersection(self._docs(t for t, s in matches.items() if s == PREFIX))
+                tiers.append((exact, prefix))
+        phrase = normalize(query).strip()
+
+        def rank(doc):
+            score = base + sum(1 + (doc in prefix) + (doc in exact) for exact, prefix in tiers)
+            return (-score, phrase not in self._texts[doc], doc)
+
+        if limit is None:
+            ranked = sorted(candidates, key=rank)
+        else:
+            ranked = heapq.nsmallest(limit, candidates, key=rank)
+        return [self.items[doc] for doc in ranked]
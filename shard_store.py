@@ -0,0 +1,235 @@
+"""
+Armazenamento particionado por unidade: um diretório com um arquivo (shard) por unidade e
+um manifesto pequeno, de modo que carregar algumas unidades lê só os shards delas.
+
+Layout do diretório (extensão .shards):
+    manifest.json        versão, totais e as unidades na ordem da coleta, com o arquivo do
+                         shard e o resumo dos cursos (nome e durações, sem disciplinas)
+    disciplinas.json     índice das disciplinas na ordem original: código, nome, número de
+                         cursos e o shard que guarda o registro completo
+    unidades/NNNN.json   cursos completos da unidade e as disciplinas que eles usam, cada
+                         uma com sua posição na ordem original
+
+Uma disciplina usada por várias unidades aparece em todos os shards delas, sempre com o
+conjunto completo de cursos; ao carregar só parte das unidades, esse conjunto é restringido
+aos cursos carregados (como faz utils.filter_units). Disciplinas que não pertencem a
+nenhum curso não são gravadas.
+"""
+import json
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from data_models import Unidade, Curso, Disciplina
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+INDEX_FILE = 'disciplinas.json'
+SHARDS_DIR = 'unidades'
+
+DISCIPLINE_LISTS = ('obrigatorias', 'optativas_livres', 'optativas_eletivas')
+DISCIPLINE_FIELDS = (
+    'creditos_aula', 'creditos_trabalho', 'carga_horaria',
+    'carga_estagio', 'carga_praticas', 'atividades_aprofundamento'
+)
+COURSE_SUMMARY_FIELDS = ('nome', 'duracao_ideal', 'duracao_minima', 'duracao_maxima')
+
+
+class ShardError(Exception):
+    """O diretório não contém um conjunto de shards válido ou de versão compatível."""
+
+
+class DisciplinaIndexada(NamedTuple):
+    """Entrada do índice de disciplinas."""
+    nome: str
+    num_cursos: int
+    shard: int
+
+
+def _write_json(filename: str, data):
+    """Grava em um arquivo temporário e o renomeia, para nunca deixar um shard pela metade."""
+    tmp = filename + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, filename)
+
+
+def save_data_to_shards(
+    unidades: List[Unidade],
+    cursos: List[Curso],
+    disciplinas: Dict[str, Disciplina],
+    directory: str = 'usp_data.shards'
+):
+    """
+    Grava um shard por unidade, o índice de disciplinas e, por último, o manifesto. Os cursos
+    de cada unidade são os de `cursos` com aquele nome de unidade, como em utils.filter_units.
+    """
+    os.makedirs(os.path.join(directory, SHARDS_DIR), exist_ok=True)
+    positions = {codigo: i for i, codigo in enumerate(disciplinas)}
+    cursos_by_unidade: Dict[str, List[Curso]] = {}
+    for curso in cursos:
+        cursos_by_unidade.setdefault(curso.unidade, []).append(curso)
+    shard_of: Dict[str, int] = {}
+    entries, written = [], set()
+
+    for i, unidade in enumerate(unidades):
+        arquivo = f"{SHARDS_DIR}/{i:04d}.json"
+        cursos_unidade = cursos_by_unidade.get(unidade.nome, [])
+        usadas: Dict[str, Disciplina] = {}
+        for curso in cursos_unidade:
+            for disc_type in DISCIPLINE_LISTS:
+                for disciplina in getattr(curso, disc_type):
+                    usadas.setdefault(disciplina.codigo, disciplina)
+        for codigo in usadas:
+            shard_of.setdefault(codigo, i)
+
+        _write_json(os.path.join(directory, arquivo), {
+            'unidade': unidade.nome,
+            'cursos': [curso.to_dict() for curso in cursos_unidade],
+            'disciplinas': [[positions[c], d.to_dict()] for c, d in usadas.items() if c in positions],
+        })
+        written.add(os.path.basename(arquivo))
+        entries.append({
+            'nome': unidade.nome,
+            'arquivo': arquivo,
+            'cursos': [[getattr(curso, f) for f in COURSE_SUMMARY_FIELDS] for curso in cursos_unidade],
+        })
+
+    indexed = [(codigo, d) for codigo, d in disciplinas.items() if codigo in shard_of]
+    _write_json(os.path.join(directory, INDEX_FILE), {
+        'codigos': [codigo for codigo, _ in indexed],
+        'nomes': [d.nome for _, d in indexed],
+        'num_cursos': [len(d.cursos) for _, d in indexed],
+        'shards': [shard_of[codigo] for codigo, _ in indexed],
+    })
+    _write_json(os.path.join(directory, MANIFEST_FILE), {
+        'versao': MANIFEST_VERSION,
+        'num_cursos': sum(len(entry['cursos']) for entry in entries),
+        'num_disciplinas': len(indexed),
+        'unidades': entries,
+    })
+
+    # Shards de uma gravação anterior com mais unidades.
+    for name in os.listdir(os.path.join(directory, SHARDS_DIR)):
+        if name.endswith('.json') and name not in written:
+            os.remove(os.path.join(directory, SHARDS_DIR, name))
+
+
+class ShardStore:
+    """
+    Leitura sob demanda de um diretório de shards. Cada shard é lido no máximo uma vez e as
+    disciplinas compartilhadas entre unidades são o mesmo objeto em todos os cursos.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ShardError(f"Não foi possível ler o manifesto de '{directory}': {e}")
+        if manifest.get('versao') != MANIFEST_VERSION:
+            raise ShardError(f"Versão de shards não suportada em '{directory}': {manifest.get('versao')}.")
+
+        self.unidades: List[Dict] = manifest['unidades']
+        self.num_cursos: int = manifest['num_cursos']
+        self.num_disciplinas: int = manifest['num_disciplinas']
+        self._index: Optional[Dict[str, DisciplinaIndexada]] = None
+        self._loaded: Dict[int, List[Curso]] = {}
+        self.disciplinas: Dict[str, Disciplina] = {}
+        self._positions: Dict[str, int] = {}
+
+    @property
+    def index(self) -> Dict[str, DisciplinaIndexada]:
+        """Índice código -> disciplina, na ordem original, lido na primeira consulta."""
+        if self._index is None:
+            with open(os.path.join(self.directory, INDEX_FILE), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._index = {
+                codigo: DisciplinaIndexada(nome, n, shard)
+                for codigo, nome, n, shard in zip(data['codigos'], data['nomes'], data['num_cursos'], data['shards'])
+            }
+        return self._index
+
+    def course_summaries(self, position: int) -> List[Curso]:
+        """Cursos de uma unidade só com nome e durações, a partir do manifesto."""
+        entry = self.unidades[position]
+        cursos = []
+        for values in entry['cursos']:
+            curso = Curso(values[0], entry['nome'])
+            curso.duracao_ideal, curso.duracao_minima, curso.duracao_maxima = values[1:]
+            cursos.append(curso)
+        return cursos
+
+    def is_loaded(self, position: int) -> bool:
+        return position in self._loaded
+
+    def load_unit(self, position: int) -> List[Curso]:
+        """Cursos completos da unidade na posição `position` do manifesto."""
+        cursos = self._loaded.get(position)
+        if cursos is not None:
+            return cursos
+
+        with open(os.path.join(self.directory, self.unidades[position]['arquivo']), 'r', encoding='utf-8') as f:
+            shard = json.load(f)
+        for posicao, record in shard['disciplinas']:
+            if record['codigo'] in self.disciplinas:
+                continue
+            disciplina = Disciplina(record['codigo'], record['nome'])
+            for field in DISCIPLINE_FIELDS:
+                setattr(disciplina, field, record.get(field, 0))
+            disciplina.cursos = record.get('cursos', ())
+            self.disciplinas[disciplina.codigo] = disciplina
+            self._positions[disciplina.codigo] = posicao
+
+        cursos = []
+        for record in shard['cursos']:
+            curso = Curso(record['nome'], record['unidade'])
+            curso.duracao_ideal = record.get('duracao_ideal', 0)
+            curso.duracao_minima = record.get('duracao_minima', 0)
+            curso.duracao_maxima = record.get('duracao_maxima', 0)
+            for disc_type in DISCIPLINE_LISTS:
+                setattr(curso, disc_type, [
+                    self.disciplinas[codigo] for codigo in record.get(disc_type, []) if codigo in self.disciplinas
+                ])
+            cursos.append(curso)
+        self._loaded[position] = cursos
+        return cursos
+
+    def position(self, disciplina: Disciplina) -> int:
+        """Posição de uma disciplina já lida na ordem original."""
+        return self._positions[disciplina.codigo]
+
+    def loaded_disciplinas(self) -> Dict[str, Disciplina]:
+        """As disciplinas dos shards já lidos, na ordem original."""
+        return {codigo: self.disciplinas[codigo] for codigo in sorted(self.disciplinas, key=self._positions.__getitem__)}
+
+    def load(self, positions: Iterable[int] = None) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+        """
+        Carrega as unidades indicadas (todas, por padrão) no mesmo formato dos demais
+        arquivos. Com um subconjunto, as disciplinas ficam restritas aos cursos carregados.
+        """
+        positions = range(len(self.unidades)) if positions is None else sorted(set(positions))
+        unidades_db, cursos_db = [], []
+        for position in positions:
+            unidade = Unidade(self.unidades[position]['nome'])
+            unidade.cursos = list(self.load_unit(position))
+            unidades_db.append(unidade)
+            cursos_db.extend(unidade.cursos)
+
+        disciplinas_db = self.loaded_disciplinas()
+        if len(positions) < len(self.unidades):
+            nomes_cursos = {c.nome for c in cursos_db}
+            for codigo in list(disciplinas_db):
+                disciplinas_db[codigo].cursos.intersection_update(nomes_cursos)
+                if not disciplinas_db[codigo].cursos:
+                    del disciplinas_db[codigo]
+        return unidades_db, cursos_db, disciplinas_db
+
+
+def load_data_from_shards(
+    directory: str = 'usp_data.shards', num_unidades: int = None
+) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+    """Carrega as primeiras `num_unidades` unidades (todas, por padrão) lendo só os shards delas."""
+    store = ShardStore(directory)
+    count = len(store.unidades) if num_unidades is None else min(num_unidades, len(store.unidades))
+    return store.load(range(count))
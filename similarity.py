@@ -0,0 +1,213 @@
+"""
+Sobreposição entre as grades dos cursos (comandos SIMILARES e PARES).
+
+Cada disciplina recebe um ID inteiro e cada curso vira um bitset (linhas de uint64) sobre
+esses IDs. A comparação de um curso com todos os outros é um AND seguido da contagem de
+bits, feita de uma vez para a matriz inteira. Os pares mais sobrepostos do conjunto saem da
+mesma operação, em blocos de cursos contra os seguintes, sobre bitsets restritos às
+disciplinas que aparecem em pelo menos dois cursos (as demais não contribuem para nenhuma
+interseção). Cada bloco usa no máximo PAIR_BLOCK_BYTES de memória intermediária, então o
+custo em memória de PARES não depende do número de cursos ao quadrado.
+
+Para conjuntos muito grandes, `MinHashLSH` escolhe os pares candidatos (os que coincidem
+em alguma faixa da assinatura MinHash) e só eles têm a similaridade exata calculada. Pares
+com Jaccard alto são encontrados com alta probabilidade; pares pouco parecidos podem ficar
+de fora, o que não afeta os primeiros colocados.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Set, Tuple
+
+import numpy as np
+
+from data_models import Curso
+
+DEFAULT_CATEGORIES = ('obrigatorias',)
+# Memória máxima do AND entre um bloco de cursos e os seguintes em top_pairs (o bloco tem
+# pelo menos um curso, que ocupa n x palavras x 8 bytes).
+PAIR_BLOCK_BYTES = 32 << 20
+# Acima deste número de cursos, top_pairs usa MinHash/LSH em vez da comparação exata.
+LSH_THRESHOLD = 2000
+
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Número de bits ligados em cada linha de uma matriz de uint64."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+class Similaridade(NamedTuple):
+    """Comparação entre dois cursos."""
+    curso: Curso
+    outro: Curso
+    comuns: int
+    jaccard: float
+    # Fração do menor dos dois cursos que está no outro: |A ∩ B| / min(|A|, |B|).
+    sobreposicao: float
+
+
+class SimilarityEngine:
+    """Bitsets das disciplinas de cada curso e as consultas de similaridade sobre eles."""
+
+    def __init__(self, cursos: Sequence[Curso], disciplinas: Sequence[Iterable[str]]):
+        """`disciplinas[i]` são os códigos das disciplinas consideradas de `cursos[i]`."""
+        self.cursos = list(cursos)
+        self.disc_ids: Dict[str, int] = {}
+        rows, cols = [], []
+        for i, codigos in enumerate(disciplinas):
+            for codigo in codigos:
+                rows.append(i)
+                cols.append(self.disc_ids.setdefault(codigo, len(self.disc_ids)))
+
+        # Pares (curso, disciplina) únicos, ordenados por curso.
+        num_disc = max(1, len(self.disc_ids))
+        pairs = np.unique(np.array(rows, dtype=np.int64) * num_disc + np.array(cols, dtype=np.int64))
+        self._rows, self._cols = pairs // num_disc, pairs % num_disc
+
+        self.bits = np.zeros((len(self.cursos), (num_disc + 63) // 64), dtype=np.uint64)
+        np.bitwise_or.at(
+            self.bits, (self._rows, self._cols // 64),
+            np.left_shift(np.uint64(1), (self._cols % 64).astype(np.uint64))
+        )
+        self.sizes = np.bincount(self._rows, minlength=len(self.cursos)).astype(np.int64)
+
+        self._positions: Dict[Tuple[str, str], int] = {}
+        for i, curso in enumerate(self.cursos):
+            self._positions.setdefault((curso.unidade, curso.nome), i)
+
+    @classmethod
+    def from_cursos(cls, cursos: Sequence[Curso], categorias: Sequence[str] = DEFAULT_CATEGORIES) -> 'SimilarityEngine':
+        return cls(cursos, [[d.codigo for cat in categorias for d in getattr(c, cat)] for c in cursos])
+
+    def _result(self, i: int, j: int, comuns: int) -> Similaridade:
+        union = self.sizes[i] + self.sizes[j] - comuns
+        menor = min(self.sizes[i], self.sizes[j])
+        return Similaridade(
+            self.cursos[i], self.cursos[j], int(comuns),
+            float(comuns / union) if union else 0.0, float(comuns / menor) if menor else 0.0
+        )
+
+    def _ranked(self, candidates: List[Tuple[int, int, int]], k: int) -> List[Similaridade]:
+        """Ordena (i, j, comuns) por Jaccard e depois por disciplinas em comum; empates na ordem dos cursos."""
+        results = [self._result(i, j, comuns) for i, j, comuns in candidates]
+        order = sorted(range(len(results)), key=lambda n: (-results[n].jaccard, -results[n].comuns, candidates[n][:2]))
+        return [results[n] for n in order[:k]]
+
+    def similar_to(self, curso: Curso, k: int = 10) -> List[Similaridade]:
+        """Os `k` cursos com mais disciplinas em comum com `curso`, pelo índice de Jaccard."""
+        i = self._positions.get((curso.unidade, curso.nome))
+        if i is None or not self.sizes[i]:
+            return []
+        comuns = _popcount(self.bits & self.bits[i])
+        comuns[i] = 0
+        others = np.flatnonzero(comuns)
+        return self._ranked([(i, int(j), int(comuns[j])) for j in others], k)
+
+    def _shared_bits(self) -> np.ndarray:
+        """Bitsets dos cursos só sobre as disciplinas que aparecem em pelo menos dois cursos."""
+        shared = np.bincount(self._cols, minlength=len(self.disc_ids)) >= 2
+        column = np.cumsum(shared) - 1
+        keep = shared[self._cols]
+        rows, cols = self._rows[keep], column[self._cols[keep]]
+        bits = np.zeros((len(self.cursos), max(1, (int(shared.sum()) + 63) // 64)), dtype=np.uint64)
+        np.bitwise_or.at(bits, (rows, cols // 64), np.left_shift(np.uint64(1), (cols % 64).astype(np.uint64)))
+        return bits
+
+    def _pair_candidates_exact(self, k: int) -> List[Tuple[int, int, int]]:
+        n = len(self.cursos)
+        if not n:
+            return []
+        bits = self._shared_bits()
+        block_size = max(1, PAIR_BLOCK_BYTES // (n * bits.itemsize * bits.shape[1]))
+
+        # Cada bloco de cursos é comparado só com ele mesmo e com os seguintes. Ficam todos os
+        # pares com Jaccard >= k-ésimo maior do bloco (inclusive empates), o que basta para o
+        # resultado global ser exato.
+        candidates = []
+        sizes = self.sizes.astype(np.float64)
+        for start in range(0, n, block_size):
+            stop = min(n, start + block_size)
+            comuns = _popcount(bits[start:stop, None, :] & bits[None, start:, :])
+            comuns[np.arange(stop - start)[:, None] >= np.arange(n - start)[None, :]] = 0
+            rows, cols = np.nonzero(comuns)
+            if not rows.size:
+                continue
+            values = comuns[rows, cols]
+            cols += start
+            jaccard = values / (sizes[rows + start] + sizes[cols] - values)
+            if jaccard.size > k:
+                threshold = np.partition(jaccard, jaccard.size - k)[jaccard.size - k]
+                selected = jaccard >= threshold
+                rows, cols, values = rows[selected], cols[selected], values[selected]
+            candidates.extend(zip((rows + start).tolist(), cols.tolist(), values.tolist()))
+        return candidates
+
+    def _pair_candidates_lsh(self, lsh: 'MinHashLSH') -> List[Tuple[int, int, int]]:
+        pairs = sorted(lsh.candidate_pairs())
+        if not pairs:
+            return []
+        first, second = np.array(pairs, dtype=np.int64).T
+        comuns = _popcount(self.bits[first] & self.bits[second])
+        return [(i, j, c) for i, j, c in zip(first.tolist(), second.tolist(), comuns.tolist()) if c]
+
+    def top_pairs(self, k: int = 10, method: str = 'auto') -> List[Similaridade]:
+        """
+        Os `k` pares de cursos com maior índice de Jaccard. `method` pode ser 'exact',
+        'lsh' ou 'auto' (LSH a partir de LSH_THRESHOLD cursos).
+        """
+        if method == 'auto':
+            method = 'lsh' if len(self.cursos) > LSH_THRESHOLD else 'exact'
+        if method == 'lsh':
+            candidates = self._pair_candidates_lsh(MinHashLSH(self))
+        else:
+            candidates = self._pair_candidates_exact(k)
+        return self._ranked(candidates, k)
+
+
+class MinHashLSH:
+    """
+    Assinaturas MinHash dos cursos, divididas em `bands` faixas: cursos com alguma faixa
+    idêntica são candidatos. Com 128 permutações em 32 faixas de 4, pares com Jaccard 0,5
+    são candidatos com ~87% de chance e pares com Jaccard 0,8 com ~100%.
+    """
+    PRIME = (1 << 31) - 1
+
+    def __init__(self, engine: SimilarityEngine, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm deve ser múltiplo de bands.")
+        self.bands = bands
+        rng = np.random.default_rng(seed)
+        a = rng.integers(1, self.PRIME, size=num_perm, dtype=np.int64)
+        b = rng.integers(0, self.PRIME, size=num_perm, dtype=np.int64)
+
+        n = len(engine.cursos)
+        self.signatures = np.full((n, num_perm), self.PRIME, dtype=np.int64)
+        self.has_disciplines = engine.sizes > 0
+        starts = np.searchsorted(engine._rows, np.arange(n))
+        # Processa alguns cursos por vez para limitar a matriz intermediária (nnz x num_perm);
+        # os hashes de cada disciplina são calculados só para as ocorrências do bloco.
+        chunk = max(1, 65536 // max(1, int(engine.sizes.mean() if n else 1)))
+        for first in range(0, n, chunk):
+            courses = np.flatnonzero(self.has_disciplines[first:first + chunk]) + first
+            if not courses.size:
+                continue
+            lo, hi = starts[courses[0]], starts[courses[-1]] + engine.sizes[courses[-1]]
+            block = (engine._cols[lo:hi, None] * a + b) % self.PRIME
+            self.signatures[courses] = np.minimum.reduceat(block, starts[courses] - lo, axis=0)
+
+    def candidate_pairs(self) -> Set[Tuple[int, int]]:
+        pairs: Set[Tuple[int, int]] = set()
+        rows_per_band = self.signatures.shape[1] // self.bands
+        courses = np.flatnonzero(self.has_disciplines)
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = defaultdict(list)
+            signatures = self.signatures[courses, band * rows_per_band:(band + 1) * rows_per_band]
+            for i, row in zip(courses.tolist(), signatures):
+                buckets[row.tobytes()].append(i)
+            for members in buckets.values():
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        pairs.add((members[x], members[y]))
+        return pairs
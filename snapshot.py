@@ -0,0 +1,342 @@
+"""
+Snapshot binário dos dados coletados, pensado para inicialização quase instantânea.
+
+O arquivo guarda todas as strings em uma tabela única e referencia unidades, cursos e
+disciplinas por índices inteiros. Ele é aberto com mmap: unidades e cursos são criados
+na carga (são poucos), enquanto cada Disciplina só é materializada quando acessada.
+
+O cabeçalho também guarda a identificação do arquivo JSON/JSONL de origem (tamanho, mtime
+e hash do conteúdo): o snapshot gravado ao lado de um arquivo de dados só é usado no lugar
+dele se essa identificação ainda confere (ver `snapshot_matches`).
+
+Layout (little-endian):
+    cabeçalho        MAGIC, versão, origem (tamanho, mtime em ns, hash) e (offset, tamanho) de cada seção
+    str_offsets      uint32[n_strings + 1]
+    str_data         bytes UTF-8 concatenados
+    unidades         registros UNIDADE_RECORD
+    cursos           registros CURSO_RECORD
+    disciplinas      registros DISCIPLINA_RECORD, na ordem original
+    codigo_index     uint32[n_disciplinas], índices das disciplinas ordenados por código
+    pool             uint32[], listas de índices referenciadas pelos registros
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from data_models import Unidade, Curso, Disciplina
+
+MAGIC = b'USPSNAP\0'
+VERSION = 2
+SECTIONS = ('str_offsets', 'str_data', 'unidades', 'cursos', 'disciplinas', 'codigo_index', 'pool')
+HASH_SIZE = 32
+HASH_CHUNK_SIZE = 1 << 20
+
+HEADER = struct.Struct(f'<8sIQQ{HASH_SIZE}s' + 'II' * len(SECTIONS))
+# nome, início e tamanho da lista de cursos no pool
+UNIDADE_RECORD = struct.Struct('<III')
+# nome, unidade, durações (ideal, mínima, máxima) e (início, tamanho) de cada lista de disciplinas
+CURSO_RECORD = struct.Struct('<IIHHH' + 'II' * 3)
+# código, nome, os seis campos numéricos e (início, tamanho) dos nomes de cursos no pool
+DISCIPLINA_RECORD = struct.Struct('<II' + 'I' * 6 + 'II')
+
+DISCIPLINE_LISTS = ('obrigatorias', 'optativas_livres', 'optativas_eletivas')
+DISCIPLINE_FIELDS = (
+    'creditos_aula', 'creditos_trabalho', 'carga_horaria',
+    'carga_estagio', 'carga_praticas', 'atividades_aprofundamento'
+)
+
+
+class SnapshotError(Exception):
+    """O arquivo não é um snapshot válido ou foi gerado por uma versão incompatível."""
+
+
+class Origem(NamedTuple):
+    """Identificação do arquivo de dados a partir do qual o snapshot foi gerado."""
+    tamanho: int
+    mtime_ns: int
+    hash: bytes
+
+
+SEM_ORIGEM = Origem(0, 0, b'\0' * HASH_SIZE)
+
+
+def _content_hash(filename: str) -> bytes:
+    digest = hashlib.blake2b(digest_size=HASH_SIZE)
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def source_of(filename: str) -> Origem:
+    """Tamanho, mtime e hash do conteúdo de um arquivo de dados."""
+    stat = os.stat(filename)
+    return Origem(stat.st_size, stat.st_mtime_ns, _content_hash(filename))
+
+
+def snapshot_path_for(filename: str) -> str:
+    """Caminho do snapshot gravado ao lado de um arquivo de dados JSON/JSONL."""
+    return os.path.splitext(filename)[0] + '.snap'
+
+
+def read_source(filename: str) -> Origem:
+    """Origem registrada no cabeçalho de um snapshot; lança SnapshotError se ele for inválido."""
+    with open(filename, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        raise SnapshotError(f"'{filename}' não é um snapshot válido.")
+    magic, version, tamanho, mtime_ns, content_hash, *_ = HEADER.unpack(header)
+    if version != VERSION:
+        raise SnapshotError(f"'{filename}' foi gerado com a versão {version} do formato (esperada {VERSION}).")
+    return Origem(tamanho, mtime_ns, content_hash)
+
+
+def snapshot_matches(snapshot_file: str, filename: str) -> bool:
+    """
+    Diz se o snapshot foi gerado a partir do conteúdo atual de `filename`. Tamanho e mtime
+    iguais aos registrados bastam; se só o mtime mudou (arquivo copiado, restaurado ou tocado),
+    o hash do conteúdo decide. Lança SnapshotError se o snapshot for inválido.
+    """
+    origem = read_source(snapshot_file)
+    if origem == SEM_ORIGEM:
+        return False
+    stat = os.stat(filename)
+    if stat.st_size != origem.tamanho:
+        return False
+    return stat.st_mtime_ns == origem.mtime_ns or _content_hash(filename) == origem.hash
+
+
+def save_snapshot(
+    unidades: List[Unidade],
+    cursos: List[Curso],
+    disciplinas: Dict[str, Disciplina],
+    filename: str = 'usp_data.snap',
+    origem: Origem = SEM_ORIGEM
+):
+    """
+    Grava o snapshot de forma atômica (arquivo temporário seguido de rename). `origem`
+    identifica o arquivo JSON/JSONL de onde vieram os dados, quando houver.
+    """
+    strings: Dict[str, int] = {}
+
+    def sid(text: str) -> int:
+        if text not in strings:
+            strings[text] = len(strings)
+        return strings[text]
+
+    pool = array('I')
+
+    def extend_pool(values) -> Tuple[int, int]:
+        start = len(pool)
+        pool.extend(values)
+        return start, len(pool) - start
+
+    disc_index = {codigo: i for i, codigo in enumerate(disciplinas)}
+    disc_records = bytearray()
+    for codigo, d in disciplinas.items():
+        start, count = extend_pool(sorted(sid(nome) for nome in d.cursos))
+        disc_records += DISCIPLINA_RECORD.pack(
+            sid(codigo), sid(d.nome), *(getattr(d, f) for f in DISCIPLINE_FIELDS), start, count
+        )
+
+    curso_index = {id(c): i for i, c in enumerate(cursos)}
+    curso_records = bytearray()
+    for c in cursos:
+        lists = []
+        for disc_type in DISCIPLINE_LISTS:
+            lists.extend(extend_pool(disc_index[d.codigo] for d in getattr(c, disc_type) if d.codigo in disc_index))
+        curso_records += CURSO_RECORD.pack(
+            sid(c.nome), sid(c.unidade), c.duracao_ideal, c.duracao_minima, c.duracao_maxima, *lists
+        )
+
+    unidade_records = bytearray()
+    for u in unidades:
+        start, count = extend_pool(curso_index[id(c)] for c in u.cursos if id(c) in curso_index)
+        unidade_records += UNIDADE_RECORD.pack(sid(u.nome), start, count)
+
+    str_offsets = array('I', [0])
+    str_data = bytearray()
+    for text in strings:
+        str_data += text.encode('utf-8')
+        str_offsets.append(len(str_data))
+
+    codigo_index = array('I', (disc_index[codigo] for codigo in sorted(disc_index)))
+
+    if sys.byteorder != 'little':
+        for arr in (pool, str_offsets, codigo_index):
+            arr.byteswap()
+
+    payloads = [str_offsets.tobytes(), bytes(str_data), bytes(unidade_records), bytes(curso_records),
+                bytes(disc_records), codigo_index.tobytes(), pool.tobytes()]
+    offsets = []
+    position = HEADER.size
+    for payload in payloads:
+        position += -position % 4
+        offsets.extend((position, len(payload)))
+        position += len(payload)
+
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, *origem, *offsets))
+        for (offset, _), payload in zip(zip(offsets[::2], offsets[1::2]), payloads):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(payload)
+    os.replace(tmp_filename, filename)
+
+
+class _LazyDisciplineList(Sequence):
+    """Lista de disciplinas de um curso que só cria os objetos Disciplina quando acessada."""
+    __slots__ = ('_reader', '_ids')
+
+    def __init__(self, reader: 'SnapshotReader', ids):
+        self._reader = reader
+        self._ids = ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._reader.disciplina(i) for i in self._ids[index]]
+        return self._reader.disciplina(self._ids[index])
+
+
+class _LazyDisciplinas(Mapping):
+    """Dicionário código -> Disciplina sobre o snapshot, com busca binária pelo código."""
+
+    def __init__(self, reader: 'SnapshotReader'):
+        self._reader = reader
+
+    def __len__(self) -> int:
+        return self._reader.n_disciplinas
+
+    def __iter__(self):
+        for i in range(self._reader.n_disciplinas):
+            yield self._reader.disciplina_codigo(i)
+
+    def __getitem__(self, codigo: str) -> Disciplina:
+        index = self._reader.find_disciplina(codigo)
+        if index is None:
+            raise KeyError(codigo)
+        return self._reader.disciplina(index)
+
+    def values(self):
+        return (self._reader.disciplina(i) for i in range(self._reader.n_disciplinas))
+
+    def items(self):
+        return ((d.codigo, d) for d in self.values())
+
+
+class SnapshotReader:
+    """Acesso aos registros de um snapshot mapeado em memória."""
+
+    def __init__(self, filename: str):
+        if os.path.getsize(filename) < HEADER.size:
+            raise SnapshotError(f"'{filename}' não é um snapshot válido.")
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, _, _, *offsets = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"'{filename}' não é um snapshot válido.")
+        if version != VERSION:
+            raise SnapshotError(f"'{filename}' foi gerado com a versão {version} do formato (esperada {VERSION}).")
+
+        self._view = view = memoryview(self._mmap)
+        self._sections = {}
+        for name, offset, size in zip(SECTIONS, offsets[::2], offsets[1::2]):
+            self._sections[name] = (offset, size)
+
+        self._str_offsets = self._uint32_array(view, 'str_offsets')
+        self._codigo_index = self._uint32_array(view, 'codigo_index')
+        self._pool = self._uint32_array(view, 'pool')
+        self._str_data_offset = self._sections['str_data'][0]
+        self.n_disciplinas = self._sections['disciplinas'][1] // DISCIPLINA_RECORD.size
+        self._disciplinas: List[Optional[Disciplina]] = [None] * self.n_disciplinas
+
+    def _uint32_array(self, view: memoryview, section: str):
+        offset, size = self._sections[section]
+        chunk = view[offset:offset + size]
+        if sys.byteorder == 'little':
+            return chunk.cast('I')
+        values = array('I', chunk.tobytes())
+        values.byteswap()
+        return values
+
+    def string(self, sid: int) -> str:
+        start = self._str_data_offset + self._str_offsets[sid]
+        end = self._str_data_offset + self._str_offsets[sid + 1]
+        return self._mmap[start:end].decode('utf-8')
+
+    def disciplina_codigo(self, index: int) -> str:
+        offset = self._sections['disciplinas'][0] + index * DISCIPLINA_RECORD.size
+        return self.string(struct.unpack_from('<I', self._mmap, offset)[0])
+
+    def find_disciplina(self, codigo: str) -> Optional[int]:
+        """Busca binária do código no índice ordenado; devolve a posição da disciplina."""
+        lo, hi = 0, len(self._codigo_index)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.disciplina_codigo(self._codigo_index[mid]) < codigo:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._codigo_index) and self.disciplina_codigo(self._codigo_index[lo]) == codigo:
+            return self._codigo_index[lo]
+        return None
+
+    def disciplina(self, index: int) -> Disciplina:
+        disciplina = self._disciplinas[index]
+        if disciplina is None:
+            offset = self._sections['disciplinas'][0] + index * DISCIPLINA_RECORD.size
+            codigo_sid, nome_sid, *values, start, count = DISCIPLINA_RECORD.unpack_from(self._mmap, offset)
+            disciplina = Disciplina(self.string(codigo_sid), self.string(nome_sid))
+            for field, value in zip(DISCIPLINE_FIELDS, values):
+                setattr(disciplina, field, value)
+            disciplina.cursos = {self.string(sid) for sid in self._pool[start:start + count]}
+            self._disciplinas[index] = disciplina
+        return disciplina
+
+    def load(self) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+        cursos_offset, cursos_size = self._sections['cursos']
+        cursos_db = []
+        for record in CURSO_RECORD.iter_unpack(self._view[cursos_offset:cursos_offset + cursos_size]):
+            nome_sid, unidade_sid, ideal, minima, maxima, *lists = record
+            curso = Curso(self.string(nome_sid), self.string(unidade_sid))
+            curso.duracao_ideal, curso.duracao_minima, curso.duracao_maxima = ideal, minima, maxima
+            for disc_type, start, count in zip(DISCIPLINE_LISTS, lists[::2], lists[1::2]):
+                setattr(curso, disc_type, _LazyDisciplineList(self, self._pool[start:start + count]))
+            cursos_db.append(curso)
+
+        unidades_offset, unidades_size = self._sections['unidades']
+        unidades_db = []
+        for nome_sid, start, count in UNIDADE_RECORD.iter_unpack(self._view[unidades_offset:unidades_offset + unidades_size]):
+            unidade = Unidade(self.string(nome_sid))
+            unidade.cursos = [cursos_db[i] for i in self._pool[start:start + count]]
+            unidades_db.append(unidade)
+
+        return unidades_db, cursos_db, _LazyDisciplinas(self)
+
+
+def load_snapshot(filename: str = 'usp_data.snap') -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+    """Abre um snapshot; as disciplinas são materializadas sob demanda."""
+    return SnapshotReader(filename).load()
+
+
+if __name__ == "__main__":
+    import argparse
+    from utils import load_data
+
+    parser = argparse.ArgumentParser(description='Converte um arquivo de dados JSON/JSONL em snapshot binário.')
+    parser.add_argument('origem', help='Arquivo de dados de origem (.json ou .jsonl).')
+    parser.add_argument('destino', nargs='?', help='Arquivo do snapshot (padrão: mesmo nome com extensão .snap).')
+    args = parser.parse_args()
+
+    destino = args.destino or snapshot_path_for(args.origem)
+    origem = source_of(args.origem)
+    save_snapshot(*load_data(args.origem, use_snapshot=False), destino, origem)
+    print(f"Snapshot gravado em '{destino}'.")
@@ -0,0 +1,283 @@
+"""
+Diferenças entre duas coletas (por exemplo, de semestres diferentes).
+
+Cada curso (identificado por unidade e nome) e cada disciplina (pelo código) recebe um hash
+do seu conteúdo. Registros com o mesmo hash nas duas coletas são pulados sem comparação
+campo a campo; só os demais são examinados. Todo o trabalho é proporcional ao tamanho das
+coletas: um hash por registro e buscas em dicionários.
+
+O resultado é um changelog com unidades, cursos e disciplinas adicionados e removidos,
+e, para os que mudaram, as durações, as disciplinas que entraram ou saíram de cada lista,
+as que trocaram de lista (ex.: de obrigatória para optativa eletiva) e os créditos e cargas.
+
+Uso:
+    python snapshot_diff.py usp_data_2024.json usp_data.json
+    python snapshot_diff.py antigo.db novo.json --json > mudancas.json
+"""
+import hashlib
+from typing import Dict, FrozenSet, List, NamedTuple, Tuple
+
+from data_models import Curso, Disciplina, Unidade
+
+DISCIPLINE_LISTS = ('obrigatorias', 'optativas_livres', 'optativas_eletivas')
+DISCIPLINE_FIELDS = (
+    'nome', 'creditos_aula', 'creditos_trabalho', 'carga_horaria',
+    'carga_estagio', 'carga_praticas', 'atividades_aprofundamento'
+)
+DURATION_FIELDS = ('duracao_ideal', 'duracao_minima', 'duracao_maxima')
+
+CursoKey = Tuple[str, str]
+
+
+def _digest(values) -> bytes:
+    """Hash estável de uma sequência de valores (separados por um caractere que não ocorre nos dados)."""
+    return hashlib.blake2b('\x1f'.join(map(str, values)).encode('utf-8'), digest_size=16).digest()
+
+
+def course_hash(curso: Curso) -> bytes:
+    """Hash das durações e dos códigos de cada lista de disciplinas de um curso (a ordem na grade não conta)."""
+    values = [getattr(curso, field) for field in DURATION_FIELDS]
+    for disc_type in DISCIPLINE_LISTS:
+        values.append(disc_type)
+        values.extend(sorted(d.codigo for d in getattr(curso, disc_type)))
+    return _digest(values)
+
+
+def discipline_hash(disciplina: Disciplina) -> bytes:
+    """Hash do nome, créditos e cargas de uma disciplina (os cursos que a usam entram pelos cursos)."""
+    return _digest(getattr(disciplina, field) for field in DISCIPLINE_FIELDS)
+
+
+class Fingerprints(NamedTuple):
+    """Hashes de conteúdo de uma coleta."""
+    unidades: FrozenSet[str]
+    cursos: Dict[CursoKey, Tuple[bytes, Curso]]
+    disciplinas: Dict[str, Tuple[bytes, Disciplina]]
+
+
+def fingerprints(unidades: List[Unidade], cursos: List[Curso], disciplinas: Dict[str, Disciplina]) -> Fingerprints:
+    """Calcula os hashes de uma coleta. Com cursos repetidos (mesma unidade e nome), vale o primeiro."""
+    cursos_map: Dict[CursoKey, Tuple[bytes, Curso]] = {}
+    for curso in cursos:
+        key = (curso.unidade, curso.nome)
+        if key not in cursos_map:
+            cursos_map[key] = (course_hash(curso), curso)
+    return Fingerprints(
+        frozenset(u.nome for u in unidades),
+        cursos_map,
+        {codigo: (discipline_hash(d), d) for codigo, d in disciplinas.items()},
+    )
+
+
+class MudancaCurso(NamedTuple):
+    unidade: str
+    nome: str
+    # campo -> (antes, depois)
+    duracoes: Dict[str, Tuple[int, int]]
+    # lista -> códigos que entraram/saíram do curso por aquela lista
+    adicionadas: Dict[str, List[str]]
+    removidas: Dict[str, List[str]]
+    # (código, listas antes, listas depois) das disciplinas que continuam no curso em outra lista
+    movidas: List[Tuple[str, Tuple[str, ...], Tuple[str, ...]]]
+
+
+class MudancaDisciplina(NamedTuple):
+    codigo: str
+    nome: str
+    # campo -> (antes, depois)
+    campos: Dict[str, Tuple]
+
+
+class Changelog(NamedTuple):
+    unidades_adicionadas: List[str]
+    unidades_removidas: List[str]
+    cursos_adicionados: List[CursoKey]
+    cursos_removidos: List[CursoKey]
+    cursos_alterados: List[MudancaCurso]
+    disciplinas_adicionadas: List[Tuple[str, str]]
+    disciplinas_removidas: List[Tuple[str, str]]
+    disciplinas_alteradas: List[MudancaDisciplina]
+    # Cursos e disciplinas presentes nas duas coletas com o mesmo conteúdo.
+    cursos_inalterados: int
+    disciplinas_inalteradas: int
+
+    def is_empty(self) -> bool:
+        return not any(self[:8])
+
+    def to_dict(self) -> Dict:
+        return {
+            'unidades': {'adicionadas': self.unidades_adicionadas, 'removidas': self.unidades_removidas},
+            'cursos': {
+                'adicionados': [{'unidade': u, 'nome': n} for u, n in self.cursos_adicionados],
+                'removidos': [{'unidade': u, 'nome': n} for u, n in self.cursos_removidos],
+                'alterados': [
+                    {
+                        'unidade': m.unidade, 'nome': m.nome,
+                        'duracoes': {f: list(v) for f, v in m.duracoes.items()},
+                        'adicionadas': m.adicionadas, 'removidas': m.removidas,
+                        'movidas': [{'codigo': c, 'de': list(de), 'para': list(para)} for c, de, para in m.movidas],
+                    }
+                    for m in self.cursos_alterados
+                ],
+                'inalterados': self.cursos_inalterados,
+            },
+            'disciplinas': {
+                'adicionadas': [{'codigo': c, 'nome': n} for c, n in self.disciplinas_adicionadas],
+                'removidas': [{'codigo': c, 'nome': n} for c, n in self.disciplinas_removidas],
+                'alteradas': [
+                    {'codigo': m.codigo, 'nome': m.nome, 'campos': {f: list(v) for f, v in m.campos.items()}}
+                    for m in self.disciplinas_alteradas
+                ],
+                'inalteradas': self.disciplinas_inalteradas,
+            },
+        }
+
+
+def _lists_by_code(curso: Curso) -> Dict[str, Tuple[str, ...]]:
+    """Código -> listas do curso em que a disciplina aparece."""
+    lists: Dict[str, Tuple[str, ...]] = {}
+    for disc_type in DISCIPLINE_LISTS:
+        for d in getattr(curso, disc_type):
+            current = lists.get(d.codigo, ())
+            if disc_type not in current:
+                lists[d.codigo] = current + (disc_type,)
+    return lists
+
+
+def _compare_courses(antes: Curso, depois: Curso) -> MudancaCurso:
+    duracoes = {
+        field: (getattr(antes, field), getattr(depois, field))
+        for field in DURATION_FIELDS if getattr(antes, field) != getattr(depois, field)
+    }
+    old_lists, new_lists = _lists_by_code(antes), _lists_by_code(depois)
+    adicionadas: Dict[str, List[str]] = {}
+    removidas: Dict[str, List[str]] = {}
+    movidas = []
+    for codigo, listas in new_lists.items():
+        old = old_lists.get(codigo)
+        if old is None:
+            adicionadas.setdefault(listas[0], []).append(codigo)
+        elif old != listas:
+            movidas.append((codigo, old, listas))
+    for codigo, listas in old_lists.items():
+        if codigo not in new_lists:
+            removidas.setdefault(listas[0], []).append(codigo)
+    return MudancaCurso(depois.unidade, depois.nome, duracoes, adicionadas, removidas, movidas)
+
+
+def diff_fingerprints(antes: Fingerprints, depois: Fingerprints) -> Changelog:
+    cursos_alterados, cursos_inalterados = [], 0
+    for key, (digest, curso) in depois.cursos.items():
+        previous = antes.cursos.get(key)
+        if previous is None:
+            continue
+        if previous[0] == digest:
+            cursos_inalterados += 1
+        else:
+            cursos_alterados.append(_compare_courses(previous[1], curso))
+
+    disciplinas_alteradas, disciplinas_inalteradas = [], 0
+    for codigo, (digest, disciplina) in depois.disciplinas.items():
+        previous = antes.disciplinas.get(codigo)
+        if previous is None:
+            continue
+        if previous[0] == digest:
+            disciplinas_inalteradas += 1
+            continue
+        campos = {
+            field: (getattr(previous[1], field), getattr(disciplina, field))
+            for field in DISCIPLINE_FIELDS if getattr(previous[1], field) != getattr(disciplina, field)
+        }
+        disciplinas_alteradas.append(MudancaDisciplina(codigo, disciplina.nome, campos))
+
+    return Changelog(
+        unidades_adicionadas=sorted(depois.unidades - antes.unidades),
+        unidades_removidas=sorted(antes.unidades - depois.unidades),
+        cursos_adicionados=sorted(key for key in depois.cursos if key not in antes.cursos),
+        cursos_removidos=sorted(key for key in antes.cursos if key not in depois.cursos),
+        cursos_alterados=sorted(cursos_alterados, key=lambda m: (m.unidade, m.nome)),
+        disciplinas_adicionadas=sorted(
+            (codigo, d.nome) for codigo, (_, d) in depois.disciplinas.items() if codigo not in antes.disciplinas
+        ),
+        disciplinas_removidas=sorted(
+            (codigo, d.nome) for codigo, (_, d) in antes.disciplinas.items() if codigo not in depois.disciplinas
+        ),
+        disciplinas_alteradas=sorted(disciplinas_alteradas),
+        cursos_inalterados=cursos_inalterados,
+        disciplinas_inalteradas=disciplinas_inalteradas,
+    )
+
+
+def diff_data(antes: Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]],
+              depois: Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]) -> Changelog:
+    """Compara duas coletas no formato devolvido por utils.load_data."""
+    return diff_fingerprints(fingerprints(*antes), fingerprints(*depois))
+
+
+def format_changelog(changelog: Changelog) -> str:
+    """Changelog compacto em texto: um resumo e uma linha por registro (+ novo, - removido, ~ alterado)."""
+    c = changelog
+    lines = [
+        f"Unidades: +{len(c.unidades_adicionadas)} -{len(c.unidades_removidas)}",
+        f"Cursos: +{len(c.cursos_adicionados)} -{len(c.cursos_removidos)} ~{len(c.cursos_alterados)} "
+        f"({c.cursos_inalterados} inalterados)",
+        f"Disciplinas: +{len(c.disciplinas_adicionadas)} -{len(c.disciplinas_removidas)} "
+        f"~{len(c.disciplinas_alteradas)} ({c.disciplinas_inalteradas} inalteradas)",
+    ]
+    if c.is_empty():
+        lines.append("\nNenhuma mudança.")
+        return '\n'.join(lines)
+
+    if c.unidades_adicionadas or c.unidades_removidas:
+        lines.append("\n> Unidades")
+        lines.extend(f"+ {nome}" for nome in c.unidades_adicionadas)
+        lines.extend(f"- {nome}" for nome in c.unidades_removidas)
+
+    if c.cursos_adicionados or c.cursos_removidos or c.cursos_alterados:
+        lines.append("\n> Cursos")
+        lines.extend(f"+ {nome} ({unidade})" for unidade, nome in c.cursos_adicionados)
+        lines.extend(f"- {nome} ({unidade})" for unidade, nome in c.cursos_removidos)
+        for m in c.cursos_alterados:
+            lines.append(f"~ {m.nome} ({m.unidade})")
+            for field, (old, new) in m.duracoes.items():
+                lines.append(f"    {field}: {old} -> {new}")
+            for disc_type, codigos in m.adicionadas.items():
+                lines.append(f"    + {disc_type}: {', '.join(codigos)}")
+            for disc_type, codigos in m.removidas.items():
+                lines.append(f"    - {disc_type}: {', '.join(codigos)}")
+            for codigo, old, new in m.movidas:
+                lines.append(f"    {codigo}: {'/'.join(old)} -> {'/'.join(new)}")
+
+    if c.disciplinas_adicionadas or c.disciplinas_removidas or c.disciplinas_alteradas:
+        lines.append("\n> Disciplinas")
+        lines.extend(f"+ {codigo} - {nome}" for codigo, nome in c.disciplinas_adicionadas)
+        lines.extend(f"- {codigo} - {nome}" for codigo, nome in c.disciplinas_removidas)
+        for m in c.disciplinas_alteradas:
+            changes = ', '.join(f"{field}: {old} -> {new}" for field, (old, new) in m.campos.items())
+            lines.append(f"~ {m.codigo} - {m.nome}: {changes}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+    import json
+    import sys
+    from utils import load_data
+
+    parser = argparse.ArgumentParser(description='Mostra as diferenças entre duas coletas.')
+    parser.add_argument('antes', help='Coleta anterior (.json, .jsonl, .snap, .db ou .shards).')
+    parser.add_argument('depois', help='Coleta nova, em qualquer um dos mesmos formatos.')
+    parser.add_argument('--json', action='store_true', help='Escreve o changelog em JSON em vez de texto.')
+    args = parser.parse_args()
+
+    # As mensagens de carga vão para stderr, para não se misturarem ao changelog.
+    with contextlib.redirect_stdout(sys.stderr):
+        antes = load_data(args.antes, use_snapshot=False)
+        depois = load_data(args.depois, use_snapshot=False)
+    changelog = diff_data(antes, depois)
+    if args.json:
+        json.dump(changelog.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print(format_changelog(changelog))
@@ -0,0 +1,263 @@
+"""
+Armazenamento dos dados em SQLite, com tabelas para unidades, cursos, disciplinas e a
+relação curso-disciplina por categoria.
+
+Cada coleta fica registrada na tabela `coletas`, de modo que o histórico de várias
+coletas pode ser mantido no mesmo arquivo; as consultas usam a coleta mais recente.
+"""
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from data_models import Unidade, Curso, Disciplina
+
+DISCIPLINE_LISTS = ('obrigatorias', 'optativas_livres', 'optativas_eletivas')
+DISCIPLINE_FIELDS = (
+    'creditos_aula', 'creditos_trabalho', 'carga_horaria',
+    'carga_estagio', 'carga_praticas', 'atividades_aprofundamento'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS coletas (
+    id INTEGER PRIMARY KEY,
+    iniciada_em REAL NOT NULL,
+    concluida INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS unidades (
+    id INTEGER PRIMARY KEY,
+    coleta_id INTEGER NOT NULL REFERENCES coletas(id),
+    nome TEXT NOT NULL,
+    nome_lower TEXT NOT NULL,
+    sigla_lower TEXT
+);
+CREATE TABLE IF NOT EXISTS cursos (
+    id INTEGER PRIMARY KEY,
+    coleta_id INTEGER NOT NULL REFERENCES coletas(id),
+    unidade_id INTEGER NOT NULL REFERENCES unidades(id) ON DELETE CASCADE,
+    nome TEXT NOT NULL,
+    nome_lower TEXT NOT NULL,
+    unidade TEXT NOT NULL,
+    duracao_ideal INTEGER NOT NULL DEFAULT 0,
+    duracao_minima INTEGER NOT NULL DEFAULT 0,
+    duracao_maxima INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS disciplinas (
+    id INTEGER PRIMARY KEY,
+    coleta_id INTEGER NOT NULL REFERENCES coletas(id),
+    codigo TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    nome_lower TEXT NOT NULL,
+    creditos_aula INTEGER NOT NULL DEFAULT 0,
+    creditos_trabalho INTEGER NOT NULL DEFAULT 0,
+    carga_horaria INTEGER NOT NULL DEFAULT 0,
+    carga_estagio INTEGER NOT NULL DEFAULT 0,
+    carga_praticas INTEGER NOT NULL DEFAULT 0,
+    atividades_aprofundamento INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (coleta_id, codigo)
+);
+CREATE TABLE IF NOT EXISTS curso_disciplina (
+    curso_id INTEGER NOT NULL REFERENCES cursos(id) ON DELETE CASCADE,
+    disciplina_id INTEGER NOT NULL REFERENCES disciplinas(id),
+    categoria TEXT NOT NULL,
+    posicao INTEGER NOT NULL,
+    PRIMARY KEY (curso_id, categoria, posicao)
+);
+CREATE INDEX IF NOT EXISTS idx_unidades_sigla ON unidades (coleta_id, sigla_lower);
+CREATE INDEX IF NOT EXISTS idx_unidades_nome ON unidades (coleta_id, nome_lower);
+CREATE INDEX IF NOT EXISTS idx_cursos_unidade ON cursos (unidade_id, nome);
+CREATE INDEX IF NOT EXISTS idx_cursos_nome ON cursos (coleta_id, nome);
+CREATE INDEX IF NOT EXISTS idx_disciplinas_nome ON disciplinas (coleta_id, nome_lower);
+CREATE INDEX IF NOT EXISTS idx_curso_disciplina_disciplina ON curso_disciplina (disciplina_id);
+"""
+
+SIGLA_PATTERN = re.compile(r'\(\s*([^()]*?)\s*\)\s*$')
+
+def parse_sigla(nome: str) -> Optional[str]:
+    """Extrai a sigla do sufixo '( SIGLA )' do nome de uma unidade."""
+    match = SIGLA_PATTERN.search(nome)
+    return match.group(1) if match else None
+
+
+class SQLiteStore:
+    """Leitura e escrita dos dados em um banco SQLite."""
+
+    def __init__(self, filename: str = 'usp_data.db'):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.coleta_id: Optional[int] = None
+        self._disciplina_ids: Dict[str, int] = {}
+
+    def close(self):
+        self.conn.close()
+
+    # --- Escrita ---
+
+    def begin_coleta(self, resume: bool = False) -> int:
+        """Inicia uma nova coleta ou, com `resume`, continua a última que não foi concluída."""
+        row = self.conn.execute('SELECT id, concluida FROM coletas ORDER BY id DESC LIMIT 1').fetchone()
+        if resume and row and not row[1]:
+            self.coleta_id = row[0]
+            self._disciplina_ids = dict(self.conn.execute(
+                'SELECT codigo, id FROM disciplinas WHERE coleta_id = ?', (self.coleta_id,)
+            ))
+        else:
+            with self.conn:
+                self.coleta_id = self.conn.execute('INSERT INTO coletas (iniciada_em) VALUES (?)', (time.time(),)).lastrowid
+            self._disciplina_ids = {}
+        return self.coleta_id
+
+    def finish_coleta(self):
+        with self._lock, self.conn:
+            self.conn.execute('UPDATE coletas SET concluida = 1 WHERE id = ?', (self.coleta_id,))
+
+    def _upsert_disciplinas(self, disciplinas: Iterable[Disciplina]):
+        self.conn.executemany(
+            f"""INSERT INTO disciplinas (coleta_id, codigo, nome, nome_lower, {', '.join(DISCIPLINE_FIELDS)})
+                VALUES (?, ?, ?, ?, {', '.join('?' * len(DISCIPLINE_FIELDS))})
+                ON CONFLICT (coleta_id, codigo) DO UPDATE SET
+                {', '.join(f'{f} = excluded.{f}' for f in DISCIPLINE_FIELDS)}""",
+            [(self.coleta_id, d.codigo, d.nome, d.nome.lower(), *(getattr(d, f) for f in DISCIPLINE_FIELDS))
+             for d in disciplinas]
+        )
+        missing = [d.codigo for d in disciplinas if d.codigo not in self._disciplina_ids]
+        for i in range(0, len(missing), 500):
+            batch = missing[i:i + 500]
+            self._disciplina_ids.update(self.conn.execute(
+                f"SELECT codigo, id FROM disciplinas WHERE coleta_id = ? AND codigo IN ({', '.join('?' * len(batch))})",
+                (self.coleta_id, *batch)
+            ))
+
+    def write_unit(self, unidade: Unidade):
+        """
+        Grava uma unidade com seus cursos e disciplinas em uma única transação. Se a
+        unidade já existir nesta coleta (por exemplo, ao retomar), ela é substituída.
+        """
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM unidades WHERE coleta_id = ? AND nome = ?', (self.coleta_id, unidade.nome))
+            unidade_id = self.conn.execute(
+                'INSERT INTO unidades (coleta_id, nome, nome_lower, sigla_lower) VALUES (?, ?, ?, ?)',
+                (self.coleta_id, unidade.nome, unidade.nome.lower(), (parse_sigla(unidade.nome) or '').lower() or None)
+            ).lastrowid
+
+            disciplinas = {}
+            for curso in unidade.cursos:
+                for disc_type in DISCIPLINE_LISTS:
+                    for d in getattr(curso, disc_type):
+                        disciplinas[d.codigo] = d
+            self._upsert_disciplinas(list(disciplinas.values()))
+
+            relations = []
+            for curso in unidade.cursos:
+                curso_id = self.conn.execute(
+                    """INSERT INTO cursos (coleta_id, unidade_id, nome, nome_lower, unidade,
+                                           duracao_ideal, duracao_minima, duracao_maxima)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (self.coleta_id, unidade_id, curso.nome, curso.nome.lower(), curso.unidade,
+                     curso.duracao_ideal, curso.duracao_minima, curso.duracao_maxima)
+                ).lastrowid
+                for disc_type in DISCIPLINE_LISTS:
+                    relations.extend(
+                        (curso_id, self._disciplina_ids[d.codigo], disc_type, posicao)
+                        for posicao, d in enumerate(getattr(curso, disc_type))
+                    )
+            self.conn.executemany(
+                'INSERT INTO curso_disciplina (curso_id, disciplina_id, categoria, posicao) VALUES (?, ?, ?, ?)',
+                relations
+            )
+
+    def import_data(self, unidades: List[Unidade], cursos: List[Curso], disciplinas: Dict[str, Disciplina]):
+        """Grava um conjunto de dados já carregado como uma nova coleta concluída."""
+        self.begin_coleta()
+        with self._lock, self.conn:
+            self._upsert_disciplinas(list(disciplinas.values()))
+        for unidade in unidades:
+            self.write_unit(unidade)
+        self.finish_coleta()
+
+    # --- Leitura ---
+
+    def current_coleta(self) -> Optional[int]:
+        """A coleta consultada: a última concluída ou, se nenhuma foi, a última iniciada."""
+        row = self.conn.execute(
+            'SELECT id FROM coletas ORDER BY concluida DESC, id DESC LIMIT 1'
+        ).fetchone()
+        return row[0] if row else None
+
+    def _disciplina_from_row(self, row) -> Disciplina:
+        _, codigo, nome, *values = row
+        disciplina = Disciplina(codigo, nome)
+        for field, value in zip(DISCIPLINE_FIELDS, values):
+            setattr(disciplina, field, value)
+        return disciplina
+
+    def load(self, coleta_id: int = None) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+        """Carrega toda uma coleta em memória, como os demais formatos de arquivo."""
+        coleta_id = coleta_id or self.current_coleta()
+        if coleta_id is None:
+            return [], [], {}
+
+        disciplinas_db: Dict[str, Disciplina] = {}
+        by_id: Dict[int, Disciplina] = {}
+        for row in self.conn.execute(
+            f"SELECT id, codigo, nome, {', '.join(DISCIPLINE_FIELDS)} FROM disciplinas WHERE coleta_id = ? ORDER BY id",
+            (coleta_id,)
+        ):
+            disciplina = self._disciplina_from_row(row)
+            disciplinas_db[disciplina.codigo] = by_id[row[0]] = disciplina
+
+        cursos_by_id: Dict[int, Curso] = {}
+        unidades_by_id: Dict[int, Unidade] = {}
+        unidades_db, cursos_db = [], []
+        for unidade_id, nome in self.conn.execute(
+            'SELECT id, nome FROM unidades WHERE coleta_id = ? ORDER BY id', (coleta_id,)
+        ):
+            unidades_by_id[unidade_id] = Unidade(nome)
+            unidades_db.append(unidades_by_id[unidade_id])
+        for row in self.conn.execute(
+            """SELECT id, unidade_id, nome, unidade, duracao_ideal, duracao_minima, duracao_maxima
+               FROM cursos WHERE coleta_id = ? ORDER BY id""", (coleta_id,)
+        ):
+            curso = Curso(row[2], row[3])
+            curso.duracao_ideal, curso.duracao_minima, curso.duracao_maxima = row[4:]
+            cursos_by_id[row[0]] = curso
+            unidades_by_id[row[1]].cursos.append(curso)
+            cursos_db.append(curso)
+
+        for curso_id, disciplina_id, categoria in self.conn.execute(
+            """SELECT cd.curso_id, cd.disciplina_id, cd.categoria FROM curso_disciplina cd
+               JOIN cursos c ON c.id = cd.curso_id WHERE c.coleta_id = ?
+               ORDER BY cd.curso_id, cd.categoria, cd.posicao""", (coleta_id,)
+        ):
+            curso = cursos_by_id[curso_id]
+            disciplina = by_id[disciplina_id]
+            getattr(curso, categoria).append(disciplina)
+            disciplina.cursos.add(curso.nome)
+
+        return unidades_db, cursos_db, disciplinas_db
+
+
+def load_data_from_sqlite(filename: str = 'usp_data.db') -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+    store = SQLiteStore(filename)
+    try:
+        return store.load()
+    finally:
+        store.close()
+
+
+def save_data_to_sqlite(
+    unidades: List[Unidade],
+    cursos: List[Curso],
+    disciplinas: Dict[str, Disciplina],
+    filename: str = 'usp_data.db'
+):
+    store = SQLiteStore(filename)
+    try:
+        store.import_data(unidades, cursos, disciplinas)
+    finally:
+        store.close()
@@ -0,0 +1,171 @@
+"""
+Estatísticas do menu (comando STATS), calculadas uma vez e mantidas ao acrescentar unidades.
+
+Os máximos são guardados como o melhor candidato visto até agora e as disciplinas mais
+comuns ficam em um heap, de modo que cada consulta custa O(k log n) no pior caso. As
+colunas de créditos e carga horária das disciplinas ficam em arrays contíguos e as
+distribuições por unidade são calculadas com NumPy sobre os índices das disciplinas.
+"""
+import heapq
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from data_models import Unidade, Curso, Disciplina
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DISCIPLINE_LISTS = ('obrigatorias', 'optativas_livres', 'optativas_eletivas')
+DURATION_FIELDS = ('duracao_ideal', 'duracao_minima', 'duracao_maxima')
+
+
+class Resumo(NamedTuple):
+    """Média, mínimo e máximo de uma coluna."""
+    media: float
+    minimo: int
+    maximo: int
+
+
+class DistribuicaoUnidade(NamedTuple):
+    """Créditos-aula e carga horária das disciplinas (distintas) oferecidas por uma unidade."""
+    unidade: str
+    num_disciplinas: int
+    creditos_aula: Resumo
+    carga_horaria: Resumo
+
+
+def _resumo(values: 'np.ndarray') -> Resumo:
+    return Resumo(float(values.mean()), int(values.min()), int(values.max()))
+
+
+class StatsEngine:
+    """
+    Agregados sobre unidades, cursos e disciplinas, atualizados a cada `add_unidade`.
+
+    `ordem` dá a posição de cada disciplina na ordem original, usada para desempatar as
+    mais comuns; sem ela vale a ordem em que a disciplina foi vista pela primeira vez (a de
+    `disciplinas`). Quem monta a engine unidade a unidade, em outra ordem, deve passá-la
+    para obter o mesmo resultado da montagem completa.
+    """
+
+    def __init__(self, unidades: Iterable[Unidade], cursos: Iterable[Curso], disciplinas: Dict[str, Disciplina],
+                 ordem: Optional[Callable[[Disciplina], int]] = None):
+        self._ordem = ordem
+        self._disciplinas: List[Disciplina] = list(disciplinas.values())
+        self._disc_index: Dict[str, int] = {d.codigo: i for i, d in enumerate(self._disciplinas)}
+        self._disc_order = array('q', [
+            ordem(d) if ordem else i for i, d in enumerate(self._disciplinas)
+        ])
+        self._disc_counts = array('q', [len(d.cursos) for d in self._disciplinas])
+        self._creditos_aula = array('q', [d.creditos_aula for d in self._disciplinas])
+        self._carga_horaria = array('q', [d.carga_horaria for d in self._disciplinas])
+        # Entradas (-nº de cursos, posição na ordem original, índice).
+        self._disc_heap: List[Tuple[int, int, int]] = [
+            (-count, self._disc_order[i], i) for i, count in enumerate(self._disc_counts)
+        ]
+        heapq.heapify(self._disc_heap)
+
+        # Melhor candidato de cada máximo, com o mesmo desempate do menu (nome, ordem de chegada).
+        self._best_unidade: Optional[Tuple[tuple, Unidade]] = None
+        self._best_curso: Optional[Tuple[tuple, Curso]] = None
+        self._seq = 0
+
+        self._duracoes: Dict[str, Counter] = {field: Counter() for field in DURATION_FIELDS}
+        self._distribuicoes: Dict[str, DistribuicaoUnidade] = {}
+
+        for curso in cursos:
+            self._track_curso(curso)
+        for unidade in unidades:
+            self._track_unidade(unidade)
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _track_disciplina(self, disciplina: Disciplina) -> int:
+        index = self._disc_index.get(disciplina.codigo)
+        if index is None:
+            index = len(self._disciplinas)
+            self._disc_index[disciplina.codigo] = index
+            self._disciplinas.append(disciplina)
+            self._disc_order.append(self._ordem(disciplina) if self._ordem else index)
+            self._disc_counts.append(len(disciplina.cursos))
+            self._creditos_aula.append(disciplina.creditos_aula)
+            self._carga_horaria.append(disciplina.carga_horaria)
+            heapq.heappush(self._disc_heap, (-self._disc_counts[index], self._disc_order[index], index))
+        elif self._disc_counts[index] != len(disciplina.cursos):
+            # A entrada antiga fica no heap e é descartada quando aparecer no topo.
+            self._disc_counts[index] = len(disciplina.cursos)
+            heapq.heappush(self._disc_heap, (-self._disc_counts[index], self._disc_order[index], index))
+        return index
+
+    def _track_curso(self, curso: Curso):
+        key = (-len(curso.obrigatorias), curso.nome, self._next_seq())
+        if self._best_curso is None or key < self._best_curso[0]:
+            self._best_curso = (key, curso)
+        for field in DURATION_FIELDS:
+            self._duracoes[field][getattr(curso, field)] += 1
+
+    def _track_unidade(self, unidade: Unidade):
+        key = (-len(unidade.cursos), unidade.nome, self._next_seq())
+        if self._best_unidade is None or key < self._best_unidade[0]:
+            self._best_unidade = (key, unidade)
+
+        indices = {
+            self._disc_index[d.codigo]
+            for curso in unidade.cursos
+            for disc_type in DISCIPLINE_LISTS
+            for d in getattr(curso, disc_type)
+            if d.codigo in self._disc_index
+        }
+        if indices:
+            # Importado aqui, e não no topo, para não atrasar a abertura do menu.
+            import numpy as np
+
+            ids = np.fromiter(indices, dtype=np.intp, count=len(indices))
+            self._distribuicoes[unidade.nome] = DistribuicaoUnidade(
+                unidade.nome, len(ids),
+                _resumo(np.frombuffer(self._creditos_aula, dtype=np.int64)[ids]),
+                _resumo(np.frombuffer(self._carga_horaria, dtype=np.int64)[ids]),
+            )
+
+    def add_unidade(self, unidade: Unidade):
+        """Incorpora uma unidade nova (com seus cursos e disciplinas) aos agregados."""
+        for curso in unidade.cursos:
+            for disc_type in DISCIPLINE_LISTS:
+                for disciplina in getattr(curso, disc_type):
+                    self._track_disciplina(disciplina)
+            self._track_curso(curso)
+        self._track_unidade(unidade)
+
+    def unit_with_most_courses(self) -> Tuple[Optional[Unidade], int]:
+        if self._best_unidade is None:
+            return None, 0
+        return self._best_unidade[1], -self._best_unidade[0][0]
+
+    def course_with_most_mandatory(self) -> Tuple[Optional[Curso], int]:
+        if self._best_curso is None:
+            return None, 0
+        return self._best_curso[1], -self._best_curso[0][0]
+
+    def top_disciplines(self, k: int) -> List[Tuple[Disciplina, int]]:
+        """As `k` disciplinas usadas em mais cursos (empates na ordem original)."""
+        found, valid = [], []
+        while self._disc_heap and len(found) < k:
+            entry = heapq.heappop(self._disc_heap)
+            count, index = -entry[0], entry[2]
+            if count != self._disc_counts[index]:
+                continue
+            valid.append(entry)
+            found.append((self._disciplinas[index], count))
+        for entry in valid:
+            heapq.heappush(self._disc_heap, entry)
+        return found
+
+    def unit_distributions(self) -> List[DistribuicaoUnidade]:
+        return [self._distribuicoes[nome] for nome in sorted(self._distribuicoes)]
+
+    def duration_histograms(self) -> Dict[str, List[Tuple[int, int]]]:
+        """Para cada campo de duração, pares (semestres, número de cursos) em ordem crescente."""
+        return {field: sorted(counter.items()) for field, counter in self._duracoes.items()}
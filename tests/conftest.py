@@ -0,0 +1,208 @@
+"""
+Configuração compartilhada pelos testes: os módulos do projeto ficam na raiz do repositório.
+
+Os testes de coleta rodam contra um Júpiter Web simulado (fake_jupiterweb.py), servindo
+localmente um formulário e páginas de grade geradas para o teste. O backend http é
+exercitado pelo main.py, com --base-url apontando para o servidor local. O backend selenium
+depende dos scripts do formulário real (abas, seleção de curso por AJAX), que as páginas
+estáticas não têm; ele roda com uma sessão simulada que busca as mesmas páginas no servidor
+local e entrega o HTML ao coletor. Todos os caminhos precisam gravar exatamente o mesmo
+usp_data.json que a coleta de referência.
+"""
+import contextlib
+import io
+import os
+import random
+import subprocess
+import sys
+import threading
+import urllib.request
+from urllib.parse import urlencode, urljoin
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+from checkpoint import CheckpointJournal
+from fake_jupiterweb import serve
+from http_scraper import USPHttpCollector
+from page_cache import PageCache
+from scraper import USPDataCollector
+from utils import save_data_to_json
+
+UNIDADES = [
+    ('86', 'Escola de Artes, Ciências e Humanidades - ( EACH )', 3),
+    ('45', 'Instituto de Matemática e Estatística - ( IME )', 4),
+    ('3', 'Escola Politécnica - ( EP )', 2),
+]
+SECTION_HEADER = '<tr style="background-color: rgb(16, 148, 171);"><td colspan="8">Disciplinas {}</td></tr>'
+PERIOD_ROW = '<tr style="color: rgb(235, 143, 0);"><td colspan="8">{}º Período Ideal</td></tr>'
+DISCIPLINE_ROW = '<tr><td><a class="disciplina" href="#">{}</a></td><td>{}</td>' + '<td>{}</td>' * 6 + '</tr>'
+
+
+def _options(select_id: str, options) -> str:
+    items = ''.join(f'<option value="{value}">{text}</option>' for value, text in options)
+    return f'<select id="{select_id}"><option value=""></option>{items}</select>'
+
+
+def _grade_page(rng: random.Random, nome: str, disciplinas) -> str:
+    ideal = rng.choice([8, 10])
+    rows = []
+    for section in ('Obrigatórias', 'Optativas Livres', 'Optativas Eletivas'):
+        rows.append(SECTION_HEADER.format(section))
+        for period in range(1, 3):
+            rows.append(PERIOD_ROW.format(period))
+            for codigo, nome_disc, valores in rng.sample(disciplinas, 4):
+                rows.append(DISCIPLINE_ROW.format(codigo, nome_disc, *valores))
+    return (
+        '<html><head><title>Júpiter Web</title></head><body>'
+        f'<div id="step4"><span class="curso">{nome}</span><span class="duridlhab">{ideal}</span>'
+        f'<span class="durminhab">{ideal}</span><span class="durmaxhab">{ideal + 6}</span></div>'
+        f'<div id="gradeCurricular"><table>{"".join(rows)}</table></div></body></html>'
+    )
+
+
+def write_site(directory: str, seed: int = 7):
+    """Gera as páginas do formulário, das listas de cursos e das grades."""
+    rng = random.Random(seed)
+    # Um conjunto pequeno de disciplinas, para que muitas sejam compartilhadas entre cursos.
+    disciplinas = [
+        (f"MAC{n:04d}", f"Disciplina {n}", [rng.choice([2, 4]), rng.choice([0, 1]), rng.choice([30, 60]), '', '', ''])
+        for n in range(40)
+    ]
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'jupCarreira.html'), 'w', encoding='utf-8') as f:
+        f.write('<html><body>' + _options('comboUnidade', [(codigo, nome) for codigo, nome, _ in UNIDADES]) + '</body></html>')
+    for codigo, _, num_cursos in UNIDADES:
+        cursos = [(f"{codigo}{n:03d}", f"Curso {codigo}.{n} - integral") for n in range(num_cursos)]
+        with open(os.path.join(directory, f"cursos_{codigo}.html"), 'w', encoding='utf-8') as f:
+            f.write(_options('comboCurso', cursos))
+        for codcur, nome in cursos:
+            with open(os.path.join(directory, f"grade_{codigo}_{codcur}.html"), 'w', encoding='utf-8') as f:
+                f.write(_grade_page(rng, nome, disciplinas))
+
+
+@pytest.fixture(scope='session')
+def site(tmp_path_factory):
+    """Pasta das páginas e URL do formulário no servidor local."""
+    pages = str(tmp_path_factory.mktemp('paginas'))
+    write_site(pages)
+    server = serve(pages, 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield pages, f"http://127.0.0.1:{server.server_address[1]}/jupiterweb/jupCarreira.jsp"
+    server.shutdown()
+    server.server_close()
+
+
+def run_main(directory, *args: str):
+    """Executa o main.py em modo lote (sem comandos), para que ele não abra o menu."""
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'main.py'), *args, '--batch', os.devnull],
+        cwd=directory, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stderr
+
+
+def read(path) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture(scope='session')
+def reference(site, tmp_path_factory):
+    """usp_data.json de uma coleta completa pelo backend http."""
+    directory = tmp_path_factory.mktemp('referencia')
+    run_main(directory, '--force-scrape', '--backend', 'http', '--base-url', site[1])
+    return read(directory / 'usp_data.json')
+
+
+class SimulatedSession:
+    """O pouco da interface do WebDriver que sobra depois dos métodos substituídos abaixo."""
+    page_source = ''
+
+    def get(self, url: str):
+        pass
+
+    def find_element(self, by: str, value: str):
+        # Depois de uma falha o coletor volta ao formulário e espera o <select> das unidades.
+        return object()
+
+    def quit(self):
+        pass
+
+
+class SimulatedBrowserCollector(USPDataCollector):
+    """
+    Backend selenium com a navegação trocada por requisições ao servidor local: as mesmas
+    rotas que o formulário chama, com o HTML resultante exposto em `page_source`.
+    """
+
+    def _setup_driver(self):
+        return SimulatedSession()
+
+    def _get(self, endpoint: str, **params) -> str:
+        url = urljoin(self.base_url, endpoint) + ('?' + urlencode(params) if params else '')
+        with urllib.request.urlopen(url) as response:
+            return response.read().decode('utf-8')
+
+    def _open_search_form(self):
+        self._form = self._get('')
+
+    def _read_options(self, select_id: str):
+        html = self._form if select_id == 'comboUnidade' else self._cursos
+        select = BeautifulSoup(html, 'html.parser').find('select', id=select_id)
+        return [{'codigo': opt['value'], 'nome': opt.get_text().strip()} for opt in select.find_all('option') if opt['value']]
+
+    def _select_unit(self, unit_code: str):
+        self._unit_code = unit_code
+        self._cursos = self._get(USPHttpCollector.CURSOS_ENDPOINT, codcg=unit_code)
+        return self._read_options('comboCurso')
+
+    def _navigate_to_curriculum(self, course_code: str):
+        self.driver.page_source = self._get(USPHttpCollector.GRADE_ENDPOINT, codcg=self._unit_code, codcur=course_code)
+
+    def _return_to_search_form(self, unit_code: str):
+        pass
+
+    def _curriculum_hash(self) -> str:
+        return self._content_hash(self.driver.page_source)
+
+
+def collect_selenium(site, directory, resume: bool = False, incremental: bool = False,
+                     collector_class=None, **options) -> bytes:
+    """
+    Coleta pelo backend selenium simulado, com o mesmo journal e cache de páginas do main.py.
+    `options` vai para o construtor do coletor (workers, parse_workers).
+    """
+    data_file = os.path.join(directory, 'usp_data.json')
+    journal = CheckpointJournal(os.path.join(directory, 'usp_data.checkpoint.jsonl'),
+                                resume=resume, incremental=incremental, modo='selenium-html')
+    page_cache = PageCache(os.path.join(directory, 'usp_data.pages'))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            collector = (collector_class or SimulatedBrowserCollector)(
+                base_url=site[1], journal=journal, extraction='html', page_cache=page_cache, **options
+            )
+            save_data_to_json(*collector.collect_data(), data_file)
+        journal.finish()
+    finally:
+        journal.close()
+        page_cache.close()
+    return read(data_file)
+
+
+@contextlib.contextmanager
+def missing_page(site, name: str):
+    """Tira uma página do servidor durante o bloco, simulando uma falha no meio da coleta."""
+    path = os.path.join(site[0], name)
+    os.rename(path, path + '.fora')
+    try:
+        yield
+    finally:
+        os.rename(path + '.fora', path)
@@ -0,0 +1,97 @@
+"""Gravação e leitura dos dados em cada formato de armazenamento."""
+import contextlib
+import io
+import json
+import os
+
+import pytest
+
+from conftest import read
+
+from menu import MenuHandler, ShardedMenuHandler, SQLiteMenuHandler
+from shard_store import ShardStore, save_data_to_shards
+from sqlite_store import SQLiteStore
+from utils import load_data, save_data, save_data_to_json
+
+COMANDOS = ['U', 'U IME', 'C', 'C EACH 1', 'C IME 2', 'DC EP 1', 'D MAC0003', 'D Disciplina 7', 'D COMUM',
+            'BUSCAR C curso 45', 'BUSCAR D disciplina 1', 'FILTRAR D creditos_aula>2', 'STATS']
+
+
+def round_trip(reference: bytes, directory, target: str, **options) -> bytes:
+    """Grava a referência em `target` e a lê de volta, devolvendo o JSON regravado."""
+    source = directory / 'usp_data.json'
+    source.write_bytes(reference)
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_data(*load_data(str(source), use_snapshot=False), str(directory / target), **options)
+        save_data_to_json(*load_data(str(directory / target), use_snapshot=False), str(directory / 'volta.json'))
+    return read(directory / 'volta.json')
+
+
+@pytest.mark.parametrize('extension', ['json', 'jsonl', 'snap', 'db', 'shards'])
+def test_storage_round_trip(reference, tmp_path, extension):
+    """Gravar em cada formato e ler de volta reproduz o JSON original."""
+    assert round_trip(reference, tmp_path, f"copia.{extension}") == reference
+
+
+def menu_output(menu: MenuHandler) -> str:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        for comando in COMANDOS:
+            menu.execute(comando)
+    return output.getvalue()
+
+
+def reference_menu(reference, directory) -> MenuHandler:
+    source = directory / 'usp_data.json'
+    source.write_bytes(reference)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return MenuHandler(*load_data(str(source), use_snapshot=False))
+
+
+def test_sqlite_menu_matches_memory_menu(reference, tmp_path):
+    menu = reference_menu(reference, tmp_path)
+    store = SQLiteStore(str(tmp_path / 'usp_data.db'))
+    store.import_data(menu.unidades_list, menu.cursos_list, menu.disciplinas_db)
+    assert menu_output(SQLiteMenuHandler(store)) == menu_output(menu)
+
+
+def test_compact_json(reference, tmp_path):
+    """O JSON compacto não tem espaços entre os itens e é lido de volta igual ao original."""
+    assert round_trip(reference, tmp_path, 'compacto.json', compact=True) == reference
+    expected = json.dumps(json.loads(reference), ensure_ascii=False, separators=(',', ':'))
+    assert read(tmp_path / 'compacto.json') == expected.encode('utf-8')
+
+
+def test_sharded_menu_matches_memory_menu(reference, tmp_path):
+    menu = reference_menu(reference, tmp_path)
+    directory = str(tmp_path / 'usp_data.shards')
+    save_data_to_shards(menu.unidades_list, menu.cursos_list, menu.disciplinas_db, directory)
+    assert menu_output(ShardedMenuHandler(ShardStore(directory))) == menu_output(menu)
+
+
+def test_snapshot_follows_its_source(reference, tmp_path):
+    """O snapshot gravado ao salvar é usado até o JSON mudar; a leitura não cria arquivos."""
+    source = str(tmp_path / 'usp_data.json')
+    origem = tmp_path / 'origem.json'
+    origem.write_bytes(reference)
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_data(*load_data(str(origem), use_snapshot=False), source)
+    assert os.path.exists(tmp_path / 'usp_data.snap')
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        save_data_to_json(*load_data(source), str(tmp_path / 'volta.json'))
+    assert 'Carregando snapshot' in output.getvalue()
+    assert read(tmp_path / 'volta.json') == reference
+
+    with open(source, 'ab') as f:
+        f.write(b'\n')
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        load_data(source)
+    assert 'Carregando snapshot' not in output.getvalue()
+
+    os.remove(tmp_path / 'usp_data.snap')
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_data(source)
+    assert not os.path.exists(tmp_path / 'usp_data.snap')
@@ -0,0 +1,56 @@
+"""Retomada (--resume) e coleta incremental (--incremental) pelo journal de checkpoint."""
+import os
+import shutil
+import threading
+
+from conftest import collect_selenium, missing_page, read, run_main
+
+from fake_jupiterweb import serve
+
+
+def test_http_resume_matches_full_run(site, reference, tmp_path):
+    with missing_page(site, 'grade_45_45002.html'):
+        run_main(tmp_path, '--force-scrape', '--backend', 'http', '--base-url', site[1])
+    assert read(tmp_path / 'usp_data.json') != reference
+    run_main(tmp_path, '--resume', '--backend', 'http', '--base-url', site[1])
+    assert read(tmp_path / 'usp_data.json') == reference
+
+
+def test_selenium_resume_matches_full_run(site, reference, tmp_path):
+    with missing_page(site, 'grade_45_45002.html'):
+        assert collect_selenium(site, tmp_path) != reference
+    assert collect_selenium(site, tmp_path, resume=True) == reference
+
+
+def test_http_incremental_matches_full_run(site, reference, tmp_path):
+    run_main(tmp_path, '--force-scrape', '--backend', 'http', '--base-url', site[1])
+    os.remove(tmp_path / 'usp_data.json')
+    run_main(tmp_path, '--incremental', '--backend', 'http', '--base-url', site[1])
+    assert read(tmp_path / 'usp_data.json') == reference
+
+
+def test_incremental_picks_up_changed_course(site, tmp_path):
+    """Com uma grade alterada, a coleta incremental grava o mesmo que uma coleta completa."""
+    changed = tmp_path / 'paginas'
+    shutil.copytree(site[0], changed)
+    grade = changed / 'grade_86_86001.html'
+    grade.write_text(grade.read_text(encoding='utf-8').replace('MAC00', 'MAC99'), encoding='utf-8')
+    server = serve(str(changed), 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    changed_url = f"http://127.0.0.1:{server.server_address[1]}/jupiterweb/jupCarreira.jsp"
+    try:
+        run_main(tmp_path, '--force-scrape', '--backend', 'http', '--base-url', site[1])
+        run_main(tmp_path, '--incremental', '--backend', 'http', '--base-url', changed_url)
+        full = tmp_path / 'completa'
+        full.mkdir()
+        run_main(full, '--force-scrape', '--backend', 'http', '--base-url', changed_url)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert b'MAC99' in read(full / 'usp_data.json')
+    assert read(tmp_path / 'usp_data.json') == read(full / 'usp_data.json')
+
+
+def test_selenium_incremental_matches_full_run(site, reference, tmp_path):
+    collect_selenium(site, tmp_path)
+    assert collect_selenium(site, tmp_path, incremental=True) == reference
@@ -0,0 +1,15 @@
+"""Backend http (--backend http): requisições diretas ao Júpiter Web, sem navegador."""
+import pytest
+
+from conftest import collect_selenium, read, run_main
+
+
+def test_selenium_backend_matches_http(site, reference, tmp_path):
+    assert collect_selenium(site, tmp_path) == reference
+
+
+@pytest.mark.parametrize('concurrency', ['1', '3'])
+def test_concurrency_does_not_change_result(site, reference, tmp_path, concurrency):
+    run_main(tmp_path, '--force-scrape', '--backend', 'http', '--base-url', site[1],
+             '--concurrency', concurrency, '--rate-limit', '200')
+    assert read(tmp_path / 'usp_data.json') == reference
@@ -0,0 +1,54 @@
+"""Coleta com várias sessões do navegador (--workers), inclusive quando uma delas cai."""
+import json
+
+from selenium.common.exceptions import WebDriverException
+
+from conftest import UNIDADES, SimulatedBrowserCollector, SimulatedSession, collect_selenium
+
+
+class FragileSession(SimulatedSession):
+    """Sessão que deixa de responder depois de `encerrar()`, como um navegador que travou."""
+    encerrada = False
+
+    def encerrar(self):
+        self.encerrada = True
+
+    def get(self, url: str):
+        if self.encerrada:
+            raise WebDriverException('sessão encerrada')
+
+
+class FragileBrowserCollector(SimulatedBrowserCollector):
+    """Perde a sessão na primeira vez que abre uma grade de cada unidade de `falhas`."""
+    falhas = set()
+    falharam = set()
+
+    def _setup_driver(self):
+        return FragileSession()
+
+    def _navigate_to_curriculum(self, course_code: str):
+        if self._unit_code in self.falhas and self._unit_code not in self.falharam and course_code.endswith('001'):
+            self.falharam.add(self._unit_code)
+            self.driver.encerrar()
+            raise WebDriverException('o navegador parou de responder')
+        super()._navigate_to_curriculum(course_code)
+
+
+def test_reference_has_all_courses(reference):
+    data = json.loads(reference)
+    unidades = {u['nome']: u['cursos'] for u in data['unidades']}
+    for codigo, nome, num_cursos in UNIDADES:
+        assert unidades[nome] == [f"Curso {codigo}.{n} - integral" for n in range(num_cursos)]
+    assert all(len(c['obrigatorias']) == 8 for c in data['cursos'])
+
+
+def test_parallel_sessions_match_reference(site, reference, tmp_path):
+    assert collect_selenium(site, tmp_path, workers=3) == reference
+
+
+def test_unit_of_a_failed_session_goes_to_another_worker(site, reference, tmp_path):
+    """A unidade em andamento quando a sessão cai é coletada de novo por outro worker."""
+    FragileBrowserCollector.falhas = {'86', '45'}
+    FragileBrowserCollector.falharam = set()
+    assert collect_selenium(site, tmp_path, collector_class=FragileBrowserCollector, workers=3) == reference
+    assert FragileBrowserCollector.falharam == {'86', '45'}
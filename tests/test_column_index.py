@@ -0,0 +1,125 @@
+"""Índices de colunas do FILTRAR (column_index.py), comparados a um filtro direto."""
+import contextlib
+import io
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import column_index
+from column_index import (ColumnIndex, Condicao, FilterError, TableIndex, bitmap_count, bitmap_ids,
+                          ids_to_bitmap, parse_conditions)
+from data_models import Curso, Disciplina, Unidade
+from menu import MenuHandler
+
+CAMPOS = ('creditos_aula', 'carga_horaria')
+
+
+def matching(values, minimo, maximo):
+    return [i for i, v in enumerate(values)
+            if v is not None and (minimo is None or v >= minimo) and (maximo is None or v <= maximo)]
+
+
+def test_parse_conditions():
+    condicoes, unidade = parse_conditions('creditos_aula=4..6 carga_horaria > 60 creditos_aula<=5 unidade=IME', CAMPOS)
+    assert condicoes == [Condicao('creditos_aula', 4, 6), Condicao('carga_horaria', 61, None),
+                         Condicao('creditos_aula', None, 5)]
+    assert unidade == 'IME'
+    assert parse_conditions('CARGA_HORARIA>=30 creditos_aula<2 creditos_aula=0', CAMPOS)[0] == [
+        Condicao('carga_horaria', 30, None), Condicao('creditos_aula', None, 1), Condicao('creditos_aula', 0, 0)]
+    for args in ('creditos_aula=6..4', 'creditos_aula=x', 'foo=1', 'unidade>IME', 'creditos_aula', 'carga_horaria=-1'):
+        with pytest.raises(FilterError):
+            parse_conditions(args, CAMPOS)
+
+
+def test_bitmap_helpers():
+    ids = [0, 3, 8, 9, 63, 64, 200]
+    bitmap = ids_to_bitmap(ids, 201)
+    assert list(bitmap_ids(bitmap)) == ids
+    assert bitmap_count(bitmap) == len(ids)
+    assert list(bitmap_ids(0)) == []
+
+
+@pytest.mark.parametrize('distinct', [6, 200])
+def test_prefix_and_fallback_paths_match_direct_filter(distinct):
+    rng = random.Random(distinct)
+    values = [rng.randrange(distinct) if rng.random() > 0.1 else None for _ in range(500)]
+    index = ColumnIndex(values)
+    assert (index._prefix is not None) == (distinct <= column_index.PREFIX_BITMAP_MAX_VALUES)
+    bounds = [None, -1, 0, 1, distinct // 2, distinct - 1, distinct, distinct + 5]
+    for minimo in bounds:
+        for maximo in bounds:
+            assert list(bitmap_ids(index.bitmap(minimo, maximo))) == matching(values, minimo, maximo), (minimo, maximo)
+
+
+def test_prefix_path_equals_fallback(monkeypatch):
+    rng = random.Random(1)
+    values = [rng.choice([0, 2, 4, 6, None]) for _ in range(300)]
+    with_prefix = ColumnIndex(values)
+    monkeypatch.setattr(column_index, 'PREFIX_BITMAP_MAX_VALUES', 0)
+    without_prefix = ColumnIndex(values)
+    assert with_prefix._prefix is not None and without_prefix._prefix is None
+    for minimo in (None, 0, 1, 2, 5, 6, 7):
+        for maximo in (None, -1, 0, 3, 4, 6):
+            assert with_prefix.bitmap(minimo, maximo) == without_prefix.bitmap(minimo, maximo)
+
+
+def test_strict_operators_at_the_edges():
+    values = [0, 2, 4, 4, 6, None]
+    index = TableIndex([SimpleNamespace(creditos_aula=v) for v in values], ['creditos_aula'])
+
+    def select(args):
+        return list(bitmap_ids(index.select(parse_conditions(args, ['creditos_aula'])[0])))
+
+    assert select('creditos_aula<4') == [0, 1]
+    assert select('creditos_aula<=4') == [0, 1, 2, 3]
+    assert select('creditos_aula>4') == [4]
+    assert select('creditos_aula>=4') == [2, 3, 4]
+    assert select('creditos_aula>6') == []
+    assert select('creditos_aula<0') == []
+    assert select('creditos_aula=4..4') == [2, 3]
+    # Sem valor não é o mesmo que zero.
+    assert select('creditos_aula=0') == [0]
+    assert select('creditos_aula<=100') == [0, 1, 2, 3, 4]
+    assert select('') == [0, 1, 2, 3, 4, 5]
+
+
+def test_groups_combine_with_conditions():
+    rng = random.Random(8)
+    items = [SimpleNamespace(creditos_aula=rng.randrange(5), carga_horaria=rng.choice([30, 60, 90])) for _ in range(100)]
+    grupos = {'IME': range(0, 100, 3), 'EP': range(1, 100, 3)}
+    index = TableIndex(items, CAMPOS, grupos)
+    condicoes = [Condicao('creditos_aula', 2, None), Condicao('carga_horaria', None, 60)]
+    expected = [i for i in grupos['IME'] if items[i].creditos_aula >= 2 and items[i].carga_horaria <= 60]
+    bitmap = index.select(condicoes, 'IME')
+    assert list(bitmap_ids(bitmap)) == expected
+    assert list(index.items_in(bitmap)) == [items[i] for i in expected]
+    assert index.select(condicoes, 'FFLCH') == 0
+    assert list(bitmap_ids(index.select([], 'EP'))) == list(grupos['EP'])
+
+
+def test_filter_command_by_unit():
+    unidades, cursos, disciplinas = [], [], {}
+    for sigla, creditos in (('IME', [4, 2, 0]), ('EP', [4, 6])):
+        unidade = Unidade(f"Unidade - ( {sigla} )")
+        curso = Curso(f"Curso {sigla}", unidade.nome)
+        for n, valor in enumerate(creditos):
+            disciplina = Disciplina(f"{sigla}{n}", f"Disciplina {sigla} {n}")
+            disciplina.creditos_aula = valor
+            disciplina.cursos.add(curso.nome)
+            curso.obrigatorias.append(disciplina)
+            disciplinas[disciplina.codigo] = disciplina
+        unidade.cursos = [curso]
+        unidades.append(unidade)
+        cursos.append(curso)
+    menu = MenuHandler(unidades, cursos, disciplinas)
+
+    def codes(command):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            menu.execute(command)
+        return [line.split(' - ')[0][2:] for line in output.getvalue().splitlines() if line.startswith('- ')]
+
+    assert codes('FILTRAR D creditos_aula>=2 unidade=IME') == ['IME0', 'IME1']
+    assert codes('FILTRAR D creditos_aula=4 unidade=ep') == ['EP0']
+    assert codes('FILTRAR D creditos_aula>=4') == ['EP0', 'EP1', 'IME0']
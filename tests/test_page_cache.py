@@ -0,0 +1,21 @@
+"""Cache de páginas (usp_data.pages) e reprocessamento sem rede (--reparse)."""
+import os
+
+import pytest
+
+from conftest import collect_selenium, read, run_main
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_reparse_matches_full_run(site, reference, tmp_path, workers):
+    run_main(tmp_path, '--force-scrape', '--backend', 'http', '--base-url', site[1])
+    os.remove(tmp_path / 'usp_data.json')
+    run_main(tmp_path, '--reparse', '--workers', workers)
+    assert read(tmp_path / 'usp_data.json') == reference
+
+
+def test_reparse_of_selenium_pages_matches_full_run(site, reference, tmp_path):
+    collect_selenium(site, tmp_path)
+    os.remove(tmp_path / 'usp_data.json')
+    run_main(tmp_path, '--reparse')
+    assert read(tmp_path / 'usp_data.json') == reference
@@ -0,0 +1,13 @@
+"""Pipeline de coleta do backend selenium: busca, parsing em threads e ligação em ordem."""
+import pytest
+
+from conftest import collect_selenium
+
+
+@pytest.mark.parametrize('parse_workers', [1, 4])
+def test_parse_workers_do_not_change_result(site, reference, tmp_path, parse_workers):
+    assert collect_selenium(site, tmp_path, parse_workers=parse_workers) == reference
+
+
+def test_parallel_fetch_with_parallel_parsing(site, reference, tmp_path):
+    assert collect_selenium(site, tmp_path, workers=2, parse_workers=3) == reference
@@ -0,0 +1,102 @@
+"""Paginação das listagens (render.py): --limit, --offset e o pager do terminal."""
+import pytest
+
+from render import OutputBuffer, Pager, Paginacao, PagingError, parse_paging, render_rows
+
+ROWS = [('Grupo A', f"a{i}") for i in range(4)] + [('Grupo B', f"b{i}") for i in range(3)] + [(None, 'fim')]
+
+
+class ScriptedPager(Pager):
+    """Pager que responde às pausas com `answers` (True continua) em vez de ler do teclado."""
+
+    def __init__(self, page_size: int, answers=()):
+        super().__init__(page_size)
+        self.answers = list(answers)
+        self.pauses = 0
+
+    def more(self, out: OutputBuffer) -> bool:
+        self.pauses += 1
+        return self.answers.pop(0) if self.answers else True
+
+
+def render(paginacao=Paginacao(), pager=None, rows=ROWS):
+    out = OutputBuffer()
+    shown = render_rows(out, rows, paginacao, pager)
+    return shown, list(out.pending())
+
+
+def test_parse_paging():
+    assert parse_paging('IME 2') == ('IME 2', Paginacao())
+    assert parse_paging('IME --limit 5 --offset=10') == ('IME', Paginacao(10, 5))
+    assert parse_paging('--OFFSET 0 calculo') == ('calculo', Paginacao(0, None))
+    for args in ('--limit 0', '--limit', '--offset -1', '--limit=x'):
+        with pytest.raises(PagingError):
+            parse_paging(args)
+
+
+def test_whole_listing_repeats_no_message():
+    shown, lines = render()
+    assert shown == len(ROWS)
+    assert lines == ['Grupo A', 'a0', 'a1', 'a2', 'a3', 'Grupo B', 'b0', 'b1', 'b2', 'fim']
+
+
+def test_middle_page_shows_group_and_continuation():
+    shown, lines = render(Paginacao(offset=2, limit=3))
+    assert shown == 3
+    assert lines == ['Grupo A', 'a2', 'a3', 'Grupo B', 'b0',
+                     'Mostrando itens 3 a 5. Use --offset 5 para ver os seguintes.']
+
+
+def test_last_partial_page():
+    shown, lines = render(Paginacao(offset=6, limit=5))
+    assert shown == 2
+    assert lines == ['Grupo B', 'b2', 'fim']
+
+
+def test_page_ending_exactly_at_the_end():
+    shown, lines = render(Paginacao(offset=5, limit=3))
+    assert shown == 3
+    assert lines == ['Grupo B', 'b1', 'b2', 'fim']
+
+
+def test_offset_past_the_end():
+    for offset in (len(ROWS), len(ROWS) + 10):
+        shown, lines = render(Paginacao(offset=offset, limit=2))
+        assert shown == 0
+        assert lines == [f"Nenhum item a partir da posição {offset}."]
+    assert render(rows=[]) == (0, [])
+
+
+def test_only_shown_rows_are_generated():
+    consumed = []
+
+    def rows():
+        for i in range(1000):
+            consumed.append(i)
+            yield None, str(i)
+
+    shown, _ = render(Paginacao(offset=10, limit=5), rows=rows())
+    assert shown == 5
+    # As linhas exibidas e uma a mais, para saber se a listagem continua.
+    assert consumed == list(range(16))
+
+
+def test_pager_repeats_group_header_on_each_page():
+    pager = ScriptedPager(page_size=3)
+    shown, lines = render(pager=pager)
+    assert shown == len(ROWS)
+    assert pager.pauses == 2
+    assert lines == ['Grupo A', 'a0', 'a1', 'a2', 'Grupo A', 'a3', 'Grupo B', 'b0', 'b1', 'Grupo B', 'b2', 'fim']
+
+
+def test_pager_without_pause_on_exact_last_page():
+    pager = ScriptedPager(page_size=4)
+    render(Paginacao(offset=4), pager=pager)
+    assert pager.pauses == 0
+
+
+def test_interrupted_pager_tells_where_to_continue():
+    pager = ScriptedPager(page_size=2, answers=[True, False])
+    shown, lines = render(Paginacao(offset=1), pager=pager)
+    assert shown == 4
+    assert lines[-1] == 'Listagem interrompida. Use --offset 5 para continuar deste ponto.'
@@ -0,0 +1,99 @@
+"""Cache de resultados do menu (result_cache.py e MenuHandler.execute)."""
+import contextlib
+import io
+import os
+
+from data_models import Curso, Disciplina, Unidade
+from hot_reload import DataFileWatcher, LiveMenu
+from menu import MenuHandler
+from result_cache import LRUCache
+from utils import load_data_from_json, save_data_to_json
+
+UNIDADE = 'Instituto de Matemática e Estatística - ( IME )'
+
+
+def make_data(nome_curso: str = 'Bacharelado em Ciência da Computação'):
+    disciplina = Disciplina('MAC0110', 'Introdução à Computação')
+    disciplina.creditos_aula = 4
+    curso = Curso(nome_curso, UNIDADE)
+    curso.obrigatorias = [disciplina]
+    disciplina.cursos.add(curso.nome)
+    unidade = Unidade(UNIDADE)
+    unidade.cursos = [curso]
+    return [unidade], [curso], {disciplina.codigo: disciplina}
+
+
+def run(menu, command: str) -> str:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        menu.execute(command)
+    return output.getvalue()
+
+
+def test_lru_eviction_and_counters():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_equal_commands_share_an_entry():
+    menu = MenuHandler(*make_data())
+    first = run(menu, 'C IME 1')
+    for command in ('C ime 1', 'c  IME   1', 'C Ime 1'):
+        assert run(menu, command) == first
+    assert len(menu.result_cache) == 1
+    assert menu.result_cache.hits == 3
+
+    # A paginação faz parte da chave.
+    run(menu, 'U --limit 1')
+    run(menu, 'U')
+    assert len(menu.result_cache) == 3
+
+
+def test_echoing_commands_keep_the_typed_text():
+    menu = MenuHandler(*make_data())
+    assert 'computacao' in run(menu, 'BUSCAR D computacao')
+    assert 'COMPUTACAO' in run(menu, 'BUSCAR D COMPUTACAO')
+    assert len(menu.result_cache) == 2
+
+
+def test_errors_are_not_cached():
+    menu = MenuHandler(*make_data())
+    for command in ('U xx', 'D nada', 'DC ime 9', 'FILTRAR D foo>1', 'C IME --limit 0'):
+        assert run(menu, command).startswith('ERRO')
+        assert run(menu, command).startswith('ERRO')
+    assert len(menu.result_cache) == 0
+    assert menu.result_cache.hits == 0
+    run(menu, 'AJUDA')
+    assert len(menu.result_cache) == 0
+
+
+def test_reload_swap_starts_with_an_empty_cache(tmp_path):
+    filename = str(tmp_path / 'usp_data.json')
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_data_to_json(*make_data(), filename)
+        watcher = DataFileWatcher(filename, lambda: load_data_from_json(filename), interval=0)
+        live = LiveMenu(MenuHandler(*load_data_from_json(filename)), watcher)
+    watcher.on_reload = live._reload
+
+    before = run(live, 'C IME 1')
+    assert run(live, 'C IME 1') == before
+    assert len(live.menu.result_cache) == 1
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_data_to_json(*make_data('Licenciatura em Matemática'), filename)
+    os.utime(filename, ns=(1, 1))
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert not watcher.check()
+        assert watcher.check()
+
+    assert len(live.menu.result_cache) == 0
+    after = run(live, 'C IME 1')
+    assert 'Licenciatura em Matemática' in after and after != before
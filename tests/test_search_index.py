@@ -0,0 +1,82 @@
+"""Busca por nome (search_index.py), comparada a uma busca direta sobre todos os nomes."""
+import random
+
+import pytest
+
+from search_index import EXACT, INFIX, PREFIX, SearchIndex, normalize, tokenize
+
+NOMES = [
+    'Cálculo Diferencial e Integral I', 'Cálculo Diferencial e Integral II', 'Cálculo Numérico',
+    'Álgebra Linear', 'Álgebra Linear para Computação', 'Introdução à Computação',
+    'Introdução à Ciência da Computação', 'Computação Gráfica', 'Geometria Analítica',
+    'Física I', 'Física Computacional', 'Estatística', 'Probabilidade e Estatística',
+    'Laboratório de Física', 'Cálculo', 'Teoria da Computação', 'Métodos Numéricos',
+]
+
+
+def brute_force(nomes, query):
+    """Mesma ordem que o índice promete: soma das notas, consulta inteira, tamanho e nome."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    phrase = normalize(query).strip()
+    ranked = []
+    for nome in nomes:
+        text = normalize(nome)
+        tokens = tokenize(nome)
+        score = 0
+        for term in terms:
+            best = max((EXACT if t == term else PREFIX if t.startswith(term) else INFIX if term in t else 0)
+                       for t in tokens)
+            if not best:
+                break
+            score += best
+        else:
+            ranked.append((-score, phrase not in text, len(text), text, nome))
+    return [entry[-1] for entry in sorted(ranked)]
+
+
+@pytest.fixture(scope='module')
+def index():
+    return SearchIndex(NOMES, key=lambda nome: nome)
+
+
+def test_accents_and_case_are_ignored(index):
+    assert index.search('CALCULO NUMERICO') == ['Cálculo Numérico']
+    assert index.search('álgebra') == index.search('algebra') == ['Álgebra Linear', 'Álgebra Linear para Computação']
+    assert index.search('FÍSICA')[0] == 'Física I'
+
+
+def test_exact_then_prefix_then_infix():
+    # A nota do casamento vem antes do tamanho do nome.
+    index = SearchIndex(['Bioestatística', 'Estatísticas Vitais', 'Tópicos de Mecânica Estatística'], key=lambda n: n)
+    assert index.search('estatistica') == ['Tópicos de Mecânica Estatística', 'Estatísticas Vitais', 'Bioestatística']
+    # Com a mesma nota, ganha quem contém a consulta inteira e depois o nome mais curto.
+    index = SearchIndex(['Cálculo Numérico Avançado', 'Numérico Cálculo', 'Cálculo Numérico'], key=lambda n: n)
+    assert index.search('calculo numerico') == ['Cálculo Numérico', 'Cálculo Numérico Avançado', 'Numérico Cálculo']
+
+
+def test_every_term_must_match(index):
+    assert index.search('calculo integral') == ['Cálculo Diferencial e Integral I', 'Cálculo Diferencial e Integral II']
+    assert index.search('introducao ciencia') == ['Introdução à Ciência da Computação']
+    assert index.search('calculo grafica') == []
+    assert index.search('   ') == []
+
+
+@pytest.mark.parametrize('query', ['calculo', 'comp', 'ca', 'a', 'ic', 'linear comp', 'fisica c', 'e', 'tica',
+                                   'integral i', 'xyz'])
+def test_matches_brute_force(index, query):
+    assert index.search(query) == brute_force(NOMES, query)
+
+
+def test_limit_returns_prefix_of_unlimited_search():
+    rng = random.Random(3)
+    palavras = ['calculo', 'calculadora', 'algebra', 'linear', 'computacao', 'computador', 'fisica',
+                'estatistica', 'numerico', 'introducao', 'teoria', 'metodos']
+    nomes = [' '.join(rng.sample(palavras, rng.randint(1, 4))) for _ in range(300)]
+    index = SearchIndex(nomes, key=lambda nome: nome)
+    for query in ('calc', 'comp', 'a', 'calculo linear', 'ica', 'o c', 'teoria metodos'):
+        full = index.search(query)
+        assert full == brute_force(nomes, query)
+        for limit in (1, 2, 5, 50, len(full) + 1):
+            assert index.search(query, limit=limit) == full[:limit]
@@ -0,0 +1,99 @@
+"""Similaridade entre grades (similarity.py), comparada ao Jaccard calculado com sets."""
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import similarity
+from data_models import Curso
+from similarity import MinHashLSH, SimilarityEngine
+
+
+def make_engine(seed: int = 4, num_cursos: int = 40, num_disciplinas: int = 90):
+    rng = random.Random(seed)
+    codigos = [f"DSC{i:03d}" for i in range(num_disciplinas)]
+    cursos, disciplinas = [], []
+    for i in range(num_cursos):
+        cursos.append(Curso(f"Curso {i}", f"Unidade {i % 3}"))
+        if i % 7 == 6:
+            # Quase cópia de um curso anterior, para ter pares muito parecidos (e empates).
+            base = set(disciplinas[i - rng.randint(1, 5)])
+            disciplinas.append(sorted(base - set(rng.sample(sorted(base), min(len(base), rng.randint(0, 2))))))
+        else:
+            disciplinas.append(rng.sample(codigos, rng.randint(0, 12)))
+    return SimilarityEngine(cursos, disciplinas), [set(d) for d in disciplinas]
+
+
+def brute_force_pairs(sets, k):
+    pairs = []
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            comuns = len(sets[i] & sets[j])
+            if comuns:
+                pairs.append((-comuns / len(sets[i] | sets[j]), -comuns, (i, j)))
+    return [(i, j, -comuns) for _, comuns, (i, j) in sorted(pairs)[:k]]
+
+
+def as_tuples(engine, results):
+    position = {id(curso): i for i, curso in enumerate(engine.cursos)}
+    return [(position[id(r.curso)], position[id(r.outro)], r.comuns) for r in results]
+
+
+@pytest.mark.parametrize('block_bytes', [1, 200, 4096, 32 << 20])
+@pytest.mark.parametrize('k', [1, 5, 30, 1000])
+def test_exact_top_pairs_match_brute_force(monkeypatch, block_bytes, k):
+    monkeypatch.setattr(similarity, 'PAIR_BLOCK_BYTES', block_bytes)
+    engine, sets = make_engine()
+    result = engine.top_pairs(k, method='exact')
+    assert as_tuples(engine, result) == brute_force_pairs(sets, k)
+    for r in result:
+        a, b = sets[engine.cursos.index(r.curso)], sets[engine.cursos.index(r.outro)]
+        assert r.jaccard == pytest.approx(len(a & b) / len(a | b))
+        assert r.sobreposicao == pytest.approx(len(a & b) / min(len(a), len(b)))
+
+
+def test_similar_to_matches_brute_force():
+    engine, sets = make_engine(seed=9)
+    for i, curso in enumerate(engine.cursos):
+        expected = sorted(
+            ((-len(sets[i] & sets[j]) / len(sets[i] | sets[j]), -len(sets[i] & sets[j]), (i, j))
+             for j in range(len(sets)) if j != i and sets[i] & sets[j])
+        )[:5]
+        assert as_tuples(engine, engine.similar_to(curso, 5)) == [(i, j, -c) for _, c, (_, j) in expected]
+
+
+def test_minhash_signatures_are_minimum_hashes():
+    engine, sets = make_engine(seed=2)
+    lsh = MinHashLSH(engine, num_perm=16, bands=4, seed=3)
+    rng = np.random.default_rng(3)
+    a = rng.integers(1, MinHashLSH.PRIME, size=16, dtype=np.int64)
+    b = rng.integers(0, MinHashLSH.PRIME, size=16, dtype=np.int64)
+    for i, codigos in enumerate(sets):
+        if codigos:
+            ids = np.array([engine.disc_ids[c] for c in codigos], dtype=np.int64)
+            assert (lsh.signatures[i] == ((ids[:, None] * a + b) % MinHashLSH.PRIME).min(axis=0)).all()
+        else:
+            assert not lsh.has_disciplines[i]
+
+
+def test_lsh_recall_of_similar_pairs():
+    """Os pares com Jaccard alto saem entre os candidatos do LSH e no topo do resultado."""
+    rng = random.Random(12)
+    codigos = [f"DSC{i:04d}" for i in range(3000)]
+    cursos, disciplinas, planted = [], [], []
+    for i in range(300):
+        cursos.append(Curso(f"Curso {i}", 'Unidade'))
+        if i % 10 == 9:
+            base = disciplinas[i - 1]
+            # Troca 2 de 40 disciplinas: Jaccard 38/42 ~ 0,9.
+            disciplinas.append(base[2:] + rng.sample(codigos, 2))
+            planted.append((i - 1, i))
+        else:
+            disciplinas.append(rng.sample(codigos, 40))
+    engine = SimilarityEngine(cursos, disciplinas)
+    candidates = MinHashLSH(engine).candidate_pairs()
+    assert set(planted) <= candidates
+    top = as_tuples(engine, engine.top_pairs(len(planted), method='lsh'))
+    assert top == as_tuples(engine, engine.top_pairs(len(planted), method='exact'))
+    assert {(i, j) for i, j, _ in top} == set(planted)
@@ -0,0 +1,119 @@
+"""Agregados do comando STATS (stats.py), comparados a um cálculo direto sobre os dados."""
+import random
+
+import pytest
+
+from data_models import Curso, Disciplina, Unidade
+from stats import DISCIPLINE_LISTS, StatsEngine
+
+
+def make_units(seed: int = 5, num_unidades: int = 6, num_disciplinas: int = 60):
+    """Unidades com cursos que compartilham disciplinas, sem ligar ainda os cursos às disciplinas."""
+    rng = random.Random(seed)
+    disciplinas = {}
+    for i in range(num_disciplinas):
+        disciplina = Disciplina(f"DSC{i:03d}", f"Disciplina {i}")
+        disciplina.creditos_aula = rng.randint(0, 6)
+        disciplina.carga_horaria = rng.choice([30, 60, 90])
+        disciplinas[disciplina.codigo] = disciplina
+    codigos = list(disciplinas)
+    unidades = []
+    for u in range(num_unidades):
+        unidade = Unidade(f"Unidade {u}")
+        for c in range(rng.randint(1, 4)):
+            curso = Curso(f"Curso {u}.{c}", unidade.nome)
+            curso.duracao_ideal = rng.choice([8, 10])
+            for disc_type in DISCIPLINE_LISTS:
+                curso_disciplinas = [disciplinas[cod] for cod in rng.sample(codigos, rng.randint(2, 8))]
+                setattr(curso, disc_type, curso_disciplinas)
+            unidade.cursos.append(curso)
+        unidades.append(unidade)
+    return unidades, disciplinas
+
+
+def link(unidade: Unidade):
+    for curso in unidade.cursos:
+        for disc_type in DISCIPLINE_LISTS:
+            for disciplina in getattr(curso, disc_type):
+                disciplina.cursos.add(curso.nome)
+
+
+def expected_top(disciplinas, k):
+    ordem = {codigo: i for i, codigo in enumerate(disciplinas)}
+    ranked = sorted(disciplinas.values(), key=lambda d: (-len(d.cursos), ordem[d.codigo]))
+    return [(d, len(d.cursos)) for d in ranked[:k]]
+
+
+def test_full_build_matches_direct_computation():
+    unidades, disciplinas = make_units()
+    for unidade in unidades:
+        link(unidade)
+    cursos = [curso for unidade in unidades for curso in unidade.cursos]
+    engine = StatsEngine(unidades, cursos, disciplinas)
+    assert engine.top_disciplines(10) == expected_top(disciplinas, 10)
+    # A consulta devolve as entradas ao heap: repetir dá o mesmo resultado.
+    assert engine.top_disciplines(10) == expected_top(disciplinas, 10)
+    assert engine.top_disciplines(len(disciplinas) + 5) == expected_top(disciplinas, len(disciplinas))
+
+    unidade, num = engine.unit_with_most_courses()
+    assert num == max(len(u.cursos) for u in unidades)
+    assert unidade is min((u for u in unidades if len(u.cursos) == num), key=lambda u: u.nome)
+    curso, num = engine.course_with_most_mandatory()
+    assert num == max(len(c.obrigatorias) for c in cursos)
+    assert curso is min((c for c in cursos if len(c.obrigatorias) == num), key=lambda c: c.nome)
+
+
+def test_ties_keep_original_order():
+    disciplinas = {}
+    for codigo in ('Z', 'A', 'M', 'B'):
+        disciplinas[codigo] = Disciplina(codigo, codigo)
+        disciplinas[codigo].cursos = ['Curso']
+    disciplinas['B'].cursos.add('Outro')
+    engine = StatsEngine([], [], disciplinas)
+    assert [d.codigo for d, _ in engine.top_disciplines(4)] == ['B', 'Z', 'A', 'M']
+
+
+def test_add_unidade_keeps_heap_current():
+    """Unidades acrescentadas uma a uma aumentam as contagens de disciplinas já vistas."""
+    unidades, disciplinas = make_units(seed=11)
+    ordem = {codigo: i for i, codigo in enumerate(disciplinas)}
+    engine = StatsEngine([], [], {}, ordem=lambda d: ordem[d.codigo])
+    vistas = {}
+    for unidade in unidades:
+        link(unidade)
+        engine.add_unidade(unidade)
+        for curso in unidade.cursos:
+            for disc_type in DISCIPLINE_LISTS:
+                for d in getattr(curso, disc_type):
+                    vistas[d.codigo] = d
+        vistas = {codigo: vistas[codigo] for codigo in disciplinas if codigo in vistas}
+        assert engine.top_disciplines(8) == expected_top(vistas, 8)
+
+    cursos = [curso for unidade in unidades for curso in unidade.cursos]
+    full = StatsEngine(unidades, cursos, disciplinas)
+    # Disciplinas sem curso nenhum só existem na montagem completa, com contagem 0.
+    assert engine.top_disciplines(len(disciplinas)) == full.top_disciplines(len(vistas))
+    assert engine.unit_with_most_courses() == full.unit_with_most_courses()
+    assert engine.course_with_most_mandatory() == full.course_with_most_mandatory()
+    assert engine.unit_distributions() == full.unit_distributions()
+    assert engine.duration_histograms() == full.duration_histograms()
+
+
+def test_unit_distributions_match_direct_computation():
+    pytest.importorskip('numpy')
+    unidades, disciplinas = make_units(seed=2)
+    for unidade in unidades:
+        link(unidade)
+    cursos = [curso for unidade in unidades for curso in unidade.cursos]
+    distribuicoes = StatsEngine(unidades, cursos, disciplinas).unit_distributions()
+
+    assert [d.unidade for d in distribuicoes] == sorted(u.nome for u in unidades)
+    for distribuicao in distribuicoes:
+        unidade = next(u for u in unidades if u.nome == distribuicao.unidade)
+        distintas = {d.codigo: d for c in unidade.cursos for t in DISCIPLINE_LISTS for d in getattr(c, t)}
+        assert distribuicao.num_disciplinas == len(distintas)
+        for campo in ('creditos_aula', 'carga_horaria'):
+            valores = [getattr(d, campo) for d in distintas.values()]
+            resumo = getattr(distribuicao, campo)
+            assert resumo.media == pytest.approx(sum(valores) / len(valores))
+            assert (resumo.minimo, resumo.maximo) == (min(valores), max(valores))
@@ -1,26 +1,114 @@
 import json
 import os
-from typing import List, Dict, Tuple
-from data_models import Unidade, Curso, Disciplina
+from typing import IO, Iterator, List, Dict, Tuple
+from data_models import Unidade, Curso, Disciplina, novas_tabelas
+from sqlite_store import load_data_from_sqlite, save_data_to_sqlite
+from shard_store import load_data_from_shards, save_data_to_shards
+from snapshot import SnapshotError, load_snapshot, save_snapshot, snapshot_matches, snapshot_path_for, source_of
+
+def _write_json_value(f: IO, value, indent, level: int):
+    """Escreve um valor já posicionado `level` níveis dentro do documento."""
+    separators = (',', ':') if indent is None else None
+    text = json.dumps(value, ensure_ascii=False, indent=indent, separators=separators)
+    if indent:
+        text = text.replace('\n', '\n' + ' ' * (indent * level))
+    f.write(text)
+
 
 def save_data_to_json(
     unidades: List[Unidade],
     cursos: List[Curso],
     disciplinas: Dict[str, Disciplina],
-    filename: str = 'usp_data.json'
+    filename: str = 'usp_data.json',
+    compact: bool = False
 ):
+    """
+    Salva os dados em um único documento JSON, escrevendo um registro por vez em vez de
+    montar o documento inteiro na memória. Com `compact=True` omite a indentação.
+    """
     print(f"\nSalvando dados em '{filename}'...")
-    data = {
-        'unidades': [u.to_dict() for u in unidades],
-        'cursos': [c.to_dict() for c in cursos],
-        'disciplinas': {cod: d.to_dict() for cod, d in disciplinas.items()}
-    }
+    indent = None if compact else 2
+    newline = '' if compact else '\n'
+    pad = lambda level: ' ' * (indent * level) if indent else ''
+    key_sep = ':' if compact else ': '
+
+    sections = [
+        ('unidades', '[]', ((None, u.to_dict()) for u in unidades), bool(unidades)),
+        ('cursos', '[]', ((None, c.to_dict()) for c in cursos), bool(cursos)),
+        ('disciplinas', '{}', ((cod, d.to_dict()) for cod, d in disciplinas.items()), bool(disciplinas)),
+    ]
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write('{' + newline)
+        for i, (name, brackets, records, has_records) in enumerate(sections):
+            f.write(f'{pad(1)}"{name}"{key_sep}')
+            if not has_records:
+                f.write(brackets)
+            else:
+                f.write(brackets[0] + newline)
+                for j, (key, record) in enumerate(records):
+                    if j:
+                        f.write(',' + newline)
+                    f.write(pad(2))
+                    if key is not None:
+                        f.write(json.dumps(key, ensure_ascii=False) + key_sep)
+                    _write_json_value(f, record, indent, 2)
+                f.write(newline + pad(1) + brackets[1])
+            f.write((',' if i < len(sections) - 1 else '') + newline)
+        f.write('}')
     print("Dados salvos com sucesso!")
 
 
+def save_data_to_jsonl(
+    unidades: List[Unidade],
+    cursos: List[Curso],
+    disciplinas: Dict[str, Disciplina],
+    filename: str = 'usp_data.jsonl'
+):
+    """
+    Salva os dados em JSON Lines, um registro por linha: primeiro as disciplinas, depois
+    os cursos e por fim as unidades, para que a leitura possa montar os objetos em ordem.
+    """
+    print(f"\nSalvando dados em '{filename}'...")
+    with open(filename, 'w', encoding='utf-8') as f:
+        for disciplina in disciplinas.values():
+            f.write(json.dumps(dict(tipo='disciplina', **disciplina.to_dict()), ensure_ascii=False) + '\n')
+        for curso in cursos:
+            f.write(json.dumps(dict(tipo='curso', **curso.to_dict()), ensure_ascii=False) + '\n')
+        for unidade in unidades:
+            f.write(json.dumps(dict(tipo='unidade', **unidade.to_dict()), ensure_ascii=False) + '\n')
+    print("Dados salvos com sucesso!")
+
+
+def _disciplina_from_dict(cod: str, disc_data: Dict) -> Disciplina:
+    disciplina = Disciplina(cod, disc_data['nome'])
+    disciplina.creditos_aula = disc_data.get('creditos_aula', 0)
+    disciplina.creditos_trabalho = disc_data.get('creditos_trabalho', 0)
+    disciplina.carga_horaria = disc_data.get('carga_horaria', 0)
+    disciplina.carga_estagio = disc_data.get('carga_estagio', 0)
+    disciplina.carga_praticas = disc_data.get('carga_praticas', 0)
+    disciplina.atividades_aprofundamento = disc_data.get('atividades_aprofundamento', 0)
+    disciplina.cursos = set(disc_data.get('cursos', []))
+    return disciplina
+
+
+def _curso_from_dict(curso_data: Dict, disciplinas_db: Dict[str, Disciplina]) -> Curso:
+    curso = Curso(curso_data['nome'], curso_data['unidade'])
+    curso.duracao_ideal = curso_data.get('duracao_ideal', 0)
+    curso.duracao_minima = curso_data.get('duracao_minima', 0)
+    curso.duracao_maxima = curso_data.get('duracao_maxima', 0)
+
+    curso.obrigatorias = [disciplinas_db[cod] for cod in curso_data.get('obrigatorias', []) if cod in disciplinas_db]
+    curso.optativas_livres = [disciplinas_db[cod] for cod in curso_data.get('optativas_livres', []) if cod in disciplinas_db]
+    curso.optativas_eletivas = [disciplinas_db[cod] for cod in curso_data.get('optativas_eletivas', []) if cod in disciplinas_db]
+    return curso
+
+
 def load_data_from_json(filename: str = 'usp_data.json') -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+    """
+    Carrega os dados de um documento JSON. O documento é lido inteiro antes de os objetos
+    serem montados (as unidades e os cursos vêm antes das disciplinas que referenciam); para
+    carregar com o pico de memória limitado a um registro por vez, use o formato JSON Lines.
+    """
     if not os.path.exists(filename):
         return [], [], {}
 
@@ -34,25 +122,12 @@ def load_data_from_json(filename: str = 'usp_data.json') -> Tuple[List[Unidade],
 
     disciplinas_db = {}
     for cod, disc_data in data.get('disciplinas', {}).items():
-        disciplina = Disciplina(cod, disc_data['nome'])
-        disciplina.creditos_aula = disc_data.get('creditos_aula', 0)
-        disciplina.creditos_trabalho = disc_data.get('creditos_trabalho', 0)
-        disciplina.carga_horaria = disc_data.get('carga_horaria', 0)
-        disciplina.cursos = set(disc_data.get('cursos', []))
-        disciplinas_db[cod] = disciplina
+        disciplinas_db[cod] = _disciplina_from_dict(cod, disc_data)
 
     cursos_db = []
     cursos_map = {}
     for curso_data in data.get('cursos', []):
-        curso = Curso(curso_data['nome'], curso_data['unidade'])
-        curso.duracao_ideal = curso_data.get('duracao_ideal', 0)
-        curso.duracao_minima = curso_data.get('duracao_minima', 0)
-        curso.duracao_maxima = curso_data.get('duracao_maxima', 0)
-        
-        curso.obrigatorias = [disciplinas_db[cod] for cod in curso_data.get('obrigatorias', []) if cod in disciplinas_db]
-        curso.optativas_livres = [disciplinas_db[cod] for cod in curso_data.get('optativas_livres', []) if cod in disciplinas_db]
-        curso.optativas_eletivas = [disciplinas_db[cod] for cod in curso_data.get('optativas_eletivas', []) if cod in disciplinas_db]
-        
+        curso = _curso_from_dict(curso_data, disciplinas_db)
         cursos_db.append(curso)
         cursos_map[curso.nome] = curso
 
@@ -67,4 +142,167 @@ def load_data_from_json(filename: str = 'usp_data.json') -> Tuple[List[Unidade],
     else:
         print("Aviso: O arquivo de dados foi encontrado, mas estava vazio ou mal formatado. Execute o scrape novamente.")
 
-    return unidades_db, cursos_db, disciplinas_db
\ No newline at end of file
+    return unidades_db, cursos_db, disciplinas_db
+
+
+def iter_jsonl_records(filename: str) -> Iterator[Dict]:
+    """Lê um arquivo JSON Lines registro por registro, sem carregá-lo inteiro."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Aviso: linha {line_number} de '{filename}' está corrompida e foi ignorada.")
+
+
+def load_data_from_jsonl(filename: str = 'usp_data.jsonl') -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+    """Carrega os dados de um arquivo JSON Lines, construindo cada objeto à medida que a linha é lida."""
+    if not os.path.exists(filename):
+        return [], [], {}
+
+    print(f"Carregando dados existentes de '{filename}'...")
+    disciplinas_db: Dict[str, Disciplina] = {}
+    cursos_db: List[Curso] = []
+    cursos_map: Dict[str, Curso] = {}
+    unidades_db: List[Unidade] = []
+
+    for record in iter_jsonl_records(filename):
+        tipo = record.get('tipo')
+        if tipo == 'disciplina':
+            disciplinas_db[record['codigo']] = _disciplina_from_dict(record['codigo'], record)
+        elif tipo == 'curso':
+            curso = _curso_from_dict(record, disciplinas_db)
+            cursos_db.append(curso)
+            cursos_map[curso.nome] = curso
+        elif tipo == 'unidade':
+            unidade = Unidade(record['nome'])
+            unidade.cursos = [cursos_map[nome] for nome in record.get('cursos', []) if nome in cursos_map]
+            unidades_db.append(unidade)
+
+    if unidades_db or cursos_db or disciplinas_db:
+        print("Dados carregados com sucesso!")
+    else:
+        print("Aviso: O arquivo de dados foi encontrado, mas estava vazio ou mal formatado. Execute o scrape novamente.")
+
+    return unidades_db, cursos_db, disciplinas_db
+
+
+def save_data(
+    unidades: List[Unidade],
+    cursos: List[Curso],
+    disciplinas: Dict[str, Disciplina],
+    filename: str = 'usp_data.json',
+    compact: bool = False
+):
+    """
+    Salva os dados no formato indicado pela extensão do arquivo (.db, .shards, .snap, .jsonl ou .json).
+    Arquivos JSON/JSONL ganham também o snapshot binário ao lado, usado pelas próximas cargas.
+    """
+    if filename.endswith('.db'):
+        print(f"\nSalvando dados em '{filename}'...")
+        save_data_to_sqlite(unidades, cursos, disciplinas, filename)
+        print("Dados salvos com sucesso!")
+    elif filename.endswith('.shards'):
+        print(f"\nSalvando dados em '{filename}' (um arquivo por unidade)...")
+        save_data_to_shards(unidades, cursos, disciplinas, filename)
+        print("Dados salvos com sucesso!")
+    elif filename.endswith('.snap'):
+        print(f"\nSalvando snapshot em '{filename}'...")
+        save_snapshot(unidades, cursos, disciplinas, filename)
+        print("Dados salvos com sucesso!")
+    else:
+        if filename.endswith('.jsonl'):
+            save_data_to_jsonl(unidades, cursos, disciplinas, filename)
+        else:
+            save_data_to_json(unidades, cursos, disciplinas, filename, compact=compact)
+        _write_snapshot(unidades, cursos, disciplinas, filename)
+
+
+def _write_snapshot(unidades: List[Unidade], cursos: List[Curso], disciplinas: Dict[str, Disciplina], filename: str):
+    """Grava o snapshot de um arquivo JSON/JSONL já escrito; uma falha não impede o uso do arquivo."""
+    snapshot_file = snapshot_path_for(filename)
+    try:
+        save_snapshot(unidades, cursos, disciplinas, snapshot_file, source_of(filename))
+    except OSError as e:
+        print(f"Aviso: não foi possível gravar o snapshot '{snapshot_file}': {e}")
+
+
+def load_data(
+    filename: str = 'usp_data.json',
+    use_snapshot: bool = True,
+    write_snapshot: bool = False
+) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+    """
+    Carrega os dados no formato indicado pela extensão do arquivo (.db, .shards, .snap, .jsonl ou .json).
+
+    Para arquivos JSON/JSONL, com `use_snapshot=True`, usa o snapshot binário gravado ao
+    lado do arquivo quando ele foi gerado a partir do conteúdo atual (o cabeçalho guarda
+    tamanho, mtime e hash do arquivo de origem). A leitura não cria arquivos: o snapshot é
+    gravado por save_data ou, com `write_snapshot=True`, depois de carregar o JSON.
+    """
+    novas_tabelas()
+    if filename.endswith('.db'):
+        if not os.path.exists(filename):
+            return [], [], {}
+        print(f"Carregando dados existentes de '{filename}'...")
+        return load_data_from_sqlite(filename)
+    if filename.endswith('.shards'):
+        if not os.path.exists(filename):
+            return [], [], {}
+        print(f"Carregando dados existentes de '{filename}'...")
+        return load_data_from_shards(filename)
+    if filename.endswith('.snap'):
+        if not os.path.exists(filename):
+            return [], [], {}
+        print(f"Carregando snapshot '{filename}'...")
+        return load_snapshot(filename)
+
+    snapshot_file = snapshot_path_for(filename)
+    if use_snapshot and os.path.exists(filename) and os.path.exists(snapshot_file):
+        try:
+            if snapshot_matches(snapshot_file, filename):
+                print(f"Carregando snapshot '{snapshot_file}'...")
+                return load_snapshot(snapshot_file)
+        except SnapshotError as e:
+            print(f"Aviso: {e} Recarregando de '{filename}'.")
+
+    # A origem é lida antes do JSON: se o arquivo mudar durante a carga, o snapshot gravado
+    # abaixo não vai conferir com ele e será ignorado.
+    origem = source_of(filename) if write_snapshot and os.path.exists(filename) else None
+    if filename.endswith('.jsonl'):
+        data = load_data_from_jsonl(filename)
+    else:
+        data = load_data_from_json(filename)
+
+    if origem is not None and any(data):
+        try:
+            save_snapshot(*data, snapshot_file, origem)
+        except OSError as e:
+            print(f"Aviso: não foi possível gravar o snapshot '{snapshot_file}': {e}")
+    return data
+
+
+def filter_units(
+    unidades: List[Unidade],
+    cursos: List[Curso],
+    disciplinas: Dict[str, Disciplina],
+    num_unidades: int
+) -> Tuple[List[Unidade], List[Curso], Dict[str, Disciplina]]:
+    """
+    Mantém apenas as primeiras `num_unidades` unidades, seus cursos e as disciplinas desses
+    cursos. Os conjuntos de cursos das disciplinas são restringidos no próprio objeto.
+    """
+    unidades_filtradas = unidades[:num_unidades]
+    nomes_unidades_filtradas = {u.nome for u in unidades_filtradas}
+
+    cursos_filtrados = [c for c in cursos if c.unidade in nomes_unidades_filtradas]
+    nomes_cursos_filtrados = {c.nome for c in cursos_filtrados}
+
+    disciplinas_filtradas = {}
+    for codigo, disciplina in disciplinas.items():
+        disciplina.cursos.intersection_update(nomes_cursos_filtrados)
+        if disciplina.cursos:
+            disciplinas_filtradas[codigo] = disciplina
+
+    return unidades_filtradas, cursos_filtrados, disciplinas_filtradas
@@ -0,0 +1,57 @@
+"""
+Resolução do chromedriver usado pelo coletor com navegador.
+
+O `ChromeDriverManager().install()` consulta a rede a cada chamada para descobrir a versão
+compatível com o Chrome. Aqui o caminho resolvido é guardado por processo (as sessões
+paralelas resolvem uma única vez) e fixado em DRIVER_PIN_FILE: enquanto o executável
+fixado existir, ele é usado sem acessar a rede, o que permite coletar offline (por exemplo,
+contra o fake_jupiterweb.py). Se o Chrome for atualizado e o driver fixado deixar de ser
+compatível, `resolve_chromedriver(stale=...)` resolve de novo e regrava o arquivo.
+"""
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+DRIVER_PIN_FILE = 'chromedriver.json'
+
+_lock = threading.Lock()
+_resolved: Optional[str] = None
+
+
+def read_pin(pin_file: str = DRIVER_PIN_FILE) -> Optional[str]:
+    """Caminho fixado em `pin_file`, se o arquivo existir e o executável ainda estiver lá."""
+    try:
+        with open(pin_file, 'r', encoding='utf-8') as f:
+            path = json.load(f).get('caminho')
+    except (OSError, ValueError, AttributeError):
+        return None
+    return path if path and os.path.isfile(path) else None
+
+
+def write_pin(path: str, pin_file: str = DRIVER_PIN_FILE):
+    try:
+        with open(pin_file, 'w', encoding='utf-8') as f:
+            json.dump({'caminho': path, 'resolvido_em': time.strftime('%Y-%m-%dT%H:%M:%S')}, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"Aviso: não foi possível fixar o chromedriver em '{pin_file}': {e}")
+
+
+def resolve_chromedriver(pin_file: str = DRIVER_PIN_FILE, stale: Optional[str] = None) -> str:
+    """
+    Caminho do chromedriver: o já resolvido neste processo, o fixado em `pin_file` ou, em
+    último caso, o instalado pelo webdriver_manager. `stale` é um caminho que se mostrou
+    incompatível; se ainda for o atual, a resolução é refeita pela rede.
+    """
+    global _resolved
+    with _lock:
+        if _resolved is not None and _resolved != stale:
+            return _resolved
+        path = read_pin(pin_file) if stale is None else None
+        if path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+            write_pin(path, pin_file)
+        _resolved = path
+        return path